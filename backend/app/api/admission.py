@@ -0,0 +1,233 @@
+"""Admission control: per-client rate limits and bounded in-flight work.
+
+Under a burst, requests that cannot get a database connection wait in the
+pool until ``DB_POOL_TIMEOUT_SECONDS`` and then every client sees slow
+failures at once. The :class:`AdmissionController` rejects that work at the
+door instead:
+
+* each client (by address, or by ``CLIENT_ADDRESS_HEADER`` behind a trusted
+  proxy; see :func:`app.api.middleware.client_key`) has a token bucket refilled at
+  ``ADMISSION_CLIENT_RATE`` requests per second up to
+  ``ADMISSION_CLIENT_BURST``; a request finding it empty gets ``429``;
+* reads and writes each run at most ``ADMISSION_{READ,WRITE}_MAX_IN_FLIGHT``
+  at a time. Requests over the limit wait in a FIFO queue for at most
+  ``ADMISSION_QUEUE_TARGET_MS`` and get ``503`` when that runs out, or at once
+  when ``ADMISSION_MAX_QUEUE`` requests are already waiting.
+
+Both carry a ``Retry-After`` header. Rejections are counted in
+``http_requests_shed_total``.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from app.core.config import Settings, load_settings
+from app.core.metrics import LATENCY_BUCKETS, registry
+
+
+ROUTE_CLASSES = ("read", "write")
+
+# Reasons a request is shed, the label of http_requests_shed_total.
+RATE_LIMITED = "rate_limited"
+QUEUE_FULL = "queue_full"
+QUEUE_TIMEOUT = "queue_timeout"
+
+# Clients remembered at most; buckets that have refilled are dropped once this is reached.
+MAX_CLIENTS = 10_000
+
+REQUESTS_SHED = registry.counter(
+    "http_requests_shed",
+    "Requests rejected by admission control.",
+    ("route_class", "reason"),
+)
+ADMISSION_WAIT_SECONDS = registry.histogram(
+    "http_admission_wait_seconds",
+    "Time admitted requests waited for an in-flight slot.",
+    ("route_class",),
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_QUEUED = registry.gauge(
+    "http_admission_queued",
+    "Requests waiting for an in-flight slot.",
+    ("route_class",),
+)
+
+
+class ConcurrencyLimit:
+    """At most ``limit`` holders at a time; others wait in arrival order for up to ``target`` seconds.
+
+    A released slot is handed straight to the oldest waiter, so a newcomer
+    cannot overtake the queue. Used from a single event loop.
+    """
+
+    def __init__(self, route_class: str, limit: int, *, max_queue: int, target: float) -> None:
+        self.route_class = route_class
+        self.limit = limit
+        self.max_queue = max_queue
+        self.target = target
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot and return ``None``, or return why the request must be shed."""
+
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return QUEUE_FULL
+
+        started = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_QUEUED.inc((self.route_class,))
+        try:
+            await asyncio.wait_for(waiter, self.target)
+        except asyncio.TimeoutError:
+            # The slot may have been handed over just as the wait ran out.
+            if not waiter.done() or waiter.cancelled():
+                return QUEUE_TIMEOUT
+        except BaseException:
+            # The client went away; pass on a slot it was given.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            ADMISSION_QUEUED.dec((self.route_class,))
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started, (self.route_class,))
+        return None
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"limit": self.limit, "in_flight": self.in_flight, "queued": self.queued}
+
+
+class AdmissionController:
+    """Per-client token buckets and per-route-class concurrency limits; a zero limit disables either."""
+
+    def __init__(
+        self,
+        *,
+        read_max_in_flight: int = 0,
+        write_max_in_flight: int = 0,
+        max_queue: int = 100,
+        queue_target: float = 0.1,
+        client_rate: float = 0.0,
+        client_burst: int = 20,
+    ) -> None:
+        self.queue_target = queue_target
+        self.client_rate = client_rate
+        self.client_burst = max(client_burst, 1)
+        self.limits: Dict[str, ConcurrencyLimit] = {
+            route_class: ConcurrencyLimit(route_class, limit, max_queue=max_queue, target=queue_target)
+            for route_class, limit in zip(ROUTE_CLASSES, (read_max_in_flight, write_max_in_flight))
+            if limit > 0
+        }
+        self._lock = threading.Lock()
+        # Client -> (tokens, monotonic time they were counted).
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._shed: Dict[str, int] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "AdmissionController":
+        return cls(
+            read_max_in_flight=settings.admission_read_max_in_flight,
+            write_max_in_flight=settings.admission_write_max_in_flight,
+            max_queue=settings.admission_max_queue,
+            queue_target=settings.admission_queue_target_ms / 1000,
+            client_rate=settings.admission_client_rate,
+            client_burst=settings.admission_client_burst,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.client_rate > 0 or bool(self.limits)
+
+    def take_token(self, client: str) -> Optional[float]:
+        """Spend one of ``client``'s tokens and return ``None``, or return seconds until one is available."""
+
+        if self.client_rate <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            tokens, counted_at = self._buckets.get(client, (self.client_burst, now))
+            tokens = min(self.client_burst, tokens + (now - counted_at) * self.client_rate)
+            if tokens < 1:
+                self._buckets[client] = (tokens, now)
+                return (1 - tokens) / self.client_rate
+            if client not in self._buckets and len(self._buckets) >= MAX_CLIENTS:
+                self._forget_idle(now)
+            self._buckets[client] = (tokens - 1, now)
+        return None
+
+    def _forget_idle(self, now: float) -> None:
+        # A bucket that has refilled behaves exactly like a new one.
+        refill = self.client_burst / self.client_rate
+        for client, (_, counted_at) in list(self._buckets.items()):
+            if now - counted_at >= refill:
+                del self._buckets[client]
+
+    async def acquire(self, route_class: str) -> Optional[str]:
+        limit = self.limits.get(route_class)
+        return None if limit is None else await limit.acquire()
+
+    def release(self, route_class: str) -> None:
+        limit = self.limits.get(route_class)
+        if limit is not None:
+            limit.release()
+
+    def shed(self, route_class: str, reason: str) -> None:
+        REQUESTS_SHED.inc((route_class, reason))
+        with self._lock:
+            key = f"{route_class}:{reason}"
+            self._shed[key] = self._shed.get(key, 0) + 1
+
+    def retry_after(self, wait: Optional[float] = None) -> int:
+        """Whole seconds for ``Retry-After``: ``wait`` if known, else the queue target; at least 1."""
+
+        return max(1, math.ceil(self.queue_target if wait is None else wait))
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            clients = len(self._buckets)
+            shed = dict(self._shed)
+        return {
+            "enabled": self.enabled,
+            "client_rate": self.client_rate,
+            "clients": clients,
+            "classes": {route_class: limit.stats() for route_class, limit in self.limits.items()},
+            "shed": shed,
+        }
+
+
+admission_controller = AdmissionController.from_settings(load_settings())
+
+
+__all__ = [
+    "AdmissionController",
+    "ConcurrencyLimit",
+    "MAX_CLIENTS",
+    "QUEUE_FULL",
+    "QUEUE_TIMEOUT",
+    "RATE_LIMITED",
+    "ROUTE_CLASSES",
+    "admission_controller",
+]
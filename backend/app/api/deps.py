@@ -1,8 +1,23 @@
 """Shared FastAPI dependency callables."""
 from __future__ import annotations
 
+from typing import AsyncGenerator, Generator
+
+from fastapi import Depends, Request
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.api.middleware import READ_PRIMARY_COOKIE, client_key
 from app.core.config import Settings, load_settings
-from app.db.session import get_db
+from app.db.session import (
+    AsyncReadSessionLocal,
+    ReadSessionLocal,
+    async_replica_engines,
+    get_async_db,
+    get_db,
+    replica_router,
+)
 
 
 def get_settings() -> Settings:
@@ -11,7 +26,63 @@ def get_settings() -> Settings:
     return load_settings()
 
 
+def get_read_db(request: Request, primary: Session = Depends(get_db)) -> Generator[Session, None, None]:
+    """FastAPI dependency that yields a session for read-only queries.
+
+    Uses a read replica when any is configured and healthy, unless the client
+    wrote recently; otherwise the primary session from :func:`get_db`, which
+    opens no connection unless it is used.
+    """
+
+    if _reads_from_replica(request):
+        for name, engine in replica_router.candidates():
+            db = ReadSessionLocal(bind=engine)
+            try:
+                db.connection()
+            except OperationalError:
+                db.close()
+                replica_router.eject(name)
+                continue
+            try:
+                yield db
+            finally:
+                db.close()
+            return
+    yield primary
+
+
+async def get_async_read_db(
+    request: Request, primary: AsyncSession = Depends(get_async_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Async counterpart of :func:`get_read_db` for the async routes."""
+
+    if _reads_from_replica(request):
+        for name, _ in replica_router.candidates():
+            db = AsyncReadSessionLocal(bind=async_replica_engines[name])
+            try:
+                await db.connection()
+            except OperationalError:
+                await db.close()
+                replica_router.eject(name)
+                continue
+            try:
+                yield db
+            finally:
+                await db.close()
+            return
+    yield primary
+
+
+def _reads_from_replica(request: Request) -> bool:
+    return replica_router.enabled and not (
+        READ_PRIMARY_COOKIE in request.cookies or replica_router.is_sticky(client_key(request.scope))
+    )
+
+
 __all__ = [
+    "get_async_db",
+    "get_async_read_db",
     "get_db",
+    "get_read_db",
     "get_settings",
 ]
@@ -0,0 +1,424 @@
+"""ASGI middleware for the Clipboard Sync API."""
+from __future__ import annotations
+
+import cProfile
+import glob
+import hmac
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.admission import QUEUE_FULL, RATE_LIMITED, AdmissionController
+from app.core.config import load_settings
+from app.core.metrics import LATENCY_BUCKETS, SIZE_BUCKETS, registry
+from app.core.profiling import RequestProfile, current_profile
+from app.db.replicas import ReplicaRouter
+
+
+logger = logging.getLogger(__name__)
+
+
+REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ("method", "route", "status"),
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_BYTES = registry.histogram(
+    "http_request_size_bytes",
+    "Request body sizes.",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS,
+)
+RESPONSE_BYTES = registry.histogram(
+    "http_response_size_bytes",
+    "Response body sizes.",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled.",
+)
+
+# Route label for requests that matched no route, so scanners cannot inflate label cardinality.
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _content_length(headers) -> Optional[int]:
+    for name, value in headers:
+        if name.lower() == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+class MetricsMiddleware:
+    """Records latency, body sizes and concurrency for every HTTP request.
+
+    Requests are labelled with their route template (``/clip/{entry_id}``),
+    which the router stores in the ASGI scope once it matches. Written as plain
+    ASGI rather than ``BaseHTTPMiddleware`` so streamed bodies pass straight
+    through and the per-request cost stays a few counter updates: body sizes
+    come from ``Content-Length`` and messages are only counted for bodies sent
+    without one (chunked uploads, streamed responses).
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        request_size = _content_length(scope["headers"])
+        response_size: Optional[int] = None
+        streamed_size = 0
+        status = 500
+
+        if request_size is None:
+            request_size = 0
+
+            async def receive_counting() -> Message:
+                nonlocal request_size
+                message = await receive()
+                if message["type"] == "http.request":
+                    request_size += len(message.get("body", b""))
+                return message
+
+            downstream_receive = receive_counting
+        else:
+            downstream_receive = receive
+
+        async def send_counting(message: Message) -> None:
+            nonlocal response_size, streamed_size, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_size = _content_length(message.get("headers", ()))
+            elif response_size is None and message["type"] == "http.response.body":
+                streamed_size += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, downstream_receive, send_counting)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            REQUEST_SECONDS.observe(time.perf_counter() - started, (method, route, str(status)))
+            REQUEST_BYTES.observe(request_size, (method, route))
+            RESPONSE_BYTES.observe(streamed_size if response_size is None else response_size, (method, route))
+
+
+class RequestSizeLimitMiddleware:
+    """Answers ``413`` to requests whose body exceeds the limit set for their method and path.
+
+    A ``Content-Length`` over the limit is rejected before the body is read;
+    a body sent without one is counted as it arrives and the read fails once
+    the limit is passed, so the route never buffers more than the limit.
+    """
+
+    def __init__(self, app: ASGIApp, *, limits: Dict[Tuple[str, str], int]) -> None:
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get((scope.get("method", ""), scope.get("path", ""))) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds the limit of {limit} bytes"
+        declared = _content_length(scope["headers"])
+        if declared is not None and declared > limit:
+            response = JSONResponse({"detail": detail}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def receive_limited() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside the route's body read, which passes HTTP errors through.
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, receive_limited, send)
+
+
+PROFILE_HEADER = "x-profile"
+
+# cProfile observes every thread (Python 3.12+) and only one may run at a time.
+_profiler_lock = threading.Lock()
+
+_LOOPBACK_ADDRESSES = frozenset({"127.0.0.1", "::1"})
+
+
+class ProfilingMiddleware:
+    """Profiles requests sent with ``X-Profile`` and a random ``sample_rate`` of the rest.
+
+    The header is honoured when its value is ``token`` or, with no token
+    configured, when the client connects from this host. Only the newest
+    ``max_profiles`` profiles are kept in ``directory``.
+
+    A profiled request gets a ``Server-Timing`` header with its wall time,
+    the count and time of its SQL statements, and its profiled time split by
+    package (pydantic, sqlalchemy, fastapi, app, other). The full ``cProfile``
+    output and the statements are written to ``directory`` as
+    ``<id>.prof`` and ``<id>.sql.json``; the id is in the header.
+
+    The CPU profile stops when the response headers are sent, so the body of a
+    streamed response is not included. Because the profiler sees all threads,
+    concurrent requests show up in it too; while one request is being
+    profiled, others only get SQL accounting.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        sample_rate: float = 0.0,
+        directory: str,
+        token: str = "",
+        max_profiles: int = 100,
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.token = token
+        self.max_profiles = max_profiles
+
+    def _selected(self, scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER.encode():
+                return self._trusted(scope, value)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _trusted(self, scope: Scope, value: bytes) -> bool:
+        if self.token:
+            return hmac.compare_digest(value, self.token.encode())
+        client = scope.get("client")
+        return client is not None and client[0] in _LOOPBACK_ADDRESSES
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        now = time.time_ns()
+        profile_id = (
+            f"{time.strftime('%Y%m%dT%H%M%S', time.localtime(now // 10**9))}.{now % 10**9:09d}-{uuid.uuid4().hex[:8]}"
+        )
+        profiler: Optional[cProfile.Profile] = None
+        if _profiler_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another tool (a debugger, coverage) holds the profiling hooks.
+                _profiler_lock.release()
+                profiler = None
+
+        def stop_profiler() -> Optional[pstats.Stats]:
+            nonlocal profiler
+            if profiler is None:
+                return None
+            profiler.disable()
+            stats = pstats.Stats(profiler)
+            profiler = None
+            _profiler_lock.release()
+            return stats
+
+        stats: Optional[pstats.Stats] = None
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal stats
+            if message["type"] == "http.response.start":
+                stats = stop_profiler()
+                if stats is not None:
+                    profile.record_stats(stats)
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", profile.server_timing(profile_id=profile_id))
+            await send(message)
+
+        token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            if profiler is not None:
+                stats = stop_profiler()
+        route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+        try:
+            await run_in_threadpool(self._write, profile_id, scope["method"], route, profile, stats)
+        except OSError:
+            logger.warning("Could not write request profile %s to %s", profile_id, self.directory, exc_info=True)
+
+    def _write(
+        self, profile_id: str, method: str, route: str, profile: RequestProfile, stats: Optional[pstats.Stats]
+    ) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, profile_id)
+        if stats is not None:
+            stats.dump_stats(base + ".prof")
+        summary = {
+            "id": profile_id,
+            "method": method,
+            "route": route,
+            "sql_count": profile.sql_count,
+            "sql_ms": round(profile.sql_seconds * 1000, 3),
+            "package_ms": {name: round(seconds * 1000, 3) for name, seconds in profile.package_seconds.items()},
+            "statements": [
+                {"ms": round(seconds * 1000, 3), "sql": statement} for statement, seconds in profile.statements
+            ],
+        }
+        with open(base + ".sql.json", "w", encoding="utf-8") as handle:
+            json.dump(summary, handle, indent=2)
+        self._rotate()
+
+    def _rotate(self) -> None:
+        # Profile ids start with a nanosecond timestamp, so name order is age order.
+        summaries = sorted(glob.glob(os.path.join(self.directory, "*.sql.json")))
+        for path in summaries[: max(len(summaries) - self.max_profiles, 0)]:
+            base = path[: -len(".sql.json")]
+            for stale in (path, base + ".prof"):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+
+
+# Set after a write; reads carrying it go to the primary, whichever worker serves them.
+READ_PRIMARY_COOKIE = "clip_read_primary"
+
+_WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+def client_key(scope: Scope) -> str:
+    """Identify the client for read stickiness and rate limiting.
+
+    Requests relayed by a proxy in ``TRUSTED_PROXIES`` are keyed on the
+    address in ``CLIENT_ADDRESS_HEADER``, the last one for a list such as
+    ``X-Forwarded-For`` since that is the one the proxy added; anything else on
+    the address it connects from.
+    """
+
+    client = scope.get("client")
+    address = client[0] if client else "unknown"
+    settings = load_settings()
+    if settings.client_address_header and address in settings.trusted_proxies:
+        header = settings.client_address_header.encode("latin-1")
+        for name, value in scope["headers"]:
+            if name == header:
+                forwarded = value.decode("latin-1").rsplit(",", 1)[-1].strip()
+                return forwarded or address
+    return address
+
+
+class ReadYourWritesMiddleware:
+    """Pins a client's reads to the primary for a short while after each successful write.
+
+    The client is remembered by address in ``router`` and, for clients that
+    keep cookies, with a short-lived :data:`READ_PRIMARY_COOKIE`.
+    """
+
+    def __init__(self, app: ASGIApp, *, router: ReplicaRouter) -> None:
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in _WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_marking_writes(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                self.router.mark_write(client_key(scope))
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{READ_PRIMARY_COOKIE}=1; Max-Age={int(self.router.sticky_seconds)}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_marking_writes)
+
+
+# Long-lived or operational endpoints that must answer under load; an open stream would pin a slot.
+ADMISSION_EXEMPT_PATHS = frozenset({"/health", "/metrics", "/clips/stream"})
+
+
+class AdmissionControlMiddleware:
+    """Sheds requests a client sends too fast (429) or that would queue too long for a slot (503).
+
+    Writes are the requests with a write method, everything else a read; see
+    :mod:`app.api.admission`. Rejections carry ``Retry-After`` and never reach
+    the routes, so they cost no database connection.
+    """
+
+    def __init__(self, app: ASGIApp, *, controller: AdmissionController) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in ADMISSION_EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        route_class = "write" if scope["method"] in _WRITE_METHODS else "read"
+        wait = self.controller.take_token(client_key(scope))
+        if wait is not None:
+            self.controller.shed(route_class, RATE_LIMITED)
+            await self._reject(scope, receive, send, 429, "Too many requests", self.controller.retry_after(wait))
+            return
+
+        reason = await self.controller.acquire(route_class)
+        if reason is not None:
+            self.controller.shed(route_class, reason)
+            detail = "Server is busy" if reason == QUEUE_FULL else "Timed out waiting for capacity"
+            await self._reject(scope, receive, send, 503, detail, self.controller.retry_after())
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route_class)
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, status: int, detail: str, retry_after: int) -> None:
+        response = JSONResponse({"detail": detail}, status_code=status, headers={"Retry-After": str(retry_after)})
+        await response(scope, receive, send)
+
+
+__all__ = [
+    "ADMISSION_EXEMPT_PATHS",
+    "AdmissionControlMiddleware",
+    "MetricsMiddleware",
+    "PROFILE_HEADER",
+    "ProfilingMiddleware",
+    "READ_PRIMARY_COOKIE",
+    "ReadYourWritesMiddleware",
+    "RequestSizeLimitMiddleware",
+    "UNMATCHED_ROUTE",
+    "client_key",
+]
@@ -1,5 +1,5 @@
 """Registered FastAPI routers for the Clipboard Sync API."""
 
-from . import clipboard, health
+from . import clipboard, clipboard_async, health, metrics, stream
 
-__all__ = ["clipboard", "health"]
+__all__ = ["clipboard", "clipboard_async", "health", "metrics", "stream"]
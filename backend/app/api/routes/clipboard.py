@@ -1,39 +1,279 @@
 """Clipboard entry API routes."""
 from __future__ import annotations
 
-from typing import List
+import math
+import re
+from typing import Any, List, Literal, Optional, Tuple, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Path, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
-from app.schemas.clipboard_entry import ClipboardEntryCreate, ClipboardEntryRead
+from app.api.deps import get_db, get_read_db, get_settings
+from app.core.config import Settings
+from app.core.serialization import dumps
+from app.schemas.clipboard_entry import (
+    ClipboardBatchCreated,
+    ClipboardBatchError,
+    ClipboardBatchResult,
+    ClipboardBulkDelete,
+    ClipboardBulkDeleteResult,
+    ClipboardChangesPage,
+    ClipboardContentInfo,
+    ClipboardEntryCreate,
+    ClipboardEntryCreated,
+    ClipboardEntryPreview,
+    ClipboardEntryRead,
+    ClipboardReconcileRequest,
+    ClipboardReconcileResult,
+)
 from app.services.clipboard import (
+    ChangesExpiredError,
+    ClipboardContentConflictError,
+    ClipboardContentTooLargeError,
     ClipboardEntryNotFoundError,
+    ClipboardPage,
     InvalidClipboardEntryError,
+    InvalidCursorError,
+    begin_content_upload,
+    create_clipboard_entries,
     create_clipboard_entry,
+    delete_clipboard_entries,
     delete_clipboard_entry,
-    list_clipboard_entries,
+    get_clipboard_content,
+    get_clipboard_entry,
+    iter_clipboard_content,
+    list_clip_changes,
+    list_clipboard_page,
+    list_clipboard_preview_page,
+    read_generation,
+    search_clipboard_entries,
 )
+from app.services.group_commit import group_commit_writer
+from app.services.reconcile import RangeSummary, ReconcileUnavailableError, range_digest_cache, reconcile_ranges
 
 
 router = APIRouter(tags=["clipboard"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+CONTENT_MEDIA_TYPE = "text/plain; charset=utf-8"
+
+ClipListView = Literal["full", "preview"]
+
+_BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def clips_etag(generation: int) -> str:
+    """Validator for clip listings: any change to the table moves the generation."""
+
+    return f'"clips-{generation}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an ``If-None-Match`` header using weak comparison."""
+
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    if "*" in candidates:
+        return True
+    return etag in {candidate.removeprefix("W/") for candidate in candidates}
+
+
+def clip_etag(entry: Any) -> str:
+    """Validator for a single clip: its body is fixed by the hash; re-copies bump ``copy_count``."""
+
+    return f'"{entry.content_hash}-{entry.copy_count}"'
+
+
+def clip_cache_headers(etag: str, settings: Settings) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": f"private, max-age={settings.clip_cache_max_age_seconds}"}
+
+
+def check_bulk_delete_size(payload: ClipboardBulkDelete, settings: Settings) -> None:
+    if payload.ids is not None and len(payload.ids) > settings.clip_batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Delete request exceeds the limit of {settings.clip_batch_max_items} ids",
+        )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+class ClipListResponse(Response):
+    """JSON response encoded in one pass with :func:`app.core.serialization.dumps`."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def clip_page_response(page: ClipboardPage, etag: str) -> ClipListResponse:
+    """Serialize a page of clip records for any list-style endpoint.
+
+    Records are built from stored rows, so returning the response directly
+    skips FastAPI's second validation pass through ``response_model``.
+    """
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if page.next_cursor is not None:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return ClipListResponse(page.entries, headers=headers)
+
+
+@router.post("/clip", response_model=ClipboardEntryCreated, status_code=201)
+async def create_clip(payload: ClipboardEntryCreate, db: Session = Depends(get_db)) -> ClipboardEntryCreated:
+    """Store a clip and return its metadata; the body is not echoed back."""
 
-@router.post("/clip", response_model=ClipboardEntryRead, status_code=201)
-def create_clip(payload: ClipboardEntryCreate, db: Session = Depends(get_db)) -> ClipboardEntryRead:
     try:
-        entry = create_clipboard_entry(db, payload)
+        created = await group_commit_writer.create(payload)
+        if created is not None:
+            return created
+        entry = await run_in_threadpool(create_clipboard_entry, db, payload)
     except InvalidClipboardEntryError as exc:
         raise HTTPException(status_code=422, detail=str(exc)) from exc
 
-    return ClipboardEntryRead.model_validate(entry)
+    return ClipboardEntryCreated.model_validate(entry)
+
+
+@router.post("/clips/batch", response_model=ClipboardBatchResult)
+def create_clips_batch(
+    items: List[ClipboardEntryCreate] = Body(...),
+    db: Session = Depends(get_db),
+    settings: Settings = Depends(get_settings),
+) -> ClipboardBatchResult:
+    """Create many clips in one transaction; the body is capped at ``CLIP_BATCH_MAX_BYTES`` by middleware."""
+
+    if len(items) > settings.clip_batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds the limit of {settings.clip_batch_max_items} clips",
+        )
+
+    result = create_clipboard_entries(db, items)
+
+    errors = [ClipboardBatchError(index=rejected.position, detail=rejected.detail) for rejected in result.rejected]
+    created = [
+        ClipboardBatchCreated(index=entry.position, id=entry.id, created_at=entry.created_at)
+        for entry in result.created
+    ]
+    return ClipboardBatchResult(created=created, errors=errors)
+
+
+@router.get("/clips", response_model=Union[List[ClipboardEntryRead], List[ClipboardEntryPreview]])
+def list_clips(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous X-Next-Cursor header"),
+    view: ClipListView = Query("full", description="`preview` returns truncated bodies; fetch one with GET /clip/{id}"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    generation = read_generation(db)
+    etag = clips_etag(generation)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    try:
+        if view == "preview":
+            page = list_clipboard_preview_page(db, limit=limit, cursor=cursor)
+        else:
+            page = list_clipboard_page(db, limit=limit, cursor=cursor, generation=generation)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return clip_page_response(page, etag)
+
+
+@router.get("/clips/search", response_model=List[ClipboardEntryRead])
+def search_clips(
+    q: str = Query(..., min_length=1, max_length=200, description="Words or a substring to look for"),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous X-Next-Cursor header"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    """Clips whose title or content matches ``q``, most relevant first.
+
+    Only the first 1024 characters of a body stored out of line (above
+    ``CLIP_INLINE_MAX_BYTES``) are searched; matches further in are not found.
+    """
+
+    etag = clips_etag(read_generation(db))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    try:
+        page = search_clipboard_entries(db, query=q, limit=limit, cursor=cursor)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return clip_page_response(page, etag)
+
+
+@router.get("/clips/changes", response_model=ClipboardChangesPage)
+def list_clip_changes_since(
+    since: int = Query(0, ge=0, description="`next_since` from the previous page; 0 lists every clip"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    """Clips created, updated or deleted after change ``since``, oldest change first."""
+
+    try:
+        page = list_clip_changes(db, since=since, limit=limit)
+    except ChangesExpiredError as exc:
+        raise HTTPException(status_code=410, detail=str(exc)) from exc
 
+    return ClipListResponse(page._asdict(), headers={"Cache-Control": "no-cache"})
 
-@router.get("/clips", response_model=List[ClipboardEntryRead])
-def list_clips(limit: int = Query(10, ge=1, le=100), db: Session = Depends(get_db)) -> List[ClipboardEntryRead]:
-    entries = list_clipboard_entries(db, limit=limit)
-    return [ClipboardEntryRead.model_validate(entry) for entry in entries]
+
+@router.post("/clips/reconcile", response_model=ClipboardReconcileResult)
+def reconcile_clips(payload: ClipboardReconcileRequest, db: Session = Depends(get_db)) -> Response:
+    """Compare the client's id-range digests with the server's and expand the ranges that differ.
+
+    Served from the primary: the digest cache tracks its change log, which
+    replicas at different lag would contradict.
+    """
+
+    try:
+        results = reconcile_ranges(
+            db, [RangeSummary(item.start, item.end, item.digest, item.count) for item in payload.ranges]
+        )
+    except ReconcileUnavailableError as exc:
+        retry_after = str(max(1, math.ceil(range_digest_cache.interval)))
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": retry_after}) from exc
+    return ClipListResponse(
+        {
+            "ranges": [
+                {**result._asdict(), "items": None if result.items is None else [item._asdict() for item in result.items]}
+                for result in results
+            ]
+        }
+    )
+
+
+@router.get("/clip/{entry_id}", response_model=ClipboardEntryRead)
+def get_clip(
+    response: Response,
+    entry_id: int = Path(..., ge=1),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    settings: Settings = Depends(get_settings),
+) -> ClipboardEntryRead:
+    try:
+        entry = get_clipboard_entry(db, entry_id=entry_id)
+    except ClipboardEntryNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+    headers = clip_cache_headers(clip_etag(entry), settings)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return ClipboardEntryRead.model_validate(entry)
 
 
 @router.delete("/clip/{entry_id}", status_code=204)
@@ -44,3 +284,127 @@ def delete_clip(entry_id: int = Path(..., ge=1), db: Session = Depends(get_db))
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
     return Response(status_code=204)
+
+
+@router.delete("/clips", response_model=ClipboardBulkDeleteResult)
+def delete_clips(
+    payload: ClipboardBulkDelete = Body(...),
+    db: Session = Depends(get_db),
+    settings: Settings = Depends(get_settings),
+) -> ClipboardBulkDeleteResult:
+    """Delete clips by id list, ``before`` timestamp and/or type, in bounded batches."""
+
+    check_bulk_delete_size(payload, settings)
+    deleted = delete_clipboard_entries(
+        db,
+        ids=payload.ids,
+        before=payload.before,
+        entry_type=payload.type,
+        batch_size=settings.clip_delete_batch_size,
+    )
+    return ClipboardBulkDeleteResult(deleted=deleted)
+
+
+@router.put("/clip/{entry_id}/content", response_model=ClipboardContentInfo)
+async def upload_clip_content(
+    request: Request,
+    entry_id: int = Path(..., ge=1),
+    db: Session = Depends(get_db),
+) -> ClipboardContentInfo:
+    """Replace a clip's body with the raw UTF-8 request body, which may be chunked.
+
+    The body is written to storage as it arrives rather than read into memory.
+    """
+
+    try:
+        upload = await run_in_threadpool(begin_content_upload, db, entry_id=entry_id)
+        try:
+            async for data in request.stream():
+                if data:
+                    await run_in_threadpool(upload.write, db, data)
+            entry = await run_in_threadpool(upload.finish, db)
+        except BaseException:
+            await run_in_threadpool(upload.abort, db)
+            raise
+    except ClipboardEntryNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ClipboardContentTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except InvalidClipboardEntryError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    except ClipboardContentConflictError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+    return ClipboardContentInfo.model_validate(entry)
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Resolve a ``Range`` header to inclusive byte offsets.
+
+    Returns ``None`` when the whole body should be sent: no header, a header
+    that is not a single byte range, or one this server ignores (multiple
+    ranges). Raises ``ValueError`` when the range cannot be satisfied.
+    """
+
+    if not header:
+        return None
+    match = _BYTE_RANGE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError("empty suffix range")
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range starts beyond the body")
+    return start, end
+
+
+@router.get(
+    "/clip/{entry_id}/content",
+    response_class=StreamingResponse,
+    responses={200: {"content": {CONTENT_MEDIA_TYPE: {}}}, 206: {"description": "Partial content"}},
+)
+def download_clip_content(
+    entry_id: int = Path(..., ge=1),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+) -> Response:
+    """Stream a clip's full body, honouring single ``Range`` requests."""
+
+    try:
+        content = get_clipboard_content(db, entry_id=entry_id)
+    except ClipboardEntryNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+    etag = f'"{content.content_hash}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    headers = {"ETag": etag, "Accept-Ranges": "bytes"}
+    try:
+        byte_range = parse_byte_range(range_header, content.length)
+    except ValueError:
+        headers["Content-Range"] = f"bytes */{content.length}"
+        return Response(status_code=416, headers=headers)
+
+    status_code = 200
+    start, end = 0, content.length - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{content.length}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        iter_clipboard_content(db.get_bind(), content, start=start, end=end),
+        status_code=status_code,
+        media_type=CONTENT_MEDIA_TYPE,
+        headers=headers,
+    )
@@ -0,0 +1,159 @@
+"""Asyncio variants of the clipboard entry API routes.
+
+Enabled with ``DATABASE_ASYNC=true``; these handlers are registered ahead of the
+sync routes in :mod:`app.api.routes.clipboard` so they take precedence.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Path, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_async_db, get_async_read_db, get_settings
+from app.api.routes.clipboard import (
+    ClipListView,
+    check_bulk_delete_size,
+    clip_cache_headers,
+    clip_etag,
+    clip_page_response,
+    clips_etag,
+    etag_matches,
+    not_modified,
+)
+from app.core.config import Settings
+from app.schemas.clipboard_entry import (
+    ClipboardBulkDelete,
+    ClipboardBulkDeleteResult,
+    ClipboardEntryCreate,
+    ClipboardEntryCreated,
+    ClipboardEntryPreview,
+    ClipboardEntryRead,
+)
+from app.services.clipboard import (
+    ClipboardEntryNotFoundError,
+    InvalidClipboardEntryError,
+    InvalidCursorError,
+    create_clipboard_entry_async,
+    delete_clipboard_entries_async,
+    delete_clipboard_entry_async,
+    get_clipboard_entry_async,
+    list_clipboard_page_async,
+    list_clipboard_preview_page_async,
+    read_generation_async,
+    search_clipboard_entries_async,
+)
+from app.services.group_commit import group_commit_writer
+
+
+router = APIRouter(tags=["clipboard"])
+
+
+@router.post("/clip", response_model=ClipboardEntryCreated, status_code=201)
+async def create_clip_async(
+    payload: ClipboardEntryCreate, db: AsyncSession = Depends(get_async_db)
+) -> ClipboardEntryCreated:
+    try:
+        created = await group_commit_writer.create(payload)
+        if created is not None:
+            return created
+        entry = await create_clipboard_entry_async(db, payload)
+    except InvalidClipboardEntryError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+    return ClipboardEntryCreated.model_validate(entry)
+
+
+@router.get("/clips", response_model=Union[List[ClipboardEntryRead], List[ClipboardEntryPreview]])
+async def list_clips_async(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous X-Next-Cursor header"),
+    view: ClipListView = Query("full", description="`preview` returns truncated bodies; fetch one with GET /clip/{id}"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> Response:
+    generation = await read_generation_async(db)
+    etag = clips_etag(generation)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    try:
+        if view == "preview":
+            page = await list_clipboard_preview_page_async(db, limit=limit, cursor=cursor)
+        else:
+            page = await list_clipboard_page_async(db, limit=limit, cursor=cursor, generation=generation)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return clip_page_response(page, etag)
+
+
+@router.get("/clips/search", response_model=List[ClipboardEntryRead])
+async def search_clips_async(
+    q: str = Query(..., min_length=1, max_length=200, description="Words or a substring to look for"),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous X-Next-Cursor header"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> Response:
+    """Async counterpart of the sync ``search_clips``; searches the same 1024-character heads."""
+
+    etag = clips_etag(await read_generation_async(db))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    try:
+        page = await search_clipboard_entries_async(db, query=q, limit=limit, cursor=cursor)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return clip_page_response(page, etag)
+
+
+@router.get("/clip/{entry_id}", response_model=ClipboardEntryRead)
+async def get_clip_async(
+    response: Response,
+    entry_id: int = Path(..., ge=1),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    settings: Settings = Depends(get_settings),
+) -> ClipboardEntryRead:
+    try:
+        entry = await get_clipboard_entry_async(db, entry_id=entry_id)
+    except ClipboardEntryNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+    headers = clip_cache_headers(clip_etag(entry), settings)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return ClipboardEntryRead.model_validate(entry)
+
+
+@router.delete("/clip/{entry_id}", status_code=204)
+async def delete_clip_async(
+    entry_id: int = Path(..., ge=1), db: AsyncSession = Depends(get_async_db)
+) -> Response:
+    try:
+        await delete_clipboard_entry_async(db, entry_id=entry_id)
+    except ClipboardEntryNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+    return Response(status_code=204)
+
+
+@router.delete("/clips", response_model=ClipboardBulkDeleteResult)
+async def delete_clips_async(
+    payload: ClipboardBulkDelete = Body(...),
+    db: AsyncSession = Depends(get_async_db),
+    settings: Settings = Depends(get_settings),
+) -> ClipboardBulkDeleteResult:
+    check_bulk_delete_size(payload, settings)
+    deleted = await delete_clipboard_entries_async(
+        db,
+        ids=payload.ids,
+        before=payload.before,
+        entry_type=payload.type,
+        batch_size=settings.clip_delete_batch_size,
+    )
+    return ClipboardBulkDeleteResult(deleted=deleted)
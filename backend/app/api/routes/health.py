@@ -2,7 +2,12 @@
 
 from fastapi import APIRouter
 
-from app.db.session import db_manager
+from app.api.admission import admission_controller
+from app.db.session import db_manager, replica_router
+from app.services.clipboard import recent_clips_cache
+from app.services.group_commit import group_commit_writer
+from app.services.reconcile import range_digest_cache
+from app.services.retention import retention_pruner
 
 
 router = APIRouter(tags=["health"])
@@ -10,4 +15,14 @@ router = APIRouter(tags=["health"])
 
 @router.get("/health")
 def health() -> dict[str, object]:
-    return {"status": "ok", "database": db_manager.health_check()}
+    return {
+        "status": "ok",
+        "database": db_manager.health_check(),
+        "database_pool": db_manager.pool_stats(),
+        "read_replicas": replica_router.stats(),
+        "recent_clips_cache": recent_clips_cache.stats(),
+        "range_digests": range_digest_cache.stats(),
+        "retention": retention_pruner.stats(),
+        "group_commit": group_commit_writer.stats(),
+        "admission": admission_controller.stats(),
+    }
@@ -0,0 +1,13 @@
+"""Prometheus scrape endpoint."""
+
+from fastapi import APIRouter, Response
+
+from app.core.metrics import CONTENT_TYPE, registry
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,77 @@
+"""Push endpoints streaming clip change events to connected clients."""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from app.services.events import ClipEventSubscription, clip_event_broker
+
+
+router = APIRouter(tags=["stream"])
+
+# Comment frames keep idle SSE connections open through proxies.
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+def format_sse(payload: Dict[str, Any]) -> str:
+    """Render an event as a Server-Sent Events frame."""
+
+    return f"event: {payload['event']}\ndata: {json.dumps(payload)}\n\n"
+
+
+async def _sse_frames(request: Request, subscription: ClipEventSubscription) -> AsyncIterator[str]:
+    try:
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            try:
+                payload = await asyncio.wait_for(subscription.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(payload)
+    finally:
+        clip_event_broker.unsubscribe(subscription)
+
+
+@router.get("/clips/stream")
+async def stream_clips_sse(request: Request) -> StreamingResponse:
+    subscription = clip_event_broker.subscribe()
+    return StreamingResponse(
+        _sse_frames(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        return
+
+
+@router.websocket("/clips/stream")
+async def stream_clips_ws(websocket: WebSocket) -> None:
+    await websocket.accept()
+    subscription = clip_event_broker.subscribe()
+    disconnected = asyncio.create_task(_wait_for_disconnect(websocket))
+    try:
+        while True:
+            next_event = asyncio.create_task(subscription.get())
+            done, _ = await asyncio.wait(
+                {next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnected in done:
+                next_event.cancel()
+                break
+            await websocket.send_json(next_event.result())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        clip_event_broker.unsubscribe(subscription)
+        disconnected.cancel()
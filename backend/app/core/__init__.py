@@ -6,6 +6,11 @@ from .config import (
     build_test_database_url,
     ensure_leading_slash,
     get_env,
+    get_env_bool,
+    get_env_choice,
+    get_env_float,
+    get_env_int,
+    get_env_int_map,
     load_settings,
 )
 
@@ -15,5 +20,10 @@ __all__ = [
     "build_test_database_url",
     "ensure_leading_slash",
     "get_env",
+    "get_env_bool",
+    "get_env_choice",
+    "get_env_float",
+    "get_env_int",
+    "get_env_int_map",
     "load_settings",
 ]
@@ -0,0 +1,53 @@
+"""Compression codecs for stored clip bodies.
+
+zstd is used when the optional ``zstandard`` package is installed; otherwise
+bodies fall back to zlib from the standard library. The codec name is stored
+with every blob so readers always pick the right decompressor.
+"""
+from __future__ import annotations
+
+import zlib
+from typing import Callable, Dict, Tuple
+
+try:  # pragma: no cover - exercised through whichever codec is installed
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+CODEC_NONE = "none"
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+_CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    CODEC_NONE: (lambda data: data, lambda data: data),
+    CODEC_ZLIB: (lambda data: zlib.compress(data, 6), zlib.decompress),
+}
+if zstandard is not None:
+    _CODECS[CODEC_ZSTD] = (_zstd_compress, _zstd_decompress)
+
+DEFAULT_CODEC = CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+
+
+def compress(data: bytes, codec: str = DEFAULT_CODEC) -> bytes:
+    return _CODECS[codec][0](data)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    try:
+        decompressor = _CODECS[codec][1]
+    except KeyError:
+        raise RuntimeError(f"Codec '{codec}' is not available; install the 'zstandard' package.") from None
+    return decompressor(data)
+
+
+__all__ = ["CODEC_NONE", "CODEC_ZLIB", "CODEC_ZSTD", "DEFAULT_CODEC", "compress", "decompress"]
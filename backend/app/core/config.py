@@ -2,8 +2,9 @@
 from __future__ import annotations
 
 import os
+import tempfile
 from functools import lru_cache
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from dotenv import load_dotenv
 
@@ -21,6 +22,72 @@ def get_env(name: str, *, required: bool = False, default: Optional[str] = None)
     return value
 
 
+def get_env_bool(name: str, *, default: bool = False) -> bool:
+    """Interpret an environment variable as a boolean flag."""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def get_env_int(name: str, *, default: int) -> int:
+    """Interpret an environment variable as an integer."""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError as exc:
+        raise RuntimeError(
+            f"Environment variable '{name}' must be an integer, got {value!r}."
+        ) from exc
+
+
+def get_env_float(name: str, *, default: float) -> float:
+    """Interpret an environment variable as a float."""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return float(value)
+    except ValueError as exc:
+        raise RuntimeError(
+            f"Environment variable '{name}' must be a number, got {value!r}."
+        ) from exc
+
+
+def get_env_choice(name: str, choices: Tuple[str, ...], *, default: str) -> str:
+    """Interpret an environment variable as one of a fixed set of lowercase options."""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    value = value.strip().lower()
+    if value not in choices:
+        raise RuntimeError(
+            f"Environment variable '{name}' must be one of {', '.join(choices)}, got {value!r}."
+        )
+    return value
+
+
+def get_env_int_map(name: str) -> Dict[str, int]:
+    """Interpret an environment variable such as ``text=100,url=50`` as a mapping."""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return {}
+    mapping: Dict[str, int] = {}
+    for item in value.split(","):
+        key, separator, number = item.partition("=")
+        try:
+            if not separator or not key.strip():
+                raise ValueError(item)
+            mapping[key.strip()] = int(number)
+        except ValueError as exc:
+            raise RuntimeError(
+                f"Environment variable '{name}' must look like 'key=1,other=2', got {value!r}."
+            ) from exc
+    return mapping
+
+
 def ensure_leading_slash(path: str) -> str:
     """Ensure a path begins with a forward slash."""
     if not path.startswith("/"):
@@ -95,6 +162,72 @@ class Settings:
         self.app_host = get_env("APP_HOST", default="0.0.0.0")
         self.app_port = get_env("APP_PORT", default="8000")
         self.cors_allow_all = self.is_development
+        self.database_async = get_env_bool("DATABASE_ASYNC")
+        # Connection pool and session limits; see app.db.session.engine_options.
+        self.db_pool_size = get_env_int("DB_POOL_SIZE", default=5)
+        self.db_max_overflow = get_env_int("DB_MAX_OVERFLOW", default=10)
+        self.db_pool_timeout_seconds = get_env_int("DB_POOL_TIMEOUT_SECONDS", default=30)
+        self.db_pool_recycle_seconds = get_env_int("DB_POOL_RECYCLE_SECONDS", default=300)
+        self.db_pool_pre_ping = get_env_choice("DB_POOL_PRE_PING", ("always", "idle", "never"), default="idle")
+        self.db_pool_pre_ping_idle_seconds = get_env_int("DB_POOL_PRE_PING_IDLE_SECONDS", default=30)
+        self.db_statement_timeout_ms = get_env_int("DB_STATEMENT_TIMEOUT_MS", default=0)
+        self.db_idle_in_transaction_timeout_ms = get_env_int("DB_IDLE_IN_TRANSACTION_TIMEOUT_MS", default=0)
+        self.db_pgbouncer = get_env_bool("DB_PGBOUNCER")
+        # Direct connection for the clip events LISTEN, which PgBouncer's transaction mode cannot carry.
+        self.database_listen_url = get_env("DATABASE_LISTEN_URL", default="")
+        # Read replicas for list and search queries; empty means everything reads the primary.
+        self.database_replica_urls = [
+            url.strip() for url in get_env("DATABASE_REPLICA_URLS", default="").split(",") if url.strip()
+        ]
+        self.db_replica_eject_seconds = get_env_int("DB_REPLICA_EJECT_SECONDS", default=30)
+        self.db_replica_sticky_seconds = get_env_int("DB_REPLICA_STICKY_SECONDS", default=5)
+        # Admission control; 0 disables the corresponding limit. See app.api.admission.
+        self.admission_read_max_in_flight = get_env_int("ADMISSION_READ_MAX_IN_FLIGHT", default=0)
+        self.admission_write_max_in_flight = get_env_int("ADMISSION_WRITE_MAX_IN_FLIGHT", default=0)
+        self.admission_max_queue = get_env_int("ADMISSION_MAX_QUEUE", default=100)
+        self.admission_queue_target_ms = get_env_int("ADMISSION_QUEUE_TARGET_MS", default=100)
+        self.admission_client_rate = get_env_float("ADMISSION_CLIENT_RATE", default=0.0)
+        self.admission_client_burst = get_env_int("ADMISSION_CLIENT_BURST", default=20)
+        # Behind a reverse proxy: read the client address from this header, when sent by a trusted proxy.
+        self.client_address_header = get_env("CLIENT_ADDRESS_HEADER", default="").strip().lower()
+        trusted_proxies = get_env("TRUSTED_PROXIES", default="127.0.0.1,::1")
+        self.trusted_proxies = frozenset(address.strip() for address in trusted_proxies.split(",") if address.strip())
+        self.metrics_enabled = get_env_bool("METRICS_ENABLED", default=True)
+        # Debug only: profile requests sent with X-Profile, plus a random sample.
+        self.profiling_enabled = get_env_bool("PROFILING_ENABLED")
+        self.profiling_sample_rate = get_env_float("PROFILING_SAMPLE_RATE", default=0.0)
+        self.profiling_dir = get_env(
+            "PROFILING_DIR", default=os.path.join(tempfile.gettempdir(), "clipboard-sync-profiles")
+        )
+        # Without a token, only clients on this host may request a profile.
+        self.profiling_token = get_env("PROFILING_TOKEN", default="")
+        self.profiling_max_files = get_env_int("PROFILING_MAX_FILES", default=100)
+        self.clip_batch_max_items = get_env_int("CLIP_BATCH_MAX_ITEMS", default=10_000)
+        self.clip_batch_max_bytes = get_env_int("CLIP_BATCH_MAX_BYTES", default=32 * 1024 * 1024)
+        self.clip_delete_batch_size = get_env_int("CLIP_DELETE_BATCH_SIZE", default=1000)
+        # Group commit: coalesce concurrent POST /clip requests into shared transactions.
+        self.clip_group_commit = get_env_bool("CLIP_GROUP_COMMIT")
+        self.clip_group_commit_max_batch = get_env_int("CLIP_GROUP_COMMIT_MAX_BATCH", default=256)
+        self.clip_group_commit_max_wait_ms = get_env_int("CLIP_GROUP_COMMIT_MAX_WAIT_MS", default=2)
+        self.recent_clips_cache_enabled = get_env_bool("RECENT_CLIPS_CACHE_ENABLED", default=True)
+        self.recent_clips_cache_size = get_env_int("RECENT_CLIPS_CACHE_SIZE", default=200)
+        # Clip bodies larger than the inline limit go to the compressed blob store.
+        self.clip_max_content_bytes = get_env_int("CLIP_MAX_CONTENT_BYTES", default=8 * 1024 * 1024)
+        self.clip_inline_max_bytes = get_env_int("CLIP_INLINE_MAX_BYTES", default=8 * 1024)
+        self.clip_preview_chars = get_env_int("CLIP_PREVIEW_CHARS", default=200)
+        self.clip_cache_max_age_seconds = get_env_int("CLIP_CACHE_MAX_AGE_SECONDS", default=3600)
+        self.clips_partitioned = get_env_bool("CLIPS_PARTITIONED")
+        self.clips_partition_months_ahead = get_env_int("CLIPS_PARTITION_MONTHS_AHEAD", default=3)
+        # Retention limits; 0 or unset disables the corresponding rule.
+        self.retention_max_age_days = get_env_int("CLIP_RETENTION_MAX_AGE_DAYS", default=0)
+        self.retention_max_rows = get_env_int("CLIP_RETENTION_MAX_ROWS", default=0)
+        self.retention_type_max_rows = get_env_int_map("CLIP_RETENTION_TYPE_MAX_ROWS")
+        self.tombstone_max_age_days = get_env_int("CLIP_TOMBSTONE_MAX_AGE_DAYS", default=0)
+        self.retention_interval_seconds = get_env_int("CLIP_RETENTION_INTERVAL_SECONDS", default=300)
+        self.retention_batch_size = get_env_int("CLIP_RETENTION_BATCH_SIZE", default=500)
+        self.retention_batch_pause_ms = get_env_int("CLIP_RETENTION_BATCH_PAUSE_MS", default=50)
+        self.reconcile_refresh_seconds = get_env_float("RECONCILE_REFRESH_SECONDS", default=2.0)
+        self.reconcile_idle_seconds = get_env_float("RECONCILE_IDLE_SECONDS", default=300.0)
 
     @property
     def is_development(self) -> bool:
@@ -114,5 +247,10 @@ __all__ = [
     "build_test_database_url",
     "ensure_leading_slash",
     "get_env",
+    "get_env_bool",
+    "get_env_choice",
+    "get_env_float",
+    "get_env_int",
+    "get_env_int_map",
     "load_settings",
 ]
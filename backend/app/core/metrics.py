@@ -0,0 +1,252 @@
+"""Minimal Prometheus metric types and text exposition.
+
+Only what the backend exports is implemented: counters, gauges (set directly
+or computed at scrape time) and fixed-bucket histograms, each with labels.
+Counters and histograms, which sit on the request and query hot paths, are
+updated without locks: each thread writes to its own shard and the shards
+are summed when read or scraped.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans sub-millisecond cache hits to multi-second bulk operations.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Bytes; from empty responses to the largest clip bodies.
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _Sharded(_Metric):
+    """Keeps one value table per updating thread so updates need no lock."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[LabelValues, object]] = []
+
+    def _shard(self) -> Dict[LabelValues, object]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values: Dict[LabelValues, object] = {}
+            with self._lock:
+                self._shards.append(values)
+            self._local.values = values
+            return values
+
+    def _snapshot(self) -> List[Dict[LabelValues, object]]:
+        # Readers may see an update in flight on another thread a moment late, never a torn value.
+        with self._lock:
+            shards = list(self._shards)
+        return [dict(shard) for shard in shards]
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def _totals(self) -> Dict[LabelValues, float]:
+        totals: Dict[LabelValues, float] = {}
+        for shard in self._snapshot():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0.0) + value
+        return totals
+
+    def value(self, labels: LabelValues = ()) -> float:
+        return self._totals().get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        values = sorted(self._totals().items())
+        return self._header() + [
+            f"{self.name}_total{_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in values
+        ]
+
+
+class Gauge(_Metric):
+    """A gauge set by the application, or read from ``callback`` when scraped."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        callback: Optional[Callable[[], Iterable[Tuple[LabelValues, float]]]] = None,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+    def value(self, labels: LabelValues = ()) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        if self._callback is not None:
+            values = sorted(self._callback())
+        else:
+            with self._lock:
+                values = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in values
+        ]
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), *, buckets: Sequence[float]
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        shard = self._shard()
+        # Per label set: one count per bucket plus +Inf, then the running sum.
+        counts = shard.get(labels)
+        if counts is None:
+            counts = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[index] += 1
+        counts[-1] += value
+
+    def _merged(self) -> Dict[LabelValues, List[float]]:
+        merged: Dict[LabelValues, List[float]] = {}
+        for shard in self._snapshot():
+            for labels, counts in shard.items():
+                total = merged.get(labels)
+                if total is None:
+                    merged[labels] = list(counts)
+                else:
+                    for index, count in enumerate(counts):
+                        total[index] += count
+        return merged
+
+    def count(self, labels: LabelValues = ()) -> int:
+        return int(sum(self._merged().get(labels, [0.0])[:-1]))
+
+    def total(self, labels: LabelValues = ()) -> float:
+        """Sum of all observed values."""
+
+        return self._merged().get(labels, [0.0])[-1]
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, counts in sorted(self._merged().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, **kwargs))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), *, buckets: Sequence[float]
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry served by ``GET /metrics``.
+registry = MetricsRegistry()
+
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "LATENCY_BUCKETS",
+    "MetricsRegistry",
+    "SIZE_BUCKETS",
+    "registry",
+]
@@ -0,0 +1,72 @@
+"""Per-request profile data: SQL statement accounting and CPU time by package.
+
+The profiling middleware stores a :class:`RequestProfile` in a context
+variable for the duration of a request. Context variables follow the request
+into the threadpool that runs sync dependencies and endpoints, so the engine
+hooks in :mod:`app.db.instrumentation` can attribute every statement issued
+through ``get_db`` to the request that issued it.
+"""
+from __future__ import annotations
+
+import pstats
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+
+# Statements kept verbatim per request; the count and total time cover all of them.
+MAX_RECORDED_STATEMENTS = 500
+
+# Packages reported separately in Server-Timing; the rest of the profile is "other".
+PACKAGES: Tuple[Tuple[str, str], ...] = (
+    ("pydantic", "/pydantic"),
+    ("sqlalchemy", "/sqlalchemy/"),
+    ("fastapi", "/fastapi/"),
+    ("fastapi", "/starlette/"),
+    ("app", "/app/"),
+)
+
+
+class RequestProfile:
+    """What one profiled request spent its time on."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.statements: List[Tuple[str, float]] = []
+        self.package_seconds: Dict[str, float] = {}
+
+    def record_statement(self, statement: str, seconds: float) -> None:
+        self.sql_count += 1
+        self.sql_seconds += seconds
+        if len(self.statements) < MAX_RECORDED_STATEMENTS:
+            self.statements.append((statement, seconds))
+
+    def record_stats(self, stats: pstats.Stats) -> None:
+        """Attribute the profile's own time to :data:`PACKAGES` by source file."""
+
+        totals = dict.fromkeys([name for name, _ in PACKAGES] + ["other"], 0.0)
+        for (filename, _, _), (_, _, own_time, _, _) in stats.stats.items():
+            normalized = filename.replace("\\", "/")
+            package = next((name for name, marker in PACKAGES if marker in normalized), "other")
+            totals[package] += own_time
+        self.package_seconds = totals
+
+    def server_timing(self, *, profile_id: Optional[str] = None) -> str:
+        """Render a ``Server-Timing`` header value; durations are milliseconds."""
+
+        entries = [
+            f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}",
+            f'sql;dur={self.sql_seconds * 1000:.2f};desc="{self.sql_count} statements"',
+        ]
+        entries.extend(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.package_seconds.items())
+        if profile_id is not None:
+            entries.append(f'profile;desc="{profile_id}"')
+        return ", ".join(entries)
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+__all__ = ["MAX_RECORDED_STATEMENTS", "RequestProfile", "current_profile"]
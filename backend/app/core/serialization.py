@@ -0,0 +1,40 @@
+"""JSON encoding for hot response paths.
+
+``orjson`` is used when the optional package is installed; otherwise encoding
+falls back to the standard library. Both produce the same compact output as
+FastAPI's own encoder for the types list endpoints return: naive datetimes as
+ISO 8601 and dataclasses as objects in field order.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from typing import Any
+
+try:  # pragma: no cover - exercised through whichever encoder is installed
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if is_dataclass(value) and not isinstance(value, type):
+        return {field.name: getattr(value, field.name) for field in fields(value)}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """Encode ``value`` as compact UTF-8 JSON."""
+
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+__all__ = ["JSON_BACKEND", "dumps"]
@@ -3,23 +3,39 @@
 from .base import Base
 from .session import (
     DATABASE_URL,
+    AsyncSessionLocal,
     DatabaseManager,
     SessionLocal,
+    async_engine,
+    build_async_database_url,
+    check_indexes,
+    create_indexes,
+    create_schema,
     create_tables,
     db_manager,
     engine,
+    ensure_columns,
+    get_async_db,
     get_db,
     get_db_session,
 )
 
 __all__ = [
+    "AsyncSessionLocal",
     "DATABASE_URL",
     "DatabaseManager",
     "SessionLocal",
     "Base",
+    "async_engine",
+    "build_async_database_url",
+    "check_indexes",
+    "create_indexes",
+    "create_schema",
     "create_tables",
     "db_manager",
     "engine",
+    "ensure_columns",
+    "get_async_db",
     "get_db",
     "get_db_session",
 ]
@@ -1,9 +1,34 @@
 """Declarative base definition for SQLAlchemy models."""
 
+from sqlalchemy import DateTime
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.sql.expression import FunctionElement
 
 
 Base = declarative_base()
 
 
-__all__ = ["Base"]
+class precise_now(FunctionElement):
+    """Current transaction timestamp with sub-second precision on every backend.
+
+    SQLite's ``CURRENT_TIMESTAMP`` truncates to whole seconds and uses a different
+    text layout than SQLAlchemy's bound datetimes, which breaks ordering and
+    ``(created_at, id)`` comparisons there.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(precise_now)
+def _compile_precise_now(element, compiler, **kw):
+    return "now()"
+
+
+@compiles(precise_now, "sqlite")
+def _compile_precise_now_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+__all__ = ["Base", "precise_now"]
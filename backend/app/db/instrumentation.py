@@ -0,0 +1,188 @@
+"""Connection pool and query metrics for the application's engines.
+
+:func:`instrument_engine` times every statement around the dialect's execute
+calls and exposes the engine's pool occupancy as scrape-time gauges. Checkout
+waits are only visible from inside the pool, so the engines are built with
+:class:`TimedQueuePool` (or its asyncio counterpart) when metrics are enabled.
+:func:`profile_statements` charges statements to the request being profiled
+(see :mod:`app.core.profiling`).
+"""
+from __future__ import annotations
+
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.core.metrics import LATENCY_BUCKETS, registry
+from app.core.profiling import current_profile
+
+
+QUERY_SECONDS = registry.histogram(
+    "db_query_duration_seconds",
+    "Time spent executing SQL statements, by engine and statement kind.",
+    ("engine", "operation"),
+    buckets=LATENCY_BUCKETS,
+)
+
+POOL_WAIT_SECONDS = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time taken to obtain a pooled connection, including connecting when the pool grows.",
+    ("engine",),
+    buckets=LATENCY_BUCKETS,
+)
+
+# Statement kinds reported as-is; anything else is grouped under "OTHER".
+_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK"})
+
+_engines: Dict[str, Engine] = {}
+
+
+# Compiled statements are cached by SQLAlchemy, so the same few strings recur.
+@lru_cache(maxsize=1024)
+def statement_operation(statement: str) -> str:
+    keyword = statement.lstrip()[:8].split(None, 1)
+    operation = keyword[0].upper() if keyword else ""
+    return operation if operation in _OPERATIONS else "OTHER"
+
+
+class _TimedCheckout:
+    _metrics_label = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - started, (self._metrics_label,))
+
+    def recreate(self):
+        # Called by Engine.dispose(); keep reporting under the same label.
+        pool = super().recreate()
+        pool._metrics_label = self._metrics_label
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """``QueuePool`` that records how long each checkout took."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` that records how long each checkout took."""
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Record statement durations and pool occupancy for ``engine`` under ``name``.
+
+    Pass ``AsyncEngine.sync_engine`` for an asyncio engine.
+    """
+
+    if name in _engines:
+        return
+    _engines[name] = engine
+
+    # Wrapping the dialect's execute methods rather than listening for cursor events: any
+    # cursor listener moves every statement onto SQLAlchemy's event dispatch path, which
+    # costs several times more than the timing itself.
+    dialect = engine.dialect
+    for method in ("do_execute", "do_execute_no_params", "do_executemany"):
+        setattr(dialect, method, _timed_execute(getattr(dialect, method), name))
+
+    engine.pool._metrics_label = name
+
+
+def _timed_execute(execute: Callable[..., None], name: str) -> Callable[..., None]:
+    def timed(cursor, statement, *args):
+        started = time.perf_counter()
+        try:
+            return execute(cursor, statement, *args)
+        finally:
+            QUERY_SECONDS.observe(time.perf_counter() - started, (name, statement_operation(statement)))
+
+    return timed
+
+
+def profile_statements(engine: Engine) -> None:
+    """Charge statements run on ``engine`` to the request being profiled, if any."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and current_profile.get() is not None:
+            context._profile_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_profile_started", None)
+        profile = current_profile.get()
+        if started is not None and profile is not None:
+            profile.record_statement(statement, time.perf_counter() - started)
+
+
+def pool_stats(engine: Engine) -> Dict[str, object]:
+    """Current occupancy and settings of ``engine``'s pool, plus checkout waits when timed."""
+
+    pool: Pool = engine.pool
+    stats: Dict[str, object] = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            timeout_seconds=pool.timeout(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, _TimedCheckout):
+        labels = (pool._metrics_label,)
+        checkouts = POOL_WAIT_SECONDS.count(labels)
+        mean_wait: Optional[float] = POOL_WAIT_SECONDS.total(labels) / checkouts * 1000 if checkouts else None
+        stats.update(checkouts=checkouts, mean_checkout_wait_ms=mean_wait)
+    return stats
+
+
+def _pool_values(read) -> Iterable[Tuple[Tuple[str, ...], float]]:
+    for name, engine in list(_engines.items()):
+        pool: Pool = engine.pool
+        if isinstance(pool, QueuePool):
+            yield (name,), float(read(pool))
+
+
+registry.gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool.",
+    ("engine",),
+    callback=lambda: _pool_values(QueuePool.checkedout),
+)
+registry.gauge(
+    "db_pool_checked_in_connections",
+    "Idle connections held by the pool.",
+    ("engine",),
+    callback=lambda: _pool_values(QueuePool.checkedin),
+)
+registry.gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond the pool size; negative while the pool is still filling.",
+    ("engine",),
+    callback=lambda: _pool_values(QueuePool.overflow),
+)
+registry.gauge(
+    "db_pool_size",
+    "Configured number of persistent connections in the pool.",
+    ("engine",),
+    callback=lambda: _pool_values(QueuePool.size),
+)
+
+
+__all__ = [
+    "POOL_WAIT_SECONDS",
+    "QUERY_SECONDS",
+    "TimedAsyncAdaptedQueuePool",
+    "TimedQueuePool",
+    "instrument_engine",
+    "pool_stats",
+    "profile_statements",
+    "statement_operation",
+]
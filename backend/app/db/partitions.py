@@ -0,0 +1,235 @@
+"""Monthly range partitioning of the ``clips`` table on PostgreSQL.
+
+Enabled with ``CLIPS_PARTITIONED=true`` for new databases. The partitioned
+table is derived from the ``ClipboardEntry`` table so both layouts stay in
+step, with two differences PostgreSQL requires: the primary key includes the
+partition key, and ``(type, content_hash)`` cannot be globally unique, so the
+clipboard service deduplicates under advisory locks instead of ``ON CONFLICT``.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import Index, MetaData, PrimaryKeyConstraint, Table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+
+
+logger = logging.getLogger(__name__)
+
+CLIPS_TABLE = "clips"
+
+# Replaces the unique ``ux_clips_type_content_hash`` index on partitioned tables.
+DEDUP_LOOKUP_INDEX = "ix_clips_type_content_hash"
+
+_PARTITION_NAME = re.compile(rf"^{CLIPS_TABLE}_(\d{{4}})(\d{{2}})$")
+
+_partitioned_by_url: Dict[str, bool] = {}
+_partitioned_lock = threading.Lock()
+
+
+class ClipPartition(NamedTuple):
+    name: str
+    start: datetime
+    end: datetime
+
+
+def _month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_for(moment: datetime) -> ClipPartition:
+    """Return the monthly partition that holds rows created at ``moment``."""
+
+    start = _month_start(moment)
+    return ClipPartition(f"{CLIPS_TABLE}_{start:%Y%m}", start, _add_months(start, 1))
+
+
+def partitioned_clips_table(metadata: Optional[MetaData] = None) -> Table:
+    """Build the partitioned variant of the ``clips`` table."""
+
+    from app.models import ClipBlob, ClipboardEntry
+
+    metadata = metadata or MetaData()
+    # Copied alongside so the clips -> clip_blobs foreign key resolves.
+    ClipBlob.__table__.to_metadata(metadata)
+    table = ClipboardEntry.__table__.to_metadata(metadata)
+    table.dialect_options["postgresql"]["partition_by"] = "RANGE (created_at)"
+    table.c.id.autoincrement = True
+    table.c.created_at.primary_key = True
+    table.append_constraint(PrimaryKeyConstraint(table.c.id, table.c.created_at))
+    for index in list(table.indexes):
+        if index.unique:
+            table.indexes.discard(index)
+    Index(DEDUP_LOOKUP_INDEX, table.c.type, table.c.content_hash)
+    return table
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """Whether ``clips`` is a partitioned table, cached per database."""
+
+    if connection.dialect.name != "postgresql":
+        return False
+
+    key = str(connection.engine.url)
+    with _partitioned_lock:
+        partitioned = _partitioned_by_url.get(key)
+    if partitioned is None:
+        partitioned = bool(
+            connection.execute(
+                text("SELECT EXISTS (SELECT 1 FROM pg_class WHERE oid = to_regclass(:table) AND relkind = 'p')"),
+                {"table": CLIPS_TABLE},
+            ).scalar_one()
+        )
+        with _partitioned_lock:
+            _partitioned_by_url[key] = partitioned
+    return partitioned
+
+
+def create_partitioned_clips(bind: Engine) -> None:
+    """Create ``clips`` as a partitioned table unless a ``clips`` table already exists."""
+
+    if bind.dialect.name != "postgresql":
+        raise RuntimeError("CLIPS_PARTITIONED requires a PostgreSQL database.")
+
+    table = partitioned_clips_table()
+    with bind.begin() as connection:
+        if bind.dialect.has_table(connection, CLIPS_TABLE):
+            if not is_partitioned(connection):
+                logger.warning("Table %s exists and is not partitioned; leaving it as is", CLIPS_TABLE)
+                return
+        else:
+            connection.execute(CreateTable(table))
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+    with _partitioned_lock:
+        _partitioned_by_url.pop(str(bind.url), None)
+
+
+def list_partitions(connection: Connection) -> List[ClipPartition]:
+    """Return the monthly partitions of ``clips``, oldest first."""
+
+    names = connection.execute(
+        text(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(:table)
+            """
+        ),
+        {"table": CLIPS_TABLE},
+    ).scalars()
+    return _partitions_named(names)
+
+
+def detached_partitions(connection: Connection) -> List[ClipPartition]:
+    """Return monthly tables detached from ``clips`` but not yet dropped, oldest first."""
+
+    names = connection.execute(
+        text(
+            """
+            SELECT relname FROM pg_class
+            WHERE relkind = 'r' AND NOT relispartition
+            AND relnamespace = (SELECT relnamespace FROM pg_class WHERE oid = to_regclass(:table))
+            """
+        ),
+        {"table": CLIPS_TABLE},
+    ).scalars()
+    return _partitions_named(names)
+
+
+def _partitions_named(names: Iterable[str]) -> List[ClipPartition]:
+    partitions = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions.append(partition_for(datetime(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition.start)
+
+
+def ensure_partitions(bind: Engine, *, months_ahead: int, now: Optional[datetime] = None) -> List[str]:
+    """Create partitions from the current month through ``months_ahead`` months ahead.
+
+    Returns the names of partitions that had to be created.
+    """
+
+    current = _month_start(now or datetime.now(timezone.utc).replace(tzinfo=None))
+    created = []
+    with bind.begin() as connection:
+        existing = {partition.name for partition in list_partitions(connection)}
+        for offset in range(months_ahead + 1):
+            partition = partition_for(_add_months(current, offset))
+            if partition.name in existing:
+                continue
+            connection.execute(
+                text(
+                    f'CREATE TABLE IF NOT EXISTS "{partition.name}" PARTITION OF {CLIPS_TABLE} '
+                    f"FOR VALUES FROM ('{partition.start:%Y-%m-%d}') TO ('{partition.end:%Y-%m-%d}')"
+                )
+            )
+            created.append(partition.name)
+    return created
+
+
+def expired_partitions(connection: Connection, *, before: datetime) -> List[ClipPartition]:
+    """Partitions whose every row was created before ``before``."""
+
+    return [partition for partition in list_partitions(connection) if partition.end <= before]
+
+
+def detach_partition(bind: Engine, partition: ClipPartition) -> None:
+    """Detach a partition from ``clips`` without blocking reads and writes of the other partitions.
+
+    ``DETACH PARTITION ... CONCURRENTLY`` (PostgreSQL 14+) takes only a SHARE
+    UPDATE EXCLUSIVE lock on ``clips`` but cannot run inside a transaction, so
+    it gets an autocommit connection of its own. A detach interrupted part way
+    is completed with ``FINALIZE``.
+    """
+
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        pending = connection.execute(
+            text(
+                "SELECT inhdetachpending FROM pg_inherits "
+                "WHERE inhrelid = to_regclass(:partition) AND inhparent = to_regclass(:table)"
+            ),
+            {"partition": partition.name, "table": CLIPS_TABLE},
+        ).scalar_one_or_none()
+        if pending is None:
+            return
+        mode = "FINALIZE" if pending else "CONCURRENTLY"
+        connection.execute(text(f'ALTER TABLE {CLIPS_TABLE} DETACH PARTITION "{partition.name}" {mode}'))
+
+
+def drop_partition(connection: Connection, partition: ClipPartition) -> None:
+    """Drop a detached partition and all its rows; far cheaper than deleting them row by row.
+
+    Call :func:`detach_partition` first: dropping a partition still attached
+    locks ``clips`` ACCESS EXCLUSIVE, stalling every query on it.
+    """
+
+    connection.execute(text(f'DROP TABLE IF EXISTS "{partition.name}"'))
+
+
+__all__ = [
+    "CLIPS_TABLE",
+    "ClipPartition",
+    "create_partitioned_clips",
+    "detach_partition",
+    "detached_partitions",
+    "drop_partition",
+    "ensure_partitions",
+    "expired_partitions",
+    "is_partitioned",
+    "list_partitions",
+    "partition_for",
+    "partitioned_clips_table",
+]
@@ -0,0 +1,104 @@
+"""Routing of read-only sessions to PostgreSQL read replicas.
+
+Configured with ``DATABASE_REPLICA_URLS``. Reads rotate round-robin over the
+replicas; one that fails to connect or drops its connection is ejected for
+``DB_REPLICA_EJECT_SECONDS`` and reads fall back to the others, or to the
+primary when none is left.
+
+Replicas lag the primary, so a client that has just written is pinned to the
+primary for ``DB_REPLICA_STICKY_SECONDS`` (see :meth:`ReplicaRouter.mark_write`):
+the clip it just created is always in its next listing.
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+logger = logging.getLogger(__name__)
+
+# Clients remembered at most; expired entries are dropped once this is reached.
+MAX_STICKY_CLIENTS = 10_000
+
+
+class ReplicaRouter:
+    """Chooses replica engines for reads and tracks which clients must read the primary."""
+
+    def __init__(
+        self, replicas: Sequence[Tuple[str, Engine]], *, eject_seconds: float = 30.0, sticky_seconds: float = 5.0
+    ) -> None:
+        self.replicas = list(replicas)
+        self.eject_seconds = eject_seconds
+        self.sticky_seconds = sticky_seconds
+        self._lock = threading.Lock()
+        self._rotation = itertools.count()
+        self._ejected_until: Dict[str, float] = {}
+        self._sticky_until: Dict[str, float] = {}
+        self._ejections = 0
+        for name, engine in self.replicas:
+            self.watch(name, engine)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def watch(self, name: str, engine: Engine) -> None:
+        """Eject replica ``name`` when ``engine``, one of its engines, loses a connection."""
+
+        @event.listens_for(engine, "handle_error")
+        def _eject_on_disconnect(context):
+            if context.is_disconnect:
+                self.eject(name)
+
+    def candidates(self) -> List[Tuple[str, Engine]]:
+        """Healthy replicas, starting with the next one in the rotation."""
+
+        now = time.monotonic()
+        with self._lock:
+            healthy = [
+                (name, engine) for name, engine in self.replicas if self._ejected_until.get(name, 0.0) <= now
+            ]
+            if not healthy:
+                return []
+            start = next(self._rotation) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def eject(self, name: str) -> None:
+        with self._lock:
+            if self._ejected_until.get(name, 0.0) <= time.monotonic():
+                self._ejections += 1
+                logger.warning("Read replica %s is unavailable; ejecting it for %ss", name, self.eject_seconds)
+            self._ejected_until[name] = time.monotonic() + self.eject_seconds
+
+    def mark_write(self, client: str) -> None:
+        """Send reads from ``client`` to the primary until the replicas have caught up."""
+
+        now = time.monotonic()
+        with self._lock:
+            if len(self._sticky_until) >= MAX_STICKY_CLIENTS:
+                self._sticky_until = {key: until for key, until in self._sticky_until.items() if until > now}
+            self._sticky_until[client] = now + self.sticky_seconds
+
+    def is_sticky(self, client: str) -> bool:
+        with self._lock:
+            return self._sticky_until.get(client, 0.0) > time.monotonic()
+
+    def stats(self) -> Dict[str, object]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "replicas": [
+                    {"name": name, "healthy": self._ejected_until.get(name, 0.0) <= now} for name, _ in self.replicas
+                ],
+                "ejections": self._ejections,
+                "sticky_clients": sum(1 for until in self._sticky_until.values() if until > now),
+            }
+
+
+__all__ = ["MAX_STICKY_CLIENTS", "ReplicaRouter"]
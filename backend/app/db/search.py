@@ -0,0 +1,190 @@
+"""PostgreSQL search structures for clips that the ORM models cannot declare.
+
+The ``search_vector`` generated column and the GIN indexes only exist on
+PostgreSQL, so they are created with raw DDL rather than on the model, once,
+by ``create_search_indexes.py``: adding the column rewrites ``clips`` and the
+indexes are built ``CONCURRENTLY``, neither of which belongs in startup.
+Startup only checks which indexes exist. Other backends, or PostgreSQL
+without them, fall back to LIKE scans.
+
+Everything is built on ``clips.content``, which for a body stored in the blob
+store holds only its first 1024 characters, so search never sees the rest.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Dict, List, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+from app.db.partitions import CLIPS_TABLE, is_partitioned, list_partitions
+
+
+logger = logging.getLogger(__name__)
+
+# The "simple" configuration keeps clips language-agnostic: no stemming or stop words.
+SEARCH_CONFIG = "simple"
+
+SEARCH_VECTOR_COLUMN = "search_vector"
+
+FULL_TEXT_INDEX = "ix_clips_search_vector"
+TRIGRAM_INDEX = "ix_clips_content_trgm"
+
+_ADD_SEARCH_VECTOR = f"""
+    ALTER TABLE {CLIPS_TABLE} ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR_COLUMN} tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('{SEARCH_CONFIG}', content), 'B')
+    ) STORED
+"""
+
+# Index name -> what follows ``ON <table>`` in its definition.
+_SEARCH_INDEXES = {
+    FULL_TEXT_INDEX: f"USING GIN ({SEARCH_VECTOR_COLUMN})",
+    TRIGRAM_INDEX: "USING GIN (content gin_trgm_ops)",
+}
+
+
+class SearchSupport(NamedTuple):
+    """Which index-backed search strategies the database offers."""
+
+    full_text: bool
+    trigram: bool
+
+
+_NO_SUPPORT = SearchSupport(full_text=False, trigram=False)
+_support_by_url: Dict[str, SearchSupport] = {}
+_support_lock = threading.Lock()
+
+
+def create_search_indexes(bind: Engine) -> List[str]:
+    """Add the search column and build the GIN indexes without blocking writes to ``clips``.
+
+    Adding the generated column rewrites the table under an exclusive lock,
+    once. Each index is then built ``CONCURRENTLY``; an invalid index left by
+    an interrupted build is rebuilt. On a partitioned ``clips`` the index is
+    declared on the parent only, built on each partition and attached, since
+    PostgreSQL cannot build a partitioned index concurrently. Returns the
+    names of the indexes that are in place.
+    """
+
+    if bind.dialect.name != "postgresql":
+        return []
+    created = []
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for feature, statement in (("trigram", "CREATE EXTENSION IF NOT EXISTS pg_trgm"), ("full-text", _ADD_SEARCH_VECTOR)):
+            try:
+                connection.execute(text(statement))
+            except DBAPIError:
+                # Typically a missing extension or privilege; search degrades to LIKE.
+                logger.warning("Could not enable %s search", feature, exc_info=True)
+        for name, definition in _SEARCH_INDEXES.items():
+            try:
+                if is_partitioned(connection):
+                    _create_partitioned_index(connection, name, definition)
+                else:
+                    _create_index_concurrently(connection, name, CLIPS_TABLE, definition)
+            except DBAPIError:
+                logger.warning("Could not create index %s; falling back to LIKE scans", name, exc_info=True)
+            else:
+                created.append(name)
+    with _support_lock:
+        _support_by_url.pop(str(bind.url), None)
+    return created
+
+
+def _create_index_concurrently(connection: Connection, name: str, table: str, definition: str) -> None:
+    valid = connection.execute(
+        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": name}
+    ).scalar_one_or_none()
+    if valid:
+        return
+    if valid is not None:
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    connection.execute(text(f'CREATE INDEX CONCURRENTLY {name} ON "{table}" {definition}'))
+
+
+def _create_partitioned_index(connection: Connection, name: str, definition: str) -> None:
+    # Stays invalid, and unused, until every partition has its index attached.
+    connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {CLIPS_TABLE} {definition}"))
+    for partition in list_partitions(connection):
+        partition_index = f"{partition.name}_{name.removeprefix('ix_clips_')}"
+        _create_index_concurrently(connection, partition_index, partition.name, definition)
+        connection.execute(text(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}"))
+
+
+def check_search_indexes(bind: Engine) -> SearchSupport:
+    """Detect the search indexes at startup and warn when ``create_search_indexes.py`` has not run."""
+
+    if bind.dialect.name != "postgresql":
+        return _NO_SUPPORT
+    with _support_lock:
+        _support_by_url.pop(str(bind.url), None)
+    with bind.connect() as connection:
+        support = get_search_support(connection)
+    if not (support.full_text and support.trigram):
+        logger.warning(
+            "Search indexes are missing (full-text: %s, trigram: %s); search falls back to LIKE scans "
+            "until create_search_indexes.py is run",
+            support.full_text,
+            support.trigram,
+        )
+    return support
+
+
+def _detect_search_support(connection: Connection) -> SearchSupport:
+    full_text, trigram = connection.execute(
+        text(
+            """
+            SELECT
+                EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = :table AND column_name = :column
+                      AND table_schema = current_schema()
+                ) AND coalesce(
+                    (SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:full_text_index)), false
+                ),
+                EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') AND coalesce(
+                    (SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:trigram_index)), false
+                )
+            """
+        ),
+        {
+            "table": CLIPS_TABLE,
+            "column": SEARCH_VECTOR_COLUMN,
+            "full_text_index": FULL_TEXT_INDEX,
+            "trigram_index": TRIGRAM_INDEX,
+        },
+    ).one()
+    return SearchSupport(full_text=bool(full_text), trigram=bool(trigram))
+
+
+def get_search_support(connection: Connection) -> SearchSupport:
+    """Return the search strategies available on ``connection``, cached per database."""
+
+    if connection.dialect.name != "postgresql":
+        return _NO_SUPPORT
+
+    key = str(connection.engine.url)
+    with _support_lock:
+        support = _support_by_url.get(key)
+    if support is None:
+        support = _detect_search_support(connection)
+        with _support_lock:
+            _support_by_url[key] = support
+    return support
+
+
+__all__ = [
+    "SEARCH_CONFIG",
+    "SEARCH_VECTOR_COLUMN",
+    "FULL_TEXT_INDEX",
+    "SearchSupport",
+    "TRIGRAM_INDEX",
+    "check_search_indexes",
+    "create_search_indexes",
+    "get_search_support",
+]
@@ -1,32 +1,313 @@
 """Database session management for Clipboard Sync."""
 from __future__ import annotations
 
+import logging
 import os
-from typing import Generator
+import time
+import uuid
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import Index, create_engine, event, inspect, text
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.schema import CreateIndex
 
-from app.core.config import build_database_url
+from app.core.config import Settings, build_database_url, get_env, load_settings
 from app.db.base import Base
+from app.db.instrumentation import (
+    TimedAsyncAdaptedQueuePool,
+    TimedQueuePool,
+    instrument_engine,
+    pool_stats,
+    profile_statements,
+)
+from app.db.partitions import CLIPS_TABLE, create_partitioned_clips, ensure_partitions, is_partitioned
+from app.db.replicas import ReplicaRouter
+from app.db.search import check_search_indexes
 
 
-DATABASE_URL = build_database_url()
+logger = logging.getLogger(__name__)
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=os.getenv("SQL_DEBUG", "false").lower() == "true",
-)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# A full DATABASE_URL (e.g. a SQLite file for benchmarks) takes precedence over the POSTGRES_* parts.
+DATABASE_URL = get_env("DATABASE_URL") or build_database_url()
+
+_settings = load_settings()
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4().hex}__"
+
+
+def _timeout_options(settings: Settings) -> Dict[str, str]:
+    options = {}
+    if settings.db_statement_timeout_ms > 0:
+        options["statement_timeout"] = str(settings.db_statement_timeout_ms)
+    if settings.db_idle_in_transaction_timeout_ms > 0:
+        options["idle_in_transaction_session_timeout"] = str(settings.db_idle_in_transaction_timeout_ms)
+    return options
+
+
+def engine_options(url: str, settings: Settings, *, async_driver: bool = False) -> Dict[str, Any]:
+    """Keyword arguments for ``create_engine``/``create_async_engine`` built from the ``DB_*`` settings.
+
+    SQLite keeps the pool SQLAlchemy picks for it. With ``DB_PGBOUNCER`` the
+    application holds no connections of its own (PgBouncer pools them) and
+    asyncpg uses no named prepared statements, which a transaction-mode
+    pooler cannot route. Session timeouts are sent as startup parameters,
+    which PgBouncer rejects; set them on the database role there instead.
+    """
+
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.db_pool_pre_ping == "always",
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "echo": os.getenv("SQL_DEBUG", "false").lower() == "true",
+    }
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+
+    timeouts = _timeout_options(settings)
+    if settings.db_pgbouncer:
+        if timeouts:
+            logger.warning("DB_PGBOUNCER is set; configure %s on the database role instead", ", ".join(timeouts))
+        options.update(poolclass=NullPool, pool_pre_ping=False)
+        del options["pool_recycle"]
+        if async_driver:
+            options["connect_args"] = {
+                "prepared_statement_cache_size": 0,
+                "statement_cache_size": 0,
+                "prepared_statement_name_func": _unique_statement_name,
+            }
+        return options
+
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+    )
+    if settings.metrics_enabled:
+        options["poolclass"] = TimedAsyncAdaptedQueuePool if async_driver else TimedQueuePool
+    if timeouts:
+        if async_driver:
+            options["connect_args"] = {"server_settings": timeouts}
+        else:
+            options["connect_args"] = {"options": " ".join(f"-c {name}={value}" for name, value in timeouts.items())}
+    return options
+
+
+def install_idle_pre_ping(engine: Engine, *, idle_seconds: float) -> None:
+    """Ping pooled connections on checkout only when they sat idle for ``idle_seconds``.
+
+    ``pool_pre_ping`` pays a round trip on every checkout; connections in
+    steady use are almost never stale, so this pings only the ones that may
+    have been dropped by the server or a firewall while idle. A failed ping
+    makes the pool discard the connection and open a fresh one.
+    """
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except engine.dialect.loaded_dbapi.Error as exc:
+            raise DisconnectionError("Idle pooled connection failed its ping") from exc
+
+
+def _configure_engine(engine: Engine, name: str, settings: Settings) -> None:
+    if settings.db_pool_pre_ping == "idle" and not settings.db_pgbouncer:
+        install_idle_pre_ping(engine, idle_seconds=settings.db_pool_pre_ping_idle_seconds)
+    if settings.metrics_enabled:
+        instrument_engine(engine, name)
+    if settings.profiling_enabled:
+        profile_statements(engine)
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, _settings))
+_configure_engine(engine, "sync", _settings)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def _replica_name(url: str) -> str:
+    parsed = make_url(url)
+    return f"{parsed.host or 'local'}:{parsed.port or ''}/{parsed.database or ''}"
+
+
+def _create_replica_engine(url: str) -> Engine:
+    replica = create_engine(url, **engine_options(url, _settings))
+    _configure_engine(replica, f"replica {_replica_name(url)}", _settings)
+    return replica
+
+
+replica_router = ReplicaRouter(
+    [(_replica_name(url), _create_replica_engine(url)) for url in _settings.database_replica_urls],
+    eject_seconds=_settings.db_replica_eject_seconds,
+    sticky_seconds=_settings.db_replica_sticky_seconds,
+)
+
+# Sessions for replicas are bound per request to whichever replica is chosen.
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+def build_async_database_url(url: str) -> str:
+    """Translate a sync SQLAlchemy URL into its asyncio driver equivalent."""
+
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver is configured for database backend '{backend}'.")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def _create_async_engine(url: str, label: str = "async") -> AsyncEngine:
+    async_engine = create_async_engine(
+        build_async_database_url(url), **engine_options(url, _settings, async_driver=True)
+    )
+    _configure_engine(async_engine.sync_engine, label, _settings)
+    return async_engine
+
+
+# The async engine is only built when enabled so the asyncio driver stays optional.
+async_engine: Optional[AsyncEngine] = (
+    _create_async_engine(DATABASE_URL) if _settings.database_async else None
+)
+
+AsyncSessionLocal: Optional[async_sessionmaker[AsyncSession]] = (
+    async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
+
+# Async engines for the same replicas, by replica name, so async reads follow replica_router too.
+async_replica_engines: Dict[str, AsyncEngine] = {}
+if _settings.database_async:
+    for _url in _settings.database_replica_urls:
+        _name = _replica_name(_url)
+        async_replica_engines[_name] = _create_async_engine(_url, f"async replica {_name}")
+        replica_router.watch(_name, async_replica_engines[_name].sync_engine)
+
+AsyncReadSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+
 def create_tables() -> None:
     """Create all database tables defined by the ORM models."""
 
-    Base.metadata.create_all(bind=engine)
+    create_schema(engine)
+
+
+def create_schema(bind: Engine) -> None:
+    """Create tables, indexes and, when enabled, the ``clips`` partitions on ``bind``."""
+
+    settings = load_settings()
+    if settings.clips_partitioned:
+        # Must precede create_all, which would otherwise create a plain clips table.
+        create_partitioned_clips(bind)
+        ensure_partitions(bind, months_ahead=settings.clips_partition_months_ahead)
+    Base.metadata.create_all(bind=bind)
+    ensure_columns(bind)
+    check_indexes(bind)
+    check_search_indexes(bind)
+
+
+def ensure_columns(bind: Engine) -> None:
+    """Add nullable model columns missing from tables that predate them.
+
+    Only nullable columns can be added without a backfill; anything else needs
+    a dedicated migration script such as ``dedupe_clips.py``.
+    """
+
+    inspector = inspect(bind)
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+
+def check_indexes(bind: Engine) -> List[str]:
+    """Warn about model indexes missing from tables that predate them and return their names.
+
+    ``create_all`` skips existing tables entirely, including their indexes.
+    Building one on a large table would block writes to it, so startup only
+    reports them; ``create_indexes.py`` builds them without blocking.
+    """
+
+    missing = [index.name for index in _missing_indexes(bind)]
+    if missing:
+        logger.warning(
+            "Indexes missing from existing tables: %s; queries that need them scan until "
+            "create_indexes.py is run",
+            ", ".join(missing),
+        )
+    return missing
+
+
+def create_indexes(bind: Engine) -> List[str]:
+    """Build the model indexes missing from existing tables and return their names.
+
+    On PostgreSQL each is built ``CONCURRENTLY``, so the table stays writable,
+    after dropping any invalid copy an interrupted build left behind.
+    """
+
+    created = []
+    for index in _missing_indexes(bind):
+        if bind.dialect.name == "postgresql":
+            statement = str(CreateIndex(index, if_not_exists=True).compile(dialect=bind.dialect))
+            with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+                connection.execute(text(statement.replace(" INDEX ", " INDEX CONCURRENTLY ", 1)))
+        else:
+            index.create(bind=bind, checkfirst=True)
+        created.append(index.name)
+    return created
+
+
+def _missing_indexes(bind: Engine) -> List[Index]:
+    # A partitioned ``clips`` table keeps the indexes from :mod:`app.db.partitions`.
+    inspector = inspect(bind)
+    missing = []
+    with bind.connect() as connection:
+        skipped = {CLIPS_TABLE} if is_partitioned(connection) else set()
+        for table in Base.metadata.sorted_tables:
+            if table.name in skipped or not inspector.has_table(table.name):
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing or not _index_is_valid(connection, index.name):
+                    missing.append(index)
+    return missing
+
+
+def _index_is_valid(connection: Connection, name: str) -> bool:
+    if connection.dialect.name != "postgresql":
+        return True
+    valid = connection.execute(
+        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": name}
+    ).scalar_one_or_none()
+    return bool(valid)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -39,6 +320,16 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency that yields an asyncio database session."""
+
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database mode is disabled; set DATABASE_ASYNC=true to enable it.")
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def get_db_session() -> Session:
     """Return a database session for imperative usage."""
 
@@ -51,9 +342,10 @@ class DatabaseManager:
     def __init__(self) -> None:
         self.engine = engine
         self.SessionLocal = SessionLocal
+        self.async_engine = async_engine
 
     def create_tables(self) -> None:
-        Base.metadata.create_all(bind=self.engine)
+        create_schema(self.engine)
 
     def drop_tables(self) -> None:
         Base.metadata.drop_all(bind=self.engine)
@@ -61,6 +353,22 @@ class DatabaseManager:
     def get_session(self) -> Session:
         return self.SessionLocal()
 
+    def pool_stats(self) -> Dict[str, Dict[str, object]]:
+        stats = {"sync": pool_stats(self.engine)}
+        if self.async_engine is not None:
+            stats["async"] = pool_stats(self.async_engine.sync_engine)
+        for name, replica in replica_router.replicas:
+            stats[f"replica {name}"] = pool_stats(replica)
+        for name, replica in async_replica_engines.items():
+            stats[f"async replica {name}"] = pool_stats(replica.sync_engine)
+        return stats
+
+    async def dispose_async_engine(self) -> None:
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
+        for replica in async_replica_engines.values():
+            await replica.dispose()
+
     def health_check(self) -> bool:
         try:
             with self.engine.connect() as connection:
@@ -74,12 +382,26 @@ db_manager = DatabaseManager()
 
 
 __all__ = [
+    "AsyncReadSessionLocal",
+    "AsyncSessionLocal",
+    "ReadSessionLocal",
     "DATABASE_URL",
     "DatabaseManager",
     "SessionLocal",
+    "async_engine",
+    "async_replica_engines",
+    "build_async_database_url",
+    "check_indexes",
+    "create_indexes",
+    "create_schema",
     "create_tables",
     "db_manager",
     "engine",
+    "engine_options",
+    "ensure_columns",
+    "get_async_db",
     "get_db",
     "get_db_session",
+    "install_idle_pre_ping",
+    "replica_router",
 ]
@@ -1,17 +1,51 @@
 """FastAPI application factory."""
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routes import clipboard, health
+from app.api.admission import admission_controller
+from app.api.middleware import (
+    AdmissionControlMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    ReadYourWritesMiddleware,
+    RequestSizeLimitMiddleware,
+)
+from app.api.routes import clipboard, clipboard_async, health, metrics, stream
 from app.core.config import load_settings
-from app.db.session import db_manager
+from app.db.session import db_manager, replica_router
+from app.services.events import clip_event_broker
+from app.services.group_commit import group_commit_writer
+from app.services.reconcile import range_digest_cache
+from app.services.retention import retention_pruner
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    db_manager.create_tables()
+    clip_event_broker.start(db_manager.engine)
+    retention_pruner.start(db_manager.get_session)
+    group_commit_writer.start(db_manager.get_session)
+    # Refreshes only once a client calls /clips/reconcile.
+    range_digest_cache.start(db_manager.get_session)
+    try:
+        yield
+    finally:
+        await asyncio.to_thread(group_commit_writer.stop)
+        await range_digest_cache.stop()
+        await retention_pruner.stop()
+        clip_event_broker.stop()
+        await db_manager.dispose_async_engine()
 
 
 def create_app() -> FastAPI:
     settings = load_settings()
-    app = FastAPI(title="Clipboard Sync API", version="0.1.0")
+    app = FastAPI(title="Clipboard Sync API", version="0.1.0", lifespan=lifespan)
 
     if settings.cors_allow_all:
         app.add_middleware(
@@ -20,14 +54,35 @@ def create_app() -> FastAPI:
             allow_credentials=False,
             allow_methods=["*"],
             allow_headers=["*"],
+            expose_headers=["ETag", clipboard.NEXT_CURSOR_HEADER],
         )
 
-    @app.on_event("startup")
-    def _startup() -> None:
-        db_manager.create_tables()
+    # Batch items are all held in memory until their transaction commits.
+    app.add_middleware(RequestSizeLimitMiddleware, limits={("POST", "/clips/batch"): settings.clip_batch_max_bytes})
+    if replica_router.enabled:
+        app.add_middleware(ReadYourWritesMiddleware, router=replica_router)
+    if settings.profiling_enabled:
+        app.add_middleware(
+            ProfilingMiddleware,
+            sample_rate=settings.profiling_sample_rate,
+            directory=settings.profiling_dir,
+            token=settings.profiling_token,
+            max_profiles=settings.profiling_max_files,
+        )
+    if admission_controller.enabled:
+        # Outside the others so shed requests skip them.
+        app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+    if settings.metrics_enabled:
+        # Added last so it is outermost and its timings include the other middleware.
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics.router)
 
     app.include_router(health.router)
+    if settings.database_async:
+        # Registered first so the async handlers shadow their sync counterparts.
+        app.include_router(clipboard_async.router)
     app.include_router(clipboard.router)
+    app.include_router(stream.router)
 
     return app
 
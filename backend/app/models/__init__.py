@@ -1,5 +1,16 @@
 """SQLAlchemy ORM models for Clipboard Sync."""
 
-from .clipboard_entry import ClipboardEntry
+from .clip_blob import ClipBlob, ClipBlobChunk
+from .clip_change import ClipChange, PendingClipChange
+from .clip_sync_state import ClipSyncState
+from .clipboard_entry import ClipboardEntry, compute_content_hash
 
-__all__ = ["ClipboardEntry"]
+__all__ = [
+    "ClipBlob",
+    "ClipBlobChunk",
+    "ClipChange",
+    "ClipSyncState",
+    "ClipboardEntry",
+    "PendingClipChange",
+    "compute_content_hash",
+]
@@ -0,0 +1,53 @@
+"""SQLAlchemy models for the content-addressed store of large clip bodies."""
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, LargeBinary, String
+from sqlalchemy.orm import relationship
+
+from app.core.compression import decompress
+from app.db.base import Base, precise_now
+
+
+class ClipBlob(Base):
+    """A distinct clip body, stored once and keyed by the SHA-256 of its UTF-8 bytes.
+
+    Bodies are split into independently compressed chunks so they can be
+    written and streamed without holding the whole body in memory.
+    """
+
+    __tablename__ = "clip_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    stored_size = Column(BigInteger, nullable=False)
+    codec = Column(String(10), nullable=False)
+    created_at = Column(DateTime, default=precise_now(), nullable=False)
+
+    chunks = relationship(
+        "ClipBlobChunk",
+        order_by="ClipBlobChunk.seq",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"<ClipBlob sha256={self.sha256[:12]} size={self.size} codec={self.codec}>"
+
+    def read_bytes(self) -> bytes:
+        return b"".join(decompress(chunk.data, self.codec) for chunk in self.chunks)
+
+    def read_text(self) -> str:
+        return self.read_bytes().decode("utf-8")
+
+
+class ClipBlobChunk(Base):
+    """One compressed slice of a :class:`ClipBlob`, in ``seq`` order."""
+
+    __tablename__ = "clip_blob_chunks"
+
+    blob_sha256 = Column(String(64), ForeignKey("clip_blobs.sha256", ondelete="CASCADE"), primary_key=True)
+    seq = Column(Integer, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+
+
+__all__ = ["ClipBlob", "ClipBlobChunk"]
@@ -0,0 +1,51 @@
+"""SQLAlchemy model for the clips change log used by delta sync."""
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Index, Integer
+
+from app.db.base import Base, precise_now
+
+
+class ClipChange(Base):
+    """The latest change to one clip, numbered in commit order.
+
+    ``seq`` values are handed out from ``ClipSyncState.change_seq`` while the
+    generation row lock is held, so they increase in commit order and a client
+    that has applied every change up to some ``seq`` never misses a later one. Each clip keeps only its newest entry; a deleted clip's entry
+    is a tombstone.
+    """
+
+    __tablename__ = "clip_changes"
+
+    seq = Column(BigInteger, primary_key=True, autoincrement=False)
+    clip_id = Column(Integer, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)
+    changed_at = Column(DateTime, default=precise_now(), nullable=False)
+
+    __table_args__ = (
+        # One entry per clip: writers replace it rather than append.
+        Index("ux_clip_changes_clip_id", clip_id, unique=True),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"<ClipChange seq={self.seq} clip_id={self.clip_id} deleted={self.deleted}>"
+
+
+class PendingClipChange(Base):
+    """A committed clip change still waiting for its ``seq``.
+
+    Writers queue these in their own transaction; the short transaction that
+    bumps the generation afterwards moves them into :class:`ClipChange`.
+    """
+
+    __tablename__ = "clip_pending_changes"
+
+    clip_id = Column(Integer, primary_key=True, autoincrement=False)
+    deleted = Column(Boolean, nullable=False, default=False)
+    changed_at = Column(DateTime, default=precise_now(), nullable=False)
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"<PendingClipChange clip_id={self.clip_id} deleted={self.deleted}>"
+
+
+__all__ = ["ClipChange", "PendingClipChange"]
@@ -0,0 +1,32 @@
+"""SQLAlchemy model tracking the change generation of the clips table."""
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Column, Integer
+
+from app.db.base import Base
+
+
+class ClipSyncState(Base):
+    """Single-row counter advanced by every transaction that changes ``clips``.
+
+    Writers bump it in a short transaction right after committing their change,
+    so a reader that sees a given generation also sees every clip change it
+    counts.
+    """
+
+    __tablename__ = "clip_sync_state"
+
+    SINGLETON_ID = 1
+
+    id = Column(Integer, primary_key=True)
+    generation = Column(BigInteger, nullable=False, default=0)
+    # Last ``ClipChange.seq`` handed out; NULL until the first change is numbered.
+    change_seq = Column(BigInteger, nullable=True)
+    # Highest tombstone seq pruned; clients synced to an earlier seq must start over.
+    changes_floor = Column(BigInteger, nullable=True)
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"<ClipSyncState generation={self.generation}>"
+
+
+__all__ = ["ClipSyncState"]
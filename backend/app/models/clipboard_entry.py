@@ -1,10 +1,29 @@
 """SQLAlchemy model for clipboard entries."""
 from __future__ import annotations
 
-from sqlalchemy import CheckConstraint, Column, DateTime, Integer, String, Text
-from sqlalchemy.sql import func
+import hashlib
 
-from app.db.base import Base
+from sqlalchemy import CheckConstraint, Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import relationship
+
+from app.db.base import Base, precise_now
+
+
+def compute_content_hash(content: str) -> str:
+    """Return the SHA-256 hex digest used to deduplicate clip contents."""
+
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _default_content_hash(context) -> str | None:
+    content = context.get_current_parameters().get("content")
+    # Missing content is left for the NOT NULL constraint to reject.
+    return compute_content_hash(content) if content is not None else None
+
+
+def _default_content_length(context) -> int | None:
+    content = context.get_current_parameters().get("content")
+    return len(content.encode("utf-8")) if content is not None else None
 
 
 class ClipboardEntry(Base):
@@ -16,16 +35,36 @@ class ClipboardEntry(Base):
     content = Column(Text, nullable=False)
     type = Column(String(10), nullable=False)
     title = Column(String(500), nullable=True)
-    created_at = Column(DateTime, default=func.now(), nullable=False)
+    created_at = Column(DateTime, default=precise_now(), nullable=False)
+    content_hash = Column(String(64), nullable=False, default=_default_content_hash)
+    copy_count = Column(Integer, nullable=False, default=1, server_default="1")
+    # Size of the full body in UTF-8 bytes. Bodies too large to keep inline live in
+    # the blob store, and ``content`` then holds only their head.
+    content_length = Column(Integer, nullable=True, default=_default_content_length)
+    blob_sha256 = Column(String(64), ForeignKey("clip_blobs.sha256"), nullable=True, index=True)
+
+    blob = relationship("ClipBlob", lazy="select")
 
     __table_args__ = (
         CheckConstraint("type IN ('text', 'url')", name="check_clipboard_entry_type"),
+        # Serves the newest-first listing and keyset pagination on (created_at, id).
+        Index("ix_clips_created_at_id", created_at.desc(), id.desc()),
+        # Arbiter for the deduplicating upsert in the clipboard service.
+        Index("ux_clips_type_content_hash", type, content_hash, unique=True),
     )
 
     def __repr__(self) -> str:  # pragma: no cover - debug helper
         content_preview = (self.content or "")[:50]
         return f"<ClipboardEntry id={self.id} type={self.type!r} content={content_preview!r}>"
 
+    @property
+    def body(self) -> str:
+        """The full clip text, read back from the blob store when stored out of line."""
+
+        if self.blob_sha256 is None:
+            return self.content
+        return self.blob.read_text()
+
     def to_dict(self) -> dict[str, object]:
         """Return a serialisable representation for debugging or tests."""
 
@@ -35,7 +74,9 @@ class ClipboardEntry(Base):
             "type": self.type,
             "title": self.title,
             "created_at": self.created_at.isoformat() if self.created_at else None,
+            "copy_count": self.copy_count,
+            "content_length": self.content_length,
         }
 
 
-__all__ = ["ClipboardEntry"]
+__all__ = ["ClipboardEntry", "compute_content_hash"]
@@ -2,14 +2,18 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, model_validator
+
+
+# Hard ceiling on clip size; CLIP_MAX_CONTENT_BYTES sets the effective limit in bytes.
+CONTENT_MAX_LENGTH = 16 * 1024 * 1024
 
 
 class ClipboardEntryBase(BaseModel):
     type: Literal["text", "url"]
-    content: str = Field(..., min_length=1, max_length=10_000)
+    content: str = Field(..., min_length=1, max_length=CONTENT_MAX_LENGTH)
     title: Optional[str] = Field(default=None, max_length=500)
 
 
@@ -22,14 +26,168 @@ class ClipboardEntryCreate(ClipboardEntryBase):
 class ClipboardEntryRead(ClipboardEntryBase):
     """Schema returned from the API for clipboard entries."""
 
+    # Read from ``ClipboardEntry.body`` so out-of-line bodies are returned in full.
+    content: str = Field(..., validation_alias=AliasChoices("body", "content"))
+    id: int
+    created_at: Optional[datetime]
+    copy_count: int = 1
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ClipboardEntryCreated(BaseModel):
+    """Returned by ``POST /clip``: the stored clip without the body the client just sent."""
+
+    type: Literal["text", "url"]
+    title: Optional[str] = None
+    id: int
+    created_at: Optional[datetime]
+    copy_count: int = 1
+    content_length: Optional[int] = None
+    content_hash: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ClipboardEntryPreview(BaseModel):
+    """List item returned by ``GET /clips?view=preview``."""
+
+    type: Literal["text", "url"]
+    preview: str
+    title: Optional[str] = None
+    id: int
+    created_at: Optional[datetime]
+    copy_count: int = 1
+    content_length: int
+    content_hash: str
+
+
+class ClipboardChange(BaseModel):
+    """A clip changed since the requested point: its current state, or a tombstone."""
+
+    seq: int
+    id: int
+    deleted: bool
+    clip: Optional[ClipboardEntryRead] = None
+
+
+class ClipboardChangesPage(BaseModel):
+    """One page of ``GET /clips/changes``."""
+
+    changes: List[ClipboardChange]
+    next_since: int
+    has_more: bool
+
+
+class ClipboardRangeDigest(BaseModel):
+    """A client's summary of the clips with ids in ``[start, end)``."""
+
+    start: int = Field(..., ge=0)
+    end: int = Field(..., ge=1, le=2**31)
+    digest: str = Field(..., pattern=r"^[0-9a-f]{16}$")
+    count: int = Field(..., ge=0)
+
+    @model_validator(mode="after")
+    def _check_bounds(self) -> "ClipboardRangeDigest":
+        if self.start >= self.end:
+            raise ValueError("start must be below end")
+        return self
+
+
+class ClipboardReconcileRequest(BaseModel):
+    """Body of ``POST /clips/reconcile``."""
+
+    ranges: List[ClipboardRangeDigest] = Field(..., min_length=1, max_length=256)
+
+
+class ClipboardRangeItem(BaseModel):
+    id: int
+    content_hash: str
+
+
+class ClipboardRangeResult(BaseModel):
+    """The server's summary of a range that differs, or of one of its subranges."""
+
+    start: int
+    end: int
+    digest: str
+    count: int
+    items: Optional[List[ClipboardRangeItem]] = None
+
+
+class ClipboardReconcileResult(BaseModel):
+    ranges: List[ClipboardRangeResult]
+
+
+class ClipboardBatchCreated(BaseModel):
+    """An item of a batch request that was persisted."""
+
+    index: int
     id: int
     created_at: Optional[datetime]
 
+
+class ClipboardBatchError(BaseModel):
+    """An item of a batch request that was rejected."""
+
+    index: int
+    detail: str
+
+
+class ClipboardBatchResult(BaseModel):
+    """Per-item outcome of a batch ingestion request."""
+
+    created: List[ClipboardBatchCreated]
+    errors: List[ClipboardBatchError]
+
+
+class ClipboardContentInfo(BaseModel):
+    """Summary of a clip body stored by a streaming upload."""
+
+    id: int
+    content_hash: str
+    content_length: int
+    created_at: Optional[datetime]
+
     model_config = ConfigDict(from_attributes=True)
 
 
+class ClipboardBulkDelete(BaseModel):
+    """Filters for ``DELETE /clips``; clips must match every filter given."""
+
+    ids: Optional[List[int]] = None
+    before: Optional[datetime] = None
+    type: Optional[Literal["text", "url"]] = None
+
+    @model_validator(mode="after")
+    def _require_filter(self) -> "ClipboardBulkDelete":
+        if self.ids is None and self.before is None and self.type is None:
+            raise ValueError("at least one of ids, before or type is required")
+        return self
+
+
+class ClipboardBulkDeleteResult(BaseModel):
+    deleted: int
+
+
 __all__ = [
+    "CONTENT_MAX_LENGTH",
+    "ClipboardBatchCreated",
+    "ClipboardBatchError",
+    "ClipboardBatchResult",
+    "ClipboardBulkDelete",
+    "ClipboardBulkDeleteResult",
+    "ClipboardChange",
+    "ClipboardChangesPage",
+    "ClipboardContentInfo",
     "ClipboardEntryBase",
     "ClipboardEntryCreate",
+    "ClipboardEntryCreated",
+    "ClipboardEntryPreview",
     "ClipboardEntryRead",
+    "ClipboardRangeDigest",
+    "ClipboardRangeItem",
+    "ClipboardRangeResult",
+    "ClipboardReconcileRequest",
+    "ClipboardReconcileResult",
 ]
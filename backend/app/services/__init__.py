@@ -1,19 +1,104 @@
 """Domain services encapsulating business logic."""
 
 from .clipboard import (
+    BatchCreateResult,
+    BatchCreatedEntry,
+    BatchRejectedEntry,
+    ChangesExpiredError,
+    ClipChangeRecord,
+    ClipChangesPage,
+    ClipPreview,
+    ClipRecord,
     ClipboardEntryNotFoundError,
+    ClipboardPage,
     ClipboardServiceError,
     InvalidClipboardEntryError,
+    InvalidCursorError,
+    RecentClipsCache,
+    bump_generation,
+    create_clipboard_entries,
     create_clipboard_entry,
+    create_clipboard_entry_async,
+    delete_clipboard_entries,
+    delete_clipboard_entries_async,
     delete_clipboard_entry,
+    delete_clipboard_entry_async,
+    delete_oldest_clipboard_entries,
+    decode_cursor,
+    encode_cursor,
+    get_clipboard_entry,
+    get_clipboard_entry_async,
+    list_clip_changes,
+    list_clip_previews,
+    list_clip_records,
     list_clipboard_entries,
+    list_clipboard_page,
+    list_clipboard_page_async,
+    list_clipboard_preview_page,
+    list_clipboard_preview_page_async,
+    read_generation,
+    read_generation_async,
+    recent_clips_cache,
+    search_clipboard_entries,
+    search_clipboard_entries_async,
 )
+from .changes import prune_tombstones, record_clip_changes, record_deleted_clips
+from .events import ClipEventBroker, clip_event_broker, emit_clip_events
+from .reconcile import RangeDigestCache, ReconcileUnavailableError, range_digest_cache, reconcile_ranges
+from .retention import RetentionPolicy, RetentionPruner, retention_pruner
 
 __all__ = [
+    "BatchCreateResult",
+    "BatchCreatedEntry",
+    "BatchRejectedEntry",
+    "ChangesExpiredError",
+    "ClipChangeRecord",
+    "ClipChangesPage",
+    "ClipEventBroker",
+    "ClipPreview",
+    "ClipRecord",
     "ClipboardEntryNotFoundError",
+    "ClipboardPage",
     "ClipboardServiceError",
     "InvalidClipboardEntryError",
+    "InvalidCursorError",
+    "RangeDigestCache",
+    "ReconcileUnavailableError",
+    "RecentClipsCache",
+    "RetentionPolicy",
+    "RetentionPruner",
+    "bump_generation",
+    "clip_event_broker",
+    "create_clipboard_entries",
     "create_clipboard_entry",
+    "create_clipboard_entry_async",
+    "delete_clipboard_entries",
+    "delete_clipboard_entries_async",
     "delete_clipboard_entry",
+    "delete_clipboard_entry_async",
+    "delete_oldest_clipboard_entries",
+    "decode_cursor",
+    "emit_clip_events",
+    "encode_cursor",
+    "get_clipboard_entry",
+    "get_clipboard_entry_async",
+    "list_clip_changes",
+    "list_clip_previews",
+    "list_clip_records",
     "list_clipboard_entries",
+    "list_clipboard_page",
+    "list_clipboard_page_async",
+    "list_clipboard_preview_page",
+    "list_clipboard_preview_page_async",
+    "prune_tombstones",
+    "range_digest_cache",
+    "read_generation",
+    "read_generation_async",
+    "recent_clips_cache",
+    "reconcile_ranges",
+    "record_clip_changes",
+    "record_deleted_clips",
+    "retention_pruner",
+    "search_clipboard_entries",
+    "search_clipboard_entries_async",
 ]
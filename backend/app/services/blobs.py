@@ -0,0 +1,267 @@
+"""Content-addressed storage for clip bodies too large to keep inline.
+
+Each distinct body is stored once in ``clip_blobs``, keyed by the SHA-256 of
+its UTF-8 bytes (the same digest as ``ClipboardEntry.content_hash``), and split
+into independently compressed chunks in ``clip_blob_chunks``. Clips reference
+the blob and keep only the head of the body inline, so the hot ``clips`` rows
+and their indexes stay small.
+"""
+from __future__ import annotations
+
+import hashlib
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Collection, Dict, Iterable, Iterator, List
+
+from sqlalchemy import delete, exists, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.compression import DEFAULT_CODEC, compress, decompress
+from app.models.clip_blob import ClipBlob, ClipBlobChunk
+from app.models.clipboard_entry import ClipboardEntry
+
+
+# Uncompressed bytes per chunk: bounds the memory needed to write or read a slice.
+BLOB_CHUNK_SIZE = 256 * 1024
+
+# Characters of an out-of-line body kept in ``clips.content`` for search and previews.
+INLINE_HEAD_CHARS = 1024
+
+# Uploads in progress are stored under ``upload-<uuid>`` until their digest is known.
+UPLOAD_KEY_PREFIX = "upload-"
+
+# Unfinished uploads older than this were abandoned by a crashed worker and are collected.
+ABANDONED_UPLOAD_AGE = timedelta(hours=1)
+
+
+def split_chunks(data: bytes, chunk_size: int = BLOB_CHUNK_SIZE) -> Iterable[bytes]:
+    for offset in range(0, len(data), chunk_size):
+        yield data[offset : offset + chunk_size]
+
+
+def _insert_ignoring_conflicts(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(ClipBlob).on_conflict_do_nothing(index_elements=[ClipBlob.sha256])
+
+
+def _claim_existing(db: Session, sha256: str) -> bool:
+    """Lock an existing blob against :func:`delete_orphaned_blobs` until the caller commits.
+
+    Returns ``False`` if the blob was deleted after the caller's insert saw it,
+    in which case the caller stores it again.
+    """
+
+    locked = select(ClipBlob.sha256).where(ClipBlob.sha256 == sha256).with_for_update(read=True, key_share=True)
+    return db.execute(locked).first() is not None
+
+
+def store_blob(db: Session, sha256: str, chunks: Iterable[bytes], *, size: int) -> bool:
+    """Store a body under ``sha256`` unless it is already present.
+
+    ``chunks`` are the uncompressed slices of the body in order. Returns whether
+    the blob was new. An existing blob is locked against orphan collection
+    until the caller's transaction ends. Runs in the caller's transaction; the
+    caller commits.
+    """
+
+    while True:
+        inserted = db.execute(
+            _insert_ignoring_conflicts(db)
+            .values(sha256=sha256, size=size, stored_size=0, codec=DEFAULT_CODEC)
+            .returning(ClipBlob.sha256)
+        ).first()
+        if inserted is not None:
+            break
+        if _claim_existing(db, sha256):
+            return False
+
+    stored_size = 0
+    for seq, chunk in enumerate(chunks):
+        data = compress(chunk, DEFAULT_CODEC)
+        stored_size += len(data)
+        db.execute(ClipBlobChunk.__table__.insert().values(blob_sha256=sha256, seq=seq, data=data))
+    db.execute(
+        ClipBlob.__table__.update().where(ClipBlob.sha256 == sha256).values(stored_size=stored_size)
+    )
+    return True
+
+
+class BlobWriter:
+    """Stores a body of unknown size and digest as it arrives, one chunk at a time.
+
+    Chunks are committed under a temporary key as they fill, so no transaction
+    stays open while the client is sending. :meth:`finish` re-keys them by
+    their SHA-256, or discards them if that body is already stored, in the
+    caller's transaction; :meth:`discard` removes an aborted upload. Memory use
+    is bounded by :data:`BLOB_CHUNK_SIZE`.
+    """
+
+    def __init__(self) -> None:
+        self._temp_key = f"{UPLOAD_KEY_PREFIX}{uuid.uuid4().hex}"
+        self._digest = hashlib.sha256()
+        self._buffer = bytearray()
+        self._seq = 0
+        self._started = False
+        self.size = 0
+        self.stored_size = 0
+
+    def write(self, db: Session, data: bytes) -> None:
+        self._digest.update(data)
+        self.size += len(data)
+        self._buffer += data
+        if len(self._buffer) < BLOB_CHUNK_SIZE:
+            return
+        while len(self._buffer) >= BLOB_CHUNK_SIZE:
+            self._write_chunk(db, bytes(self._buffer[:BLOB_CHUNK_SIZE]))
+            del self._buffer[:BLOB_CHUNK_SIZE]
+        db.commit()
+
+    def _write_chunk(self, db: Session, chunk: bytes) -> None:
+        if not self._started:
+            db.execute(
+                ClipBlob.__table__.insert().values(
+                    sha256=self._temp_key, size=0, stored_size=0, codec=DEFAULT_CODEC
+                )
+            )
+            self._started = True
+        data = compress(chunk, DEFAULT_CODEC)
+        self.stored_size += len(data)
+        db.execute(ClipBlobChunk.__table__.insert().values(blob_sha256=self._temp_key, seq=self._seq, data=data))
+        self._seq += 1
+
+    def finish(self, db: Session) -> str:
+        """Flush the last chunk and return the SHA-256 the body is stored under."""
+
+        if self._buffer:
+            self._write_chunk(db, bytes(self._buffer))
+            self._buffer.clear()
+        sha256 = self._digest.hexdigest()
+        if not self._started:
+            return sha256
+
+        while True:
+            inserted = db.execute(
+                _insert_ignoring_conflicts(db)
+                .values(sha256=sha256, size=self.size, stored_size=self.stored_size, codec=DEFAULT_CODEC)
+                .returning(ClipBlob.sha256)
+            ).first()
+            if inserted is not None:
+                db.execute(
+                    update(ClipBlobChunk)
+                    .where(ClipBlobChunk.blob_sha256 == self._temp_key)
+                    .values(blob_sha256=sha256),
+                    execution_options={"synchronize_session": False},
+                )
+                break
+            if _claim_existing(db, sha256):
+                db.execute(delete(ClipBlobChunk).where(ClipBlobChunk.blob_sha256 == self._temp_key))
+                break
+        db.execute(delete(ClipBlob).where(ClipBlob.sha256 == self._temp_key))
+        return sha256
+
+    def discard(self, db: Session) -> None:
+        """Delete the chunks committed so far, after the upload failed, and commit."""
+
+        if self._started:
+            db.execute(delete(ClipBlobChunk).where(ClipBlobChunk.blob_sha256 == self._temp_key))
+            db.execute(delete(ClipBlob).where(ClipBlob.sha256 == self._temp_key))
+            db.commit()
+
+
+def iter_blob_range(db: Session, sha256: str, start: int, end: int) -> Iterator[bytes]:
+    """Yield bytes ``start..end`` (inclusive) of a stored body, one chunk at a time.
+
+    Every chunk but the last holds exactly :data:`BLOB_CHUNK_SIZE` bytes, so
+    only the chunks overlapping the range are fetched and decompressed.
+    """
+
+    codec: str = db.execute(select(ClipBlob.codec).where(ClipBlob.sha256 == sha256)).scalar_one()
+    first, last = start // BLOB_CHUNK_SIZE, end // BLOB_CHUNK_SIZE
+    rows = db.execute(
+        select(ClipBlobChunk.seq, ClipBlobChunk.data)
+        .where(ClipBlobChunk.blob_sha256 == sha256, ClipBlobChunk.seq.between(first, last))
+        .order_by(ClipBlobChunk.seq)
+        .execution_options(yield_per=1)
+    )
+    for seq, data in rows:
+        chunk = decompress(data, codec)
+        offset = seq * BLOB_CHUNK_SIZE
+        yield chunk[max(start - offset, 0) : end - offset + 1]
+
+
+def read_blob_texts(db: Session, sha256s: Collection[str]) -> Dict[str, str]:
+    """Return the full text of each listed blob, keyed by digest, with one query."""
+
+    if not sha256s:
+        return {}
+    rows = db.execute(
+        select(ClipBlobChunk.blob_sha256, ClipBlob.codec, ClipBlobChunk.data)
+        .join(ClipBlob, ClipBlob.sha256 == ClipBlobChunk.blob_sha256)
+        .where(ClipBlobChunk.blob_sha256.in_(sha256s))
+        .order_by(ClipBlobChunk.blob_sha256, ClipBlobChunk.seq)
+    )
+    chunks: Dict[str, List[bytes]] = {}
+    for sha256, codec, data in rows:
+        chunks.setdefault(sha256, []).append(decompress(data, codec))
+    return {sha256: b"".join(parts).decode("utf-8") for sha256, parts in chunks.items()}
+
+
+def inline_head(content: str) -> str:
+    return content[:INLINE_HEAD_CHARS]
+
+
+def delete_orphaned_blobs(db: Session, *, limit: int) -> List[str]:
+    """Delete up to ``limit`` blobs no clip references any more, and commit.
+
+    Writers reusing a blob lock it first (see :func:`store_blob`). A delete
+    that reaches a blob a concurrent clip has claimed fails on the clip's
+    foreign key and the batch is retried on the next pass; a writer that
+    finds its blob already deleted stores it again. Uploads still in progress
+    are skipped until :data:`ABANDONED_UPLOAD_AGE` has passed.
+    """
+
+    abandoned = datetime.now(timezone.utc).replace(tzinfo=None) - ABANDONED_UPLOAD_AGE
+    orphaned = (
+        select(ClipBlob.sha256)
+        .where(
+            ~exists().where(ClipboardEntry.blob_sha256 == ClipBlob.sha256),
+            or_(~ClipBlob.sha256.startswith(UPLOAD_KEY_PREFIX), ClipBlob.created_at < abandoned),
+        )
+        .limit(limit)
+        .scalar_subquery()
+    )
+    try:
+        deleted = list(
+            db.execute(
+                delete(ClipBlob).where(ClipBlob.sha256.in_(orphaned)).returning(ClipBlob.sha256),
+                execution_options={"synchronize_session": False},
+            ).scalars()
+        )
+        if deleted:
+            # Cascades on PostgreSQL; SQLite does not enforce foreign keys by default.
+            db.execute(delete(ClipBlobChunk).where(ClipBlobChunk.blob_sha256.in_(deleted)))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return []
+    return deleted
+
+
+__all__ = [
+    "ABANDONED_UPLOAD_AGE",
+    "BLOB_CHUNK_SIZE",
+    "INLINE_HEAD_CHARS",
+    "UPLOAD_KEY_PREFIX",
+    "BlobWriter",
+    "delete_orphaned_blobs",
+    "inline_head",
+    "iter_blob_range",
+    "read_blob_texts",
+    "split_chunks",
+    "store_blob",
+]
@@ -0,0 +1,216 @@
+"""The clips change log behind ``GET /clips/changes``.
+
+Every transaction that creates, updates or deletes clips queues their ids in
+``clip_pending_changes``. Once it has committed, the short transaction that
+bumps the generation numbers whatever is queued (its own changes and any a
+crashed writer left behind) while holding the generation row lock, so change
+numbers increase in commit order without writers holding that lock for their
+whole transaction. A clip keeps only its newest entry, which makes the log as
+long as the number of live clips plus tombstones rather than the number of
+writes, and tombstones older than ``CLIP_TOMBSTONE_MAX_AGE_DAYS`` are pruned by
+the retention task.
+
+Databases that predate the log enter their existing clips with the one-off
+``start_change_log.py`` script (:func:`backfill_change_log`); writes only
+ever add entries for the clips they touch.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import Select, case, delete, exists, func, insert, select, true, update
+from sqlalchemy.orm import Session
+
+from app.models.clip_change import ClipChange, PendingClipChange
+from app.models.clip_sync_state import ClipSyncState
+from app.models.clipboard_entry import ClipboardEntry
+
+
+# Rows per multi-row INSERT into the log.
+CHANGE_INSERT_PAGE_SIZE = 1000
+
+_SYNC_STATE = ClipSyncState.id == ClipSyncState.SINGLETON_ID
+
+
+def _reserve_seqs(db: Session, count: int) -> int:
+    """Reserve ``count`` consecutive change numbers and return the first."""
+
+    last = db.execute(
+        update(ClipSyncState)
+        .where(_SYNC_STATE)
+        .values(change_seq=func.coalesce(ClipSyncState.change_seq, 0) + count)
+        .returning(ClipSyncState.change_seq)
+    ).scalar_one()
+    return last - count + 1
+
+
+def record_clip_changes(db: Session, entry_ids: Iterable[int], *, deleted: bool = False) -> None:
+    """Queue log entries for ``entry_ids``, written (or deleted) in the caller's transaction.
+
+    The caller commits, then calls :func:`app.services.clipboard.bump_generation`
+    to number them.
+    """
+
+    ids = sorted(set(entry_ids))
+    if not ids:
+        return
+    # The clips rows are locked by the caller, so no other writer queues these ids meanwhile.
+    db.execute(
+        delete(PendingClipChange).where(PendingClipChange.clip_id.in_(ids)),
+        execution_options={"synchronize_session": False},
+    )
+    db.execute(
+        insert(PendingClipChange).execution_options(insertmanyvalues_page_size=CHANGE_INSERT_PAGE_SIZE),
+        [{"clip_id": clip_id, "deleted": deleted} for clip_id in ids],
+    )
+
+
+def record_deleted_clips(db: Session, clip_ids: Select) -> None:
+    """Tombstone every clip selected by ``clip_ids`` (a one-column ``id`` query) in SQL.
+
+    For bulk removals such as dropping a partition, whose ids are never
+    loaded into Python. The tombstones are numbered right away, so the
+    generation row stays locked until the caller commits; bump the
+    generation afterwards as usual.
+    """
+
+    ids = clip_ids.subquery()
+    count = db.execute(select(func.count()).select_from(ids)).scalar_one()
+    if not count:
+        return
+    first = _reserve_seqs(db, count)
+    for model in (PendingClipChange, ClipChange):
+        db.execute(
+            delete(model).where(model.clip_id.in_(select(ids.c.id))),
+            execution_options={"synchronize_session": False},
+        )
+    numbered = select(first - 1 + func.row_number().over(order_by=ids.c.id), ids.c.id, true())
+    db.execute(insert(ClipChange).from_select(["seq", "clip_id", "deleted"], numbered))
+
+
+def number_pending_changes(db: Session) -> int:
+    """Move every queued change into the log with the next ``seq`` values; return how many moved.
+
+    Call while holding the generation row lock, i.e. after bumping it in the
+    same transaction; the caller commits.
+    """
+
+    # Deleting claims the entries: a writer re-queueing one of these clips waits for this commit.
+    claimed = db.execute(
+        delete(PendingClipChange).returning(
+            PendingClipChange.clip_id, PendingClipChange.deleted, PendingClipChange.changed_at
+        ),
+        execution_options={"synchronize_session": False},
+    ).all()
+    if not claimed:
+        return 0
+    claimed.sort(key=lambda change: change.clip_id)
+    first = _reserve_seqs(db, len(claimed))
+    ids = [change.clip_id for change in claimed]
+    for offset in range(0, len(ids), CHANGE_INSERT_PAGE_SIZE):
+        db.execute(
+            delete(ClipChange).where(ClipChange.clip_id.in_(ids[offset : offset + CHANGE_INSERT_PAGE_SIZE])),
+            execution_options={"synchronize_session": False},
+        )
+    db.execute(
+        insert(ClipChange).execution_options(insertmanyvalues_page_size=CHANGE_INSERT_PAGE_SIZE),
+        [
+            {"seq": first + offset, "clip_id": change.clip_id, "deleted": change.deleted, "changed_at": change.changed_at}
+            for offset, change in enumerate(claimed)
+        ],
+    )
+    return len(claimed)
+
+
+def backfill_change_log(db: Session, *, batch_size: int) -> int:
+    """Enter every clip missing from the log, in id order, and return how many were added.
+
+    For databases that predate the log. Each batch of ``batch_size`` clips
+    is numbered after the newest change while holding the generation row lock,
+    like any write, and committed on its own, so the app can keep writing.
+    """
+
+    if db.execute(select(ClipSyncState.id).where(_SYNC_STATE)).scalar_one_or_none() is None:
+        db.add(ClipSyncState(id=ClipSyncState.SINGLETON_ID, generation=0))
+        db.commit()
+
+    added = 0
+    after = 0
+    while True:
+        # Lock first: a clip committed meanwhile is then either listed below or numbered after this batch.
+        _reserve_seqs(db, 0)
+        missing = db.execute(
+            select(ClipboardEntry.id, ClipboardEntry.created_at)
+            .where(ClipboardEntry.id > after, ~exists().where(ClipChange.clip_id == ClipboardEntry.id))
+            .order_by(ClipboardEntry.id)
+            .limit(batch_size)
+        ).all()
+        if not missing:
+            db.commit()
+            return added
+        first = _reserve_seqs(db, len(missing))
+        db.execute(
+            insert(ClipChange).execution_options(insertmanyvalues_page_size=CHANGE_INSERT_PAGE_SIZE),
+            [
+                {"seq": first + offset, "clip_id": clip.id, "deleted": False, "changed_at": clip.created_at}
+                for offset, clip in enumerate(missing)
+            ],
+        )
+        db.commit()
+        added += len(missing)
+        after = missing[-1].id
+
+
+def prune_tombstones(db: Session, *, before: datetime, limit: int) -> int:
+    """Delete up to ``limit`` tombstones written before ``before``, commit, and return how many went.
+
+    Raises the log's floor to the newest pruned ``seq``: clients that synced
+    only up to an earlier point may have missed those deletions.
+    """
+
+    expired = (
+        select(ClipChange.seq)
+        .where(ClipChange.deleted.is_(True), ClipChange.changed_at < before)
+        .order_by(ClipChange.seq)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    pruned = list(
+        db.execute(
+            delete(ClipChange).where(ClipChange.seq.in_(expired)).returning(ClipChange.seq),
+            execution_options={"synchronize_session": False},
+        ).scalars()
+    )
+    if not pruned:
+        db.rollback()
+        return 0
+
+    newest = max(pruned)
+    floor = func.coalesce(ClipSyncState.changes_floor, 0)
+    db.execute(
+        update(ClipSyncState)
+        .where(_SYNC_STATE)
+        .values(changes_floor=case((floor < newest, newest), else_=floor)),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    return len(pruned)
+
+
+def read_changes_floor(db: Session) -> int:
+    """Return the ``seq`` before which tombstones may have been pruned."""
+
+    floor = db.execute(select(ClipSyncState.changes_floor).where(_SYNC_STATE)).scalar_one_or_none()
+    return floor or 0
+
+
+__all__ = [
+    "CHANGE_INSERT_PAGE_SIZE",
+    "backfill_change_log",
+    "number_pending_changes",
+    "prune_tombstones",
+    "read_changes_floor",
+    "record_clip_changes",
+    "record_deleted_clips",
+]
@@ -1,13 +1,61 @@
 """Domain services for clipboard entry operations."""
 from __future__ import annotations
 
-from typing import Iterable, List
+import base64
+import binascii
+import codecs
+import hashlib
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
 from urllib.parse import urlparse
 
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    ColumnElement,
+    Double,
+    LargeBinary,
+    Row,
+    and_,
+    bindparam,
+    case,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import Connection, Engine, RowMapping
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 
-from app.models.clipboard_entry import ClipboardEntry
+from app.core.config import load_settings
+from app.models.clip_blob import ClipBlob
+from app.models.clip_change import ClipChange
+from app.models.clip_sync_state import ClipSyncState
+from app.db.base import precise_now
+from app.db.partitions import is_partitioned
+from app.db.search import SEARCH_CONFIG, SEARCH_VECTOR_COLUMN, get_search_support
+from app.models.clipboard_entry import ClipboardEntry, compute_content_hash
 from app.schemas.clipboard_entry import ClipboardEntryCreate
+from app.services.blobs import (
+    INLINE_HEAD_CHARS,
+    BlobWriter,
+    inline_head,
+    iter_blob_range,
+    read_blob_texts,
+    split_chunks,
+    store_blob,
+)
+from app.services.changes import number_pending_changes, read_changes_floor, record_clip_changes
+from app.services.events import emit_clip_events
 
 
 class ClipboardServiceError(RuntimeError):
@@ -22,56 +70,1259 @@ class ClipboardEntryNotFoundError(ClipboardServiceError):
     """Raised when the requested clipboard entry does not exist."""
 
 
+class InvalidCursorError(ClipboardServiceError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class ClipboardContentTooLargeError(InvalidClipboardEntryError):
+    """Raised when an uploaded clip body exceeds the configured size limit."""
+
+
+class ClipboardContentConflictError(ClipboardServiceError):
+    """Raised when new content would duplicate another clip of the same type."""
+
+
+class ChangesExpiredError(ClipboardServiceError):
+    """Raised when tombstones after the requested change have been pruned."""
+
+
+def read_generation(db: Session) -> int:
+    """Return the current clips generation with a single primary-key lookup."""
+
+    generation = db.execute(
+        select(ClipSyncState.generation).where(ClipSyncState.id == ClipSyncState.SINGLETON_ID)
+    ).scalar_one_or_none()
+    return generation or 0
+
+
+def bump_generation(db: Session) -> int:
+    """Advance the clips generation in a short transaction of its own and return it.
+
+    Call right after committing a change to clips. The row lock is held only
+    while this transaction numbers the change-log entries queued by committed
+    writers, so writers do not queue behind each other's commits.
+    """
+
+    generation = db.execute(
+        update(ClipSyncState)
+        .where(ClipSyncState.id == ClipSyncState.SINGLETON_ID)
+        .values(generation=ClipSyncState.generation + 1)
+        .returning(ClipSyncState.generation)
+    ).scalar_one_or_none()
+    if generation is None:
+        db.add(ClipSyncState(id=ClipSyncState.SINGLETON_ID, generation=1))
+        db.flush()
+        generation = 1
+    number_pending_changes(db)
+    db.commit()
+    return generation
+
+
+@dataclass(frozen=True, slots=True)
+class ClipRecord:
+    """A clip as list endpoints return it, built from plain column values.
+
+    Fields mirror ``ClipboardEntryRead`` in order, so the record can be
+    encoded to JSON directly without a pydantic validation pass.
+    """
+
+    type: str
+    content: str
+    title: Optional[str]
+    id: int
+    created_at: Optional[datetime]
+    copy_count: int
+
+
+@dataclass(frozen=True, slots=True)
+class ClipPreview:
+    """A clip as ``GET /clips?view=preview`` returns it: a truncated body plus its size and hash."""
+
+    type: str
+    preview: str
+    title: Optional[str]
+    id: int
+    created_at: Optional[datetime]
+    copy_count: int
+    content_length: int
+    content_hash: str
+
+
+@dataclass(frozen=True, slots=True)
+class ClipChangeRecord:
+    """An entry of ``GET /clips/changes``: the clip as it is now, or a tombstone."""
+
+    seq: int
+    id: int
+    deleted: bool
+    clip: Optional[ClipRecord]
+
+
+def _sort_key(entry: ClipRecord) -> Tuple[datetime, int]:
+    return (entry.created_at or datetime.min, entry.id)
+
+
+class RecentClipsCache:
+    """Newest-first window of serialized clips, tagged with the generation it reflects.
+
+    Readers compare the tag against :func:`read_generation`, so entries written by
+    other worker processes are served stale only until the writer bumps the
+    generation, right after its commit. Local writes update the
+    window in place when they are the only change since it was filled.
+
+    Clips with out-of-line bodies are held by their inline head plus the
+    SHA-256 of their blob, so the window stays small however large the bodies
+    are; readers load the bodies of the entries they return.
+    """
+
+    def __init__(self, capacity: int, *, enabled: bool = True) -> None:
+        self.capacity = capacity
+        self.enabled = enabled and capacity > 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: List[ClipRecord] = []
+        # Entry id -> blob SHA-256, for entries holding only the head of their body.
+        self._blobs: Dict[int, str] = {}
+        self._generation: Optional[int] = None
+        # True when the window holds every clip in the table, not just the newest.
+        self._complete = False
+
+    def get(self, generation: int, limit: int) -> Optional[List[ClipRecord]]:
+        """Return up to ``limit`` newest entries, or ``None`` on a miss."""
+
+        hit = self.lookup(generation, limit)
+        return None if hit is None else hit[0]
+
+    def lookup(self, generation: int, limit: int) -> Optional[Tuple[List[ClipRecord], Dict[int, str]]]:
+        """Like :meth:`get`, plus the blob SHA-256 of each returned entry that holds only a head."""
+
+        with self._lock:
+            if self._generation == generation and (self._complete or limit <= len(self._entries)):
+                self.hits += 1
+                entries = self._entries[:limit]
+                return entries, {entry.id: self._blobs[entry.id] for entry in entries if entry.id in self._blobs}
+            self.misses += 1
+            return None
+
+    def fill(
+        self, generation: int, entries: Sequence[ClipRecord], blobs: Optional[Dict[int, str]] = None
+    ) -> None:
+        with self._lock:
+            if self._generation is not None and generation < self._generation:
+                # Read from a lagging replica; the window is already newer.
+                return
+            self._entries = list(entries[: self.capacity])
+            self._complete = len(entries) < self.capacity
+            self._generation = generation
+            self._blobs = {}
+            self._keep_blobs(blobs or {})
+
+    def apply_insert(
+        self, generation: int, entries: Sequence[ClipRecord], blobs: Optional[Dict[int, str]] = None
+    ) -> None:
+        """Merge entries committed at ``generation`` into the window."""
+
+        with self._lock:
+            if self._generation != generation - 1:
+                self._reset()
+                return
+            # Re-copied clips move, so drop their previous position first.
+            moved = {entry.id for entry in entries}
+            self._entries = [entry for entry in self._entries if entry.id not in moved]
+            oldest = _sort_key(self._entries[-1]) if self._entries else None
+            for entry in entries:
+                # Rows older than a partial window belong past its end.
+                if self._complete or oldest is None or _sort_key(entry) > oldest:
+                    self._entries.append(entry)
+            self._entries.sort(key=_sort_key, reverse=True)
+            if len(self._entries) > self.capacity:
+                del self._entries[self.capacity :]
+                self._complete = False
+            self._generation = generation
+            self._keep_blobs({**self._blobs, **(blobs or {})})
+
+    def apply_delete(self, generation: int, entry_ids: Iterable[int]) -> None:
+        """Evict entries deleted at ``generation`` from the window."""
+
+        with self._lock:
+            if self._generation != generation - 1:
+                self._reset()
+                return
+            removed = set(entry_ids)
+            self._entries = [entry for entry in self._entries if entry.id not in removed]
+            self._generation = generation
+            self._keep_blobs(self._blobs)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def _keep_blobs(self, blobs: Dict[int, str]) -> None:
+        # Only references of entries still in the window are kept.
+        self._blobs = {entry.id: blobs[entry.id] for entry in self._entries if entry.id in blobs}
+
+    def _reset(self) -> None:
+        self._entries = []
+        self._blobs = {}
+        self._complete = False
+        self._generation = None
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "capacity": self.capacity,
+                "size": len(self._entries),
+                "generation": self._generation,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def _build_recent_clips_cache() -> RecentClipsCache:
+    settings = load_settings()
+    return RecentClipsCache(
+        settings.recent_clips_cache_size, enabled=settings.recent_clips_cache_enabled
+    )
+
+
+recent_clips_cache = _build_recent_clips_cache()
+
+
+def _validate_url(content: str) -> None:
+    parsed = urlparse(content)
+    if parsed.scheme not in {"http", "https"} or not parsed.netloc:
+        raise InvalidClipboardEntryError("content must be a valid URL when type=url")
+
+
 def _validate_payload(payload: ClipboardEntryCreate) -> None:
+    max_bytes = load_settings().clip_max_content_bytes
+    if len(payload.content) > max_bytes or len(payload.content.encode("utf-8")) > max_bytes:
+        raise InvalidClipboardEntryError(f"content must not exceed {max_bytes} bytes")
     if payload.type == "url":
-        parsed = urlparse(payload.content)
-        if parsed.scheme not in {"http", "https"} or not parsed.netloc:
-            raise InvalidClipboardEntryError("content must be a valid URL when type=url")
+        _validate_url(payload.content)
+
+
+def _created_event(entry_id: int, entry_type: str, created_at: Optional[datetime]) -> dict[str, object]:
+    return {
+        "event": "created",
+        "id": entry_id,
+        "type": entry_type,
+        "created_at": created_at.isoformat() if created_at else None,
+    }
+
+
+def _deleted_event(entry_id: int) -> dict[str, object]:
+    return {"event": "deleted", "id": entry_id}
+
+
+def _updated_event(entry_id: int, entry_type: str, created_at: Optional[datetime], copy_count: int) -> dict[str, object]:
+    return {
+        "event": "updated",
+        "id": entry_id,
+        "type": entry_type,
+        "created_at": created_at.isoformat() if created_at else None,
+        "copy_count": copy_count,
+    }
+
+
+_UPSERT_COLUMNS = (
+    ClipboardEntry.id,
+    ClipboardEntry.type,
+    ClipboardEntry.title,
+    ClipboardEntry.content_hash,
+    ClipboardEntry.created_at,
+    ClipboardEntry.copy_count,
+)
+
+
+def _upsert_statement(db: Session):
+    """Build the deduplicating ``INSERT ... ON CONFLICT DO UPDATE`` for ``db``'s dialect.
+
+    A clip whose ``(type, content_hash)`` already exists is moved to the top of
+    the history and has its ``copy_count`` increased instead of adding a row.
+    """
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise ClipboardServiceError(f"Deduplicating inserts are not supported on '{dialect}'")
+
+    statement = dialect_insert(ClipboardEntry)
+    return statement.on_conflict_do_update(
+        index_elements=[ClipboardEntry.type, ClipboardEntry.content_hash],
+        set_={
+            "created_at": precise_now(),
+            "copy_count": ClipboardEntry.copy_count + statement.excluded.copy_count,
+            "title": func.coalesce(statement.excluded.title, ClipboardEntry.title),
+        },
+    ).returning(*_UPSERT_COLUMNS)
+
+
+def _dedup_lock_key(entry_type: str, content_hash: str) -> int:
+    # 63 bits of the content hash, salted by type, as a signed bigint advisory-lock key.
+    return int(compute_content_hash(f"{entry_type}:{content_hash}")[:16], 16) - 2**63
+
+
+def _lock_dedup_keys(db: Session, keys: Iterable[Tuple[str, str]]) -> None:
+    """Take the transaction-scoped advisory locks for ``(type, content_hash)`` keys, in sorted order."""
+
+    db.execute(
+        text(
+            "SELECT pg_advisory_xact_lock(key) FROM "
+            "(SELECT key FROM unnest(CAST(:keys AS bigint[])) AS key ORDER BY key) AS ordered"
+        ),
+        {"keys": sorted({_dedup_lock_key(*key) for key in keys})},
+    )
+
+
+def _merge_rows_partitioned(db: Session, rows: List[dict[str, object]]) -> List[Row]:
+    """Deduplicating upsert for a partitioned ``clips`` table.
+
+    Partitioned tables cannot carry the unique ``(type, content_hash)`` index that
+    ``ON CONFLICT`` needs, so writers serialise per key on transaction-scoped
+    advisory locks, taken in sorted order to avoid deadlocks, and then update or
+    insert explicitly.
+    """
+
+    keys = [(row["type"], row["content_hash"]) for row in rows]
+    _lock_dedup_keys(db, keys)
+    lookup = select(*_UPSERT_COLUMNS).where(tuple_(ClipboardEntry.type, ClipboardEntry.content_hash).in_(keys))
+    existing = {(row.type, row.content_hash): row.id for row in db.execute(lookup)}
+
+    updates = [
+        {"entry_id": existing[key], "added": row["copy_count"], "new_title": row["title"]}
+        for key, row in zip(keys, rows)
+        if key in existing
+    ]
+    if updates:
+        # Moving created_at relocates the row to the current month's partition.
+        db.execute(
+            update(ClipboardEntry.__table__)
+            .where(ClipboardEntry.id == bindparam("entry_id"))
+            .values(
+                created_at=precise_now(),
+                copy_count=ClipboardEntry.copy_count + bindparam("added"),
+                title=func.coalesce(bindparam("new_title"), ClipboardEntry.title),
+            ),
+            updates,
+        )
+    inserts = [row for key, row in zip(keys, rows) if key not in existing]
+    if inserts:
+        db.execute(
+            insert(ClipboardEntry).execution_options(insertmanyvalues_page_size=BATCH_INSERT_PAGE_SIZE),
+            inserts,
+        )
+    return db.execute(lookup).all()
+
+
+def _upsert_rows(db: Session, rows: List[dict[str, object]]) -> Dict[Tuple[str, str], Row]:
+    """Upsert deduplicated rows, emit their events and return them keyed by ``(type, hash)``.
+
+    The caller commits and then bumps the generation.
+    """
+
+    if is_partitioned(db.connection()):
+        returned = _merge_rows_partitioned(db, rows)
+    else:
+        returned = db.execute(
+            _upsert_statement(db).execution_options(insertmanyvalues_page_size=BATCH_INSERT_PAGE_SIZE),
+            rows,
+        ).all()
+    by_key = {(row.type, row.content_hash): row for row in returned}
+
+    events = []
+    for row in rows:
+        persisted = by_key[(row["type"], row["content_hash"])]
+        if persisted.copy_count == row["copy_count"]:
+            events.append(_created_event(persisted.id, persisted.type, persisted.created_at))
+        else:
+            events.append(
+                _updated_event(persisted.id, persisted.type, persisted.created_at, persisted.copy_count)
+            )
+    emit_clip_events(db, events)
+    return by_key
+
+
+def _entry_row(db: Session, payload: ClipboardEntryCreate) -> dict[str, object]:
+    encoded = payload.content.encode("utf-8")
+    row: dict[str, object] = {
+        "content": payload.content,
+        "type": payload.type,
+        "title": payload.title,
+        "content_hash": hashlib.sha256(encoded).hexdigest(),
+        "copy_count": 1,
+        "content_length": len(encoded),
+        "blob_sha256": None,
+    }
+    if len(encoded) > load_settings().clip_inline_max_bytes:
+        # Large bodies are stored once, compressed, and the clip keeps only their head.
+        store_blob(db, row["content_hash"], split_chunks(encoded), size=len(encoded))
+        row["content"] = inline_head(payload.content)
+        row["blob_sha256"] = row["content_hash"]
+    return row
 
 
 def create_clipboard_entry(db: Session, payload: ClipboardEntryCreate) -> ClipboardEntry:
-    """Persist a new clipboard entry after validating the payload."""
+    """Persist a clipboard entry after validating the payload.
+
+    Re-copying content that already exists for the same type bumps the existing
+    entry instead of storing a duplicate.
+    """
 
     _validate_payload(payload)
 
-    entry = ClipboardEntry(
-        content=payload.content,
-        type=payload.type,
-        title=payload.title,
-    )
-    db.add(entry)
+    row = _entry_row(db, payload)
+    persisted = _upsert_rows(db, [row])[(row["type"], row["content_hash"])]
+    record_clip_changes(db, [persisted.id])
     db.commit()
-    db.refresh(entry)
+    generation = bump_generation(db)
+    entry = db.get(ClipboardEntry, persisted.id, populate_existing=True)
+
+    if recent_clips_cache.enabled:
+        recent_clips_cache.apply_insert(
+            generation,
+            [
+                ClipRecord(
+                    type=entry.type,
+                    content=row["content"],
+                    title=entry.title,
+                    id=entry.id,
+                    created_at=entry.created_at,
+                    copy_count=entry.copy_count,
+                )
+            ],
+            {} if row["blob_sha256"] is None else {entry.id: row["blob_sha256"]},
+        )
     return entry
 
 
-def list_clipboard_entries(db: Session, *, limit: int) -> List[ClipboardEntry]:
-    """Return clipboard entries ordered by creation date descending."""
+class BatchCreatedEntry(NamedTuple):
+    """Row persisted by :func:`create_clipboard_entries`, keyed by payload position."""
+
+    position: int
+    id: int
+    created_at: Optional[datetime]
+    title: Optional[str] = None
+    copy_count: int = 1
+    content_hash: Optional[str] = None
+    content_length: Optional[int] = None
+
+
+class BatchRejectedEntry(NamedTuple):
+    """Payload rejected by :func:`create_clipboard_entries` business rules."""
+
+    position: int
+    detail: str
+
+
+class BatchCreateResult(NamedTuple):
+    created: List[BatchCreatedEntry]
+    rejected: List[BatchRejectedEntry]
+
+
+# Rows per multi-row INSERT; keeps statements well under driver parameter limits.
+BATCH_INSERT_PAGE_SIZE = 1000
+
+
+def create_clipboard_entries(db: Session, payloads: Sequence[ClipboardEntryCreate]) -> BatchCreateResult:
+    """Persist many clipboard entries in a single transaction.
+
+    Payloads failing business rules are reported instead of aborting the batch.
+    Valid rows are written with multi-row ``INSERT ... ON CONFLICT ... RETURNING``
+    statements; repeats within the batch are merged first because a single
+    statement may not update the same row twice.
+    """
+
+    rejected: List[BatchRejectedEntry] = []
+    keyed_positions: List[Tuple[int, Tuple[str, str]]] = []
+    merged: Dict[Tuple[str, str], dict[str, object]] = {}
+    for position, payload in enumerate(payloads):
+        try:
+            _validate_payload(payload)
+        except InvalidClipboardEntryError as exc:
+            rejected.append(BatchRejectedEntry(position, str(exc)))
+            continue
+        row = _entry_row(db, payload)
+        key = (row["type"], row["content_hash"])
+        keyed_positions.append((position, key))
+        if key in merged:
+            merged[key]["copy_count"] += 1
+            merged[key]["title"] = row["title"] or merged[key]["title"]
+        else:
+            merged[key] = row
+
+    if not merged:
+        return BatchCreateResult(created=[], rejected=rejected)
+
+    # Concurrent batches touch shared keys in the same order, so their row locks cannot deadlock.
+    rows = [merged[key] for key in sorted(merged)]
+    by_key = _upsert_rows(db, rows)
+    record_clip_changes(db, [row.id for row in by_key.values()])
+    db.commit()
+    generation = bump_generation(db)
+
+    if recent_clips_cache.enabled:
+        entries = []
+        blobs = {}
+        for row in rows:
+            persisted = by_key[(row["type"], row["content_hash"])]
+            entries.append(
+                ClipRecord(
+                    type=persisted.type,
+                    content=row["content"],
+                    title=persisted.title,
+                    id=persisted.id,
+                    created_at=persisted.created_at,
+                    copy_count=persisted.copy_count,
+                )
+            )
+            if row["blob_sha256"] is not None:
+                blobs[persisted.id] = row["blob_sha256"]
+        recent_clips_cache.apply_insert(generation, entries, blobs)
+
+    created = [
+        BatchCreatedEntry(
+            position,
+            by_key[key].id,
+            by_key[key].created_at,
+            by_key[key].title,
+            by_key[key].copy_count,
+            key[1],
+            merged[key]["content_length"],
+        )
+        for position, key in keyed_positions
+    ]
+    return BatchCreateResult(created=created, rejected=rejected)
+
+
+# Fetches out-of-line bodies for a whole page in two queries instead of two per clip.
+_LOAD_BODIES = selectinload(ClipboardEntry.blob).selectinload(ClipBlob.chunks)
+
+
+class ClipboardPage(NamedTuple):
+    entries: List[Union[ClipRecord, ClipPreview]]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(created_at: datetime, entry_id: int) -> str:
+    """Return an opaque cursor pointing just past the given entry."""
+
+    raw = f"{created_at.isoformat()}|{entry_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by :func:`encode_cursor`."""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, entry_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), int(entry_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursorError("Invalid pagination cursor") from exc
+
+
+def _before_cursor(cursor: str) -> List[ColumnElement[bool]]:
+    created_at, entry_id = decode_cursor(cursor)
+    return [
+        tuple_(ClipboardEntry.created_at, ClipboardEntry.id) < (created_at, entry_id),
+        # Redundant with the row comparison, but lets a partitioned table prune
+        # partitions newer than the cursor.
+        ClipboardEntry.created_at <= created_at,
+    ]
+
+
+_RECORD_COLUMNS = (
+    ClipboardEntry.type,
+    ClipboardEntry.content,
+    ClipboardEntry.title,
+    ClipboardEntry.id,
+    ClipboardEntry.created_at,
+    ClipboardEntry.copy_count,
+    ClipboardEntry.blob_sha256,
+)
+
+
+def _head_records(rows: Sequence[RowMapping]) -> Tuple[List[ClipRecord], Dict[int, str]]:
+    """Build records from ``_RECORD_COLUMNS`` rows with inline heads, plus the blob of each out-of-line clip."""
+
+    records = [
+        ClipRecord(
+            type=row["type"],
+            content=row["content"],
+            title=row["title"],
+            id=row["id"],
+            created_at=row["created_at"],
+            copy_count=row["copy_count"],
+        )
+        for row in rows
+    ]
+    return records, {row["id"]: row["blob_sha256"] for row in rows if row["blob_sha256"] is not None}
+
+
+def _with_bodies(db: Session, records: Sequence[ClipRecord], blobs: Dict[int, str]) -> List[ClipRecord]:
+    """Swap the heads of out-of-line clips in ``records`` for their full bodies, fetched in one query."""
+
+    wanted = {record.id: blobs[record.id] for record in records if record.id in blobs}
+    if not wanted:
+        return list(records)
+    bodies = read_blob_texts(db, set(wanted.values()))
+    return [
+        record if record.id not in wanted else replace(record, content=bodies[wanted[record.id]])
+        for record in records
+    ]
+
+
+def _clip_records(db: Session, rows: Sequence[RowMapping]) -> List[ClipRecord]:
+    """Build records from ``_RECORD_COLUMNS`` rows, fetching out-of-line bodies in one query."""
+
+    return _with_bodies(db, *_head_records(rows))
+
+
+def list_clipboard_entries(
+    db: Session, *, limit: int, cursor: Optional[str] = None
+) -> List[ClipboardEntry]:
+    """Return clipboard entries ordered by creation date descending.
+
+    When ``cursor`` is given, only entries older than the cursor position are
+    returned. The ``(created_at, id)`` row comparison is answered by the
+    composite index, so every page costs the same regardless of depth; on a
+    partitioned table the ordered scan stops in the newest partitions.
+    """
 
+    query = db.query(ClipboardEntry).options(_LOAD_BODIES)
+    if cursor is not None:
+        query = query.filter(*_before_cursor(cursor))
     return (
-        db.query(ClipboardEntry)
-        .order_by(ClipboardEntry.created_at.desc())
+        query.order_by(ClipboardEntry.created_at.desc(), ClipboardEntry.id.desc())
         .limit(limit)
         .all()
     )
 
 
+def _record_rows(db: Session, *, limit: int, cursor: Optional[str] = None) -> Sequence[RowMapping]:
+    statement = select(*_RECORD_COLUMNS)
+    if cursor is not None:
+        statement = statement.where(*_before_cursor(cursor))
+    return db.execute(
+        statement.order_by(ClipboardEntry.created_at.desc(), ClipboardEntry.id.desc()).limit(limit)
+    ).mappings().all()
+
+
+def list_clip_records(db: Session, *, limit: int, cursor: Optional[str] = None) -> List[ClipRecord]:
+    """Like :func:`list_clipboard_entries`, but as plain records without ORM objects."""
+
+    return _clip_records(db, _record_rows(db, limit=limit, cursor=cursor))
+
+
+def _fetch_recent_clips(db: Session, *, limit: int, generation: int) -> List[ClipRecord]:
+    hit = recent_clips_cache.lookup(generation, limit)
+    if hit is not None:
+        entries, blobs = hit
+    else:
+        # The window keeps heads only; bodies are read for the entries returned.
+        entries, blobs = _head_records(_record_rows(db, limit=max(limit, recent_clips_cache.capacity)))
+        recent_clips_cache.fill(generation, entries, blobs)
+    return _with_bodies(db, entries[:limit], blobs)
+
+
+def list_clipboard_page(
+    db: Session, *, limit: int, cursor: Optional[str] = None, generation: Optional[int] = None
+) -> ClipboardPage:
+    """Return one page of clip records plus the cursor of the following page.
+
+    First pages are answered from :data:`recent_clips_cache` when it is current.
+    Pass ``generation`` when the caller has already read it, e.g. for an ETag.
+    """
+
+    if cursor is None and recent_clips_cache.enabled:
+        if generation is None:
+            generation = read_generation(db)
+        entries = _fetch_recent_clips(db, limit=limit + 1, generation=generation)
+    else:
+        entries = list_clip_records(db, limit=limit + 1, cursor=cursor)
+    return _page(entries, limit)
+
+
+def _page(entries: Sequence[Union[ClipRecord, ClipPreview]], limit: int) -> ClipboardPage:
+    """Cut a ``limit + 1`` fetch down to one page and point the cursor past its last entry."""
+
+    if len(entries) <= limit:
+        return ClipboardPage(entries=list(entries), next_cursor=None)
+
+    entries = entries[:limit]
+    last = entries[-1]
+    return ClipboardPage(entries=list(entries), next_cursor=encode_cursor(last.created_at, last.id))
+
+
+def _byte_length(db: Session, value: ColumnElement[str]) -> ColumnElement[int]:
+    if db.get_bind().dialect.name == "postgresql":
+        return func.octet_length(value)
+    return func.length(cast(value, LargeBinary))
+
+
+def list_clip_previews(
+    db: Session, *, limit: int, cursor: Optional[str] = None, preview_chars: int
+) -> List[ClipPreview]:
+    """Return clips newest first with bodies truncated in SQL to ``preview_chars``.
+
+    Out-of-line bodies are never read: the inline head already covers any
+    preview up to :data:`INLINE_HEAD_CHARS`.
+    """
+
+    statement = select(
+        ClipboardEntry.type,
+        func.substr(ClipboardEntry.content, 1, min(preview_chars, INLINE_HEAD_CHARS)).label("preview"),
+        ClipboardEntry.title,
+        ClipboardEntry.id,
+        ClipboardEntry.created_at,
+        ClipboardEntry.copy_count,
+        # Rows written before content_length existed are always stored inline.
+        func.coalesce(ClipboardEntry.content_length, _byte_length(db, ClipboardEntry.content)).label(
+            "content_length"
+        ),
+        ClipboardEntry.content_hash,
+    )
+    if cursor is not None:
+        statement = statement.where(*_before_cursor(cursor))
+    rows = db.execute(
+        statement.order_by(ClipboardEntry.created_at.desc(), ClipboardEntry.id.desc()).limit(limit)
+    ).mappings()
+    return [ClipPreview(**row) for row in rows]
+
+
+def list_clipboard_preview_page(db: Session, *, limit: int, cursor: Optional[str] = None) -> ClipboardPage:
+    """Like :func:`list_clipboard_page`, but with ``CLIP_PREVIEW_CHARS`` previews instead of bodies."""
+
+    preview_chars = load_settings().clip_preview_chars
+    return _page(list_clip_previews(db, limit=limit + 1, cursor=cursor, preview_chars=preview_chars), limit)
+
+
+def get_clipboard_entry(db: Session, *, entry_id: int) -> ClipboardEntry:
+    """Return one clip with its full body loaded."""
+
+    entry = db.get(ClipboardEntry, entry_id, options=[_LOAD_BODIES])
+    if entry is None:
+        raise ClipboardEntryNotFoundError(f"Clip with id {entry_id} not found")
+    return entry
+
+
+def _encode_search_cursor(score: float, entry_id: int) -> str:
+    raw = f"{score!r}|{entry_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        score, entry_id = raw.split("|", 1)
+        return float(score), int(entry_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursorError("Invalid pagination cursor") from exc
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+
+def _search_terms(db: Session, query: str):
+    """Return the match condition and relevance score for ``query``.
+
+    PostgreSQL matches words through the GIN-indexed ``search_vector`` and
+    substrings or near-misses through the ``pg_trgm`` index. Without those, a
+    case-insensitive LIKE scan ranks title matches above content matches.
+    """
+
+    support = get_search_support(db.connection())
+    conditions = []
+    scores = []
+    if support.full_text:
+        vector = column(SEARCH_VECTOR_COLUMN)
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        conditions.append(vector.op("@@")(ts_query))
+        scores.append(func.ts_rank_cd(vector, ts_query))
+    if support.trigram:
+        conditions.append(ClipboardEntry.content.ilike(f"%{_escape_like(query)}%", escape="/"))
+        conditions.append(literal(query).op("<%")(ClipboardEntry.content))
+        scores.append(func.word_similarity(query, ClipboardEntry.content))
+
+    if not conditions:
+        title_match = ClipboardEntry.title.icontains(query, autoescape=True)
+        conditions = [ClipboardEntry.content.icontains(query, autoescape=True), title_match]
+        scores = [case((title_match, 1.0), else_=0.0)]
+
+    # Ranks are compared exactly against cursors, so keep them in double precision.
+    score = scores[0]
+    for extra in scores[1:]:
+        score = score + extra
+    return or_(*conditions), cast(score, Double)
+
+
+def search_clipboard_entries(
+    db: Session, *, query: str, limit: int, cursor: Optional[str] = None
+) -> ClipboardPage:
+    """Return one page of entries matching ``query``, most relevant first.
+
+    Pages are keyed on ``(score, id)`` so a cursor stays valid while other clips
+    are added; ties are broken by the newer id. Out-of-line bodies are matched
+    on their :data:`INLINE_HEAD_CHARS` head only, as that is what ``clips`` holds.
+    """
+
+    condition, score = _search_terms(db, query)
+    statement = select(*_RECORD_COLUMNS, score.label("score")).where(condition)
+    if cursor is not None:
+        statement = statement.where(tuple_(score, ClipboardEntry.id) < _decode_search_cursor(cursor))
+    rows = db.execute(
+        statement.order_by(score.desc(), ClipboardEntry.id.desc()).limit(limit + 1)
+    ).mappings().all()
+
+    entries = _clip_records(db, rows[:limit])
+    if len(rows) <= limit:
+        return ClipboardPage(entries=entries, next_cursor=None)
+    last = rows[limit - 1]
+    return ClipboardPage(entries=entries, next_cursor=_encode_search_cursor(last["score"], last["id"]))
+
+
+class ClipChangesPage(NamedTuple):
+    changes: List[ClipChangeRecord]
+    # Pass back as ``since`` to continue; unchanged when there was nothing new.
+    next_since: int
+    has_more: bool
+
+
+def list_clip_changes(db: Session, *, since: int, limit: int) -> ClipChangesPage:
+    """Return up to ``limit`` clip changes committed after change ``since``, oldest first.
+
+    Each clip appears once, with its current state. ``since=0`` lists every
+    clip, so a new client can start from it; any other ``since`` older than
+    the pruned tombstones raises :class:`ChangesExpiredError`.
+    """
+
+    rows = db.execute(
+        select(ClipChange.seq, ClipChange.clip_id, ClipChange.deleted, *_RECORD_COLUMNS)
+        .select_from(ClipChange)
+        .outerjoin(ClipboardEntry, ClipboardEntry.id == ClipChange.clip_id)
+        .where(ClipChange.seq > since)
+        .order_by(ClipChange.seq)
+        .limit(limit + 1)
+    ).mappings().all()
+    # Checked after reading, so a prune that ran meanwhile is not missed.
+    if 0 < since < read_changes_floor(db):
+        raise ChangesExpiredError(f"Changes after {since} are no longer available; resync from 0")
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    clips = {record.id: record for record in _clip_records(db, [row for row in rows if row["id"] is not None])}
+    changes = [
+        ClipChangeRecord(
+            seq=row["seq"],
+            id=row["clip_id"],
+            deleted=row["clip_id"] not in clips,
+            clip=clips.get(row["clip_id"]),
+        )
+        for row in rows
+    ]
+    return ClipChangesPage(
+        changes=changes, next_since=changes[-1].seq if changes else since, has_more=has_more
+    )
+
+
 def delete_clipboard_entry(db: Session, *, entry_id: int) -> None:
-    """Delete an existing clipboard entry."""
+    """Delete an existing clipboard entry with a single ``DELETE ... RETURNING``."""
 
-    entry = db.query(ClipboardEntry).filter(ClipboardEntry.id == entry_id).first()
-    if not entry:
+    deleted = db.execute(
+        # The default synchronization evaluates the criteria in Python, so a
+        # loaded instance leaves the session without another round trip.
+        delete(ClipboardEntry).where(ClipboardEntry.id == entry_id).returning(ClipboardEntry.id)
+    ).scalar_one_or_none()
+    if deleted is None:
+        db.rollback()
         raise ClipboardEntryNotFoundError(f"Clip with id {entry_id} not found")
 
-    db.delete(entry)
+    record_clip_changes(db, [entry_id], deleted=True)
+    emit_clip_events(db, [_deleted_event(entry_id)])
+    db.commit()
+    generation = bump_generation(db)
+
+    if recent_clips_cache.enabled:
+        recent_clips_cache.apply_delete(generation, [entry_id])
+
+
+def delete_oldest_clipboard_entries(db: Session, condition: ColumnElement[bool], *, limit: int) -> List[int]:
+    """Delete up to ``limit`` of the oldest entries matching ``condition`` in one transaction.
+
+    Returns the deleted ids; an empty list means nothing matched any more.
+    Keeping each batch small bounds how long row locks are held.
+    """
+
+    oldest = (
+        select(ClipboardEntry.id)
+        .where(condition)
+        .order_by(ClipboardEntry.created_at, ClipboardEntry.id)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    deleted_ids = list(
+        db.execute(
+            delete(ClipboardEntry).where(ClipboardEntry.id.in_(oldest)).returning(ClipboardEntry.id),
+            execution_options={"synchronize_session": False},
+        ).scalars()
+    )
+    if not deleted_ids:
+        db.rollback()
+        return []
+
+    record_clip_changes(db, deleted_ids, deleted=True)
+    emit_clip_events(db, [_deleted_event(entry_id) for entry_id in deleted_ids])
     db.commit()
+    generation = bump_generation(db)
+
+    if recent_clips_cache.enabled:
+        recent_clips_cache.apply_delete(generation, deleted_ids)
+    return deleted_ids
+
+
+def delete_clipboard_entries(
+    db: Session,
+    *,
+    ids: Optional[Sequence[int]] = None,
+    before: Optional[datetime] = None,
+    entry_type: Optional[str] = None,
+    batch_size: int,
+) -> int:
+    """Delete every clip matching all of the given filters and return how many went.
+
+    Rows are removed oldest first in transactions of at most ``batch_size``
+    rows, so clearing a long history never holds locks for long. Clips added
+    while this runs are left alone.
+    """
+
+    if ids is None and before is None and entry_type is None:
+        raise InvalidClipboardEntryError("at least one of ids, before or type is required")
+
+    newest_id = db.execute(select(func.max(ClipboardEntry.id))).scalar_one_or_none()
+    db.rollback()
+    if newest_id is None:
+        return 0
+    conditions: List[ColumnElement[bool]] = [ClipboardEntry.id <= newest_id]
+    if ids is not None:
+        conditions.append(ClipboardEntry.id.in_(set(ids)))
+    if before is not None:
+        if before.tzinfo is not None:
+            before = before.astimezone(timezone.utc).replace(tzinfo=None)
+        conditions.append(ClipboardEntry.created_at < before)
+    if entry_type is not None:
+        conditions.append(ClipboardEntry.type == entry_type)
+
+    total = 0
+    while True:
+        deleted = delete_oldest_clipboard_entries(db, and_(*conditions), limit=batch_size)
+        total += len(deleted)
+        if len(deleted) < batch_size:
+            return total
+
+
+class ContentUpload:
+    """Replaces a clip's body with data streamed in arbitrary pieces.
+
+    Small bodies are buffered and stored inline; once a body outgrows
+    ``CLIP_INLINE_MAX_BYTES`` it is spilled to a :class:`BlobWriter`, so memory
+    stays bounded however large the upload is. UTF-8 validity and the size
+    limit are checked as data arrives. No transaction stays open while the
+    client sends: spilled chunks are committed as they fill, and :meth:`finish`
+    links the body to the clip in one short transaction. Call :meth:`abort` on
+    failure.
+    """
+
+    def __init__(self, entry_id: int, entry_type: str) -> None:
+        settings = load_settings()
+        self.entry_id = entry_id
+        self.entry_type = entry_type
+        self._max_bytes = settings.clip_max_content_bytes
+        self._inline_max_bytes = settings.clip_inline_max_bytes
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._inline: Optional[bytearray] = bytearray()
+        self._head: List[str] = []
+        self._head_chars = 0
+        self._writer: Optional[BlobWriter] = None
+        self.size = 0
+
+    def write(self, db: Session, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self._max_bytes:
+            raise ClipboardContentTooLargeError(f"content must not exceed {self._max_bytes} bytes")
+        self._decode(data)
+
+        if self._writer is not None:
+            self._writer.write(db, data)
+            return
+        self._inline += data
+        if len(self._inline) > self._inline_max_bytes:
+            self._writer = BlobWriter()
+            self._writer.write(db, bytes(self._inline))
+            self._inline = None
+
+    def _decode(self, data: bytes, *, final: bool = False) -> None:
+        try:
+            text_piece = self._decoder.decode(data, final=final)
+        except UnicodeDecodeError as exc:
+            raise InvalidClipboardEntryError("content must be UTF-8 text") from exc
+        if self._head_chars < INLINE_HEAD_CHARS and text_piece:
+            piece = text_piece[: INLINE_HEAD_CHARS - self._head_chars]
+            self._head.append(piece)
+            self._head_chars += len(piece)
+
+    def finish(self, db: Session) -> ClipboardEntry:
+        """Point the clip at the uploaded body, commit, and return the updated entry."""
+
+        self._decode(b"", final=True)
+        if self.size == 0:
+            raise InvalidClipboardEntryError("content must not be empty")
+
+        if self.entry_type == "url":
+            # Scheme and host sit at the start, so the head is enough to check.
+            _validate_url("".join(self._head))
+        if self._writer is None:
+            content = self._inline.decode("utf-8")
+            content_hash = compute_content_hash(content)
+            blob_sha256 = None
+        else:
+            content = "".join(self._head)
+            content_hash = blob_sha256 = self._writer.finish(db)
+
+        if is_partitioned(db.connection()):
+            # No unique index to fall back on; serialise with other writers of this content.
+            _lock_dedup_keys(db, [(self.entry_type, content_hash)])
+        duplicate = db.execute(
+            select(ClipboardEntry.id).where(
+                ClipboardEntry.type == self.entry_type,
+                ClipboardEntry.content_hash == content_hash,
+                ClipboardEntry.id != self.entry_id,
+            )
+        ).scalar_one_or_none()
+        if duplicate is not None:
+            raise ClipboardContentConflictError(f"Clip {duplicate} already has this content")
+
+        try:
+            persisted = db.execute(
+                update(ClipboardEntry)
+                .where(ClipboardEntry.id == self.entry_id)
+                .values(
+                    content=content,
+                    content_hash=content_hash,
+                    content_length=self.size,
+                    blob_sha256=blob_sha256,
+                    created_at=precise_now(),
+                )
+                .returning(
+                    ClipboardEntry.id, ClipboardEntry.type, ClipboardEntry.created_at, ClipboardEntry.copy_count
+                ),
+                execution_options={"synchronize_session": False},
+            ).one_or_none()
+        except IntegrityError as exc:
+            # A concurrent writer stored the same content after the check above.
+            raise ClipboardContentConflictError("Another clip already has this content") from exc
+        if persisted is None:
+            raise ClipboardEntryNotFoundError(f"Clip with id {self.entry_id} not found")
+
+        record_clip_changes(db, [persisted.id])
+        emit_clip_events(
+            db, [_updated_event(persisted.id, persisted.type, persisted.created_at, persisted.copy_count)]
+        )
+        db.commit()
+        bump_generation(db)
+        # The cached window holds full bodies, which this upload must not load.
+        recent_clips_cache.invalidate()
+        return db.get(ClipboardEntry, self.entry_id, populate_existing=True)
+
+    def abort(self, db: Session) -> None:
+        db.rollback()
+        if self._writer is not None:
+            self._writer.discard(db)
+
+
+def begin_content_upload(db: Session, *, entry_id: int) -> ContentUpload:
+    """Start replacing the body of an existing clip."""
+
+    entry_type = db.execute(
+        select(ClipboardEntry.type).where(ClipboardEntry.id == entry_id)
+    ).scalar_one_or_none()
+    # Holds no snapshot or locks while the client uploads; finish() re-checks the clip.
+    db.rollback()
+    if entry_type is None:
+        raise ClipboardEntryNotFoundError(f"Clip with id {entry_id} not found")
+    return ContentUpload(entry_id, entry_type)
+
+
+class ClipboardContent(NamedTuple):
+    """Where a clip's body lives and how large it is, without loading it."""
+
+    entry_id: int
+    content_hash: str
+    length: int
+    blob_sha256: Optional[str]
+    inline: Optional[bytes]
+
+
+def get_clipboard_content(db: Session, *, entry_id: int) -> ClipboardContent:
+    row = db.execute(
+        select(
+            ClipboardEntry.id,
+            ClipboardEntry.content_hash,
+            ClipboardEntry.content_length,
+            ClipboardEntry.blob_sha256,
+            # Inline bodies are small; out-of-line ones are streamed from the blob store.
+            case((ClipboardEntry.blob_sha256.is_(None), ClipboardEntry.content), else_=None).label("inline"),
+        ).where(ClipboardEntry.id == entry_id)
+    ).one_or_none()
+    if row is None:
+        raise ClipboardEntryNotFoundError(f"Clip with id {entry_id} not found")
+
+    inline = row.inline.encode("utf-8") if row.inline is not None else None
+    length = len(inline) if inline is not None else row.content_length
+    return ClipboardContent(row.id, row.content_hash, length, row.blob_sha256, inline)
+
+
+def iter_clipboard_content(
+    bind: Union[Engine, Connection], content: ClipboardContent, *, start: int, end: int
+) -> Iterator[bytes]:
+    """Yield bytes ``start..end`` (inclusive) of a clip body.
+
+    Out-of-line bodies are read through a session of their own, so the stream
+    does not depend on the request's session staying open.
+    """
+
+    if content.inline is not None:
+        yield content.inline[start : end + 1]
+        return
+
+    with Session(bind=bind) as db:
+        yield from iter_blob_range(db, content.blob_sha256, start, end)
+
+
+# The async variants drive the sync implementations through ``AsyncSession.run_sync``
+# so both request paths share one code path. Only the driver I/O is awaited: the ORM
+# and serialization work still runs on the event loop, between awaits.
+
+
+async def create_clipboard_entry_async(db: AsyncSession, payload: ClipboardEntryCreate) -> ClipboardEntry:
+    """Async counterpart of :func:`create_clipboard_entry`."""
+
+    return await db.run_sync(create_clipboard_entry, payload)
+
+
+async def list_clipboard_page_async(
+    db: AsyncSession, *, limit: int, cursor: Optional[str] = None, generation: Optional[int] = None
+) -> ClipboardPage:
+    """Async counterpart of :func:`list_clipboard_page`."""
+
+    return await db.run_sync(list_clipboard_page, limit=limit, cursor=cursor, generation=generation)
+
+
+async def list_clipboard_preview_page_async(
+    db: AsyncSession, *, limit: int, cursor: Optional[str] = None
+) -> ClipboardPage:
+    """Async counterpart of :func:`list_clipboard_preview_page`."""
+
+    return await db.run_sync(list_clipboard_preview_page, limit=limit, cursor=cursor)
+
+
+async def get_clipboard_entry_async(db: AsyncSession, *, entry_id: int) -> ClipboardEntry:
+    """Async counterpart of :func:`get_clipboard_entry`."""
+
+    return await db.run_sync(get_clipboard_entry, entry_id=entry_id)
+
+
+async def search_clipboard_entries_async(
+    db: AsyncSession, *, query: str, limit: int, cursor: Optional[str] = None
+) -> ClipboardPage:
+    """Async counterpart of :func:`search_clipboard_entries`."""
+
+    return await db.run_sync(search_clipboard_entries, query=query, limit=limit, cursor=cursor)
+
+
+async def delete_clipboard_entries_async(
+    db: AsyncSession,
+    *,
+    ids: Optional[Sequence[int]] = None,
+    before: Optional[datetime] = None,
+    entry_type: Optional[str] = None,
+    batch_size: int,
+) -> int:
+    """Async counterpart of :func:`delete_clipboard_entries`."""
+
+    return await db.run_sync(
+        delete_clipboard_entries, ids=ids, before=before, entry_type=entry_type, batch_size=batch_size
+    )
+
+
+async def read_generation_async(db: AsyncSession) -> int:
+    """Async counterpart of :func:`read_generation`."""
+
+    generation = await db.scalar(
+        select(ClipSyncState.generation).where(ClipSyncState.id == ClipSyncState.SINGLETON_ID)
+    )
+    return generation or 0
+
+
+async def delete_clipboard_entry_async(db: AsyncSession, *, entry_id: int) -> None:
+    """Async counterpart of :func:`delete_clipboard_entry`."""
+
+    await db.run_sync(delete_clipboard_entry, entry_id=entry_id)
 
 
 __all__ = [
+    "BATCH_INSERT_PAGE_SIZE",
+    "BatchCreateResult",
+    "BatchCreatedEntry",
+    "BatchRejectedEntry",
+    "ChangesExpiredError",
+    "ClipChangeRecord",
+    "ClipChangesPage",
+    "ClipboardContent",
+    "ClipboardContentConflictError",
+    "ClipboardContentTooLargeError",
     "ClipboardEntryNotFoundError",
+    "ClipboardPage",
     "ClipboardServiceError",
+    "ClipPreview",
+    "ClipRecord",
+    "ContentUpload",
     "InvalidClipboardEntryError",
+    "InvalidCursorError",
+    "RecentClipsCache",
+    "begin_content_upload",
+    "bump_generation",
+    "create_clipboard_entries",
     "create_clipboard_entry",
+    "create_clipboard_entry_async",
+    "delete_clipboard_entries",
+    "delete_clipboard_entries_async",
     "delete_clipboard_entry",
+    "delete_clipboard_entry_async",
+    "delete_oldest_clipboard_entries",
+    "decode_cursor",
+    "encode_cursor",
+    "get_clipboard_content",
+    "get_clipboard_entry",
+    "get_clipboard_entry_async",
+    "iter_clipboard_content",
+    "list_clip_changes",
+    "list_clip_previews",
+    "list_clip_records",
     "list_clipboard_entries",
+    "list_clipboard_page",
+    "list_clipboard_page_async",
+    "list_clipboard_preview_page",
+    "list_clipboard_preview_page_async",
+    "read_generation",
+    "read_generation_async",
+    "recent_clips_cache",
+    "search_clipboard_entries",
+    "search_clipboard_entries_async",
 ]
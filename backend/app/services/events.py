@@ -0,0 +1,211 @@
+"""Clip change notifications fanned out to streaming clients.
+
+Writers call :func:`emit_clip_events` inside their transaction. On PostgreSQL
+this issues ``pg_notify`` so every worker process hears about the change on
+commit; each worker keeps a single ``LISTEN`` connection (see
+:class:`ClipEventBroker`) and fans notifications out to its subscribers. Other
+backends publish to the in-process broker once the session commits.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.config import load_settings
+
+
+logger = logging.getLogger(__name__)
+
+CLIP_EVENTS_CHANNEL = "clip_events"
+
+# Session.info key holding events to publish locally once the session commits.
+_PENDING_EVENTS_KEY = "clip_events.pending"
+
+# Events sent to subscribers that may have missed notifications and should refetch.
+RESYNC_EVENT: Dict[str, Any] = {"event": "resync"}
+
+
+def emit_clip_events(db: Session, payloads: Sequence[Dict[str, Any]]) -> None:
+    """Queue change notifications that are delivered when ``db`` commits."""
+
+    if not payloads:
+        return
+
+    if db.get_bind().dialect.name == "postgresql":
+        # NOTIFY is transactional: listeners only hear about committed changes.
+        db.execute(
+            text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"channel": CLIP_EVENTS_CHANNEL, "payloads": [json.dumps(payload) for payload in payloads]},
+        )
+        return
+
+    db.info.setdefault(_PENDING_EVENTS_KEY, []).extend(payloads)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_events(session: Session) -> None:
+    for payload in session.info.pop(_PENDING_EVENTS_KEY, ()):
+        clip_event_broker.publish(payload)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_events(session: Session, previous_transaction: Any) -> None:
+    if not session.in_transaction():
+        session.info.pop(_PENDING_EVENTS_KEY, None)
+
+
+class ClipEventSubscription:
+    """A subscriber's bounded event queue, bound to its event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int) -> None:
+        self.loop = loop
+        self._queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=maxsize)
+
+    def _deliver(self, payload: Dict[str, Any]) -> None:
+        if self._queue.full():
+            # A slow consumer loses its backlog and is told to refetch instead.
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            payload = RESYNC_EVENT
+        self._queue.put_nowait(payload)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self._queue.get()
+
+
+class ClipEventBroker:
+    """Per-process fan-out of clip change events to streaming subscribers."""
+
+    def __init__(self, *, queue_size: int = 256, channel: str = CLIP_EVENTS_CHANNEL) -> None:
+        self.queue_size = queue_size
+        self.channel = channel
+        self._subscribers: Set[ClipEventSubscription] = set()
+        self._lock = threading.Lock()
+        self._listener: Optional[_PostgresListener] = None
+
+    def subscribe(self) -> ClipEventSubscription:
+        """Register a subscriber on the running event loop."""
+
+        subscription = ClipEventSubscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ClipEventSubscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, payload: Dict[str, Any]) -> None:
+        """Deliver ``payload`` to every subscriber; safe to call from any thread."""
+
+        with self._lock:
+            subscribers: List[ClipEventSubscription] = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, payload)
+            except RuntimeError:
+                # The subscriber's loop has shut down; it will never read again.
+                self.unsubscribe(subscription)
+
+    def start(self, engine: Engine) -> None:
+        """Start the ``LISTEN`` thread when ``engine`` points at PostgreSQL.
+
+        The listener connects to ``DATABASE_LISTEN_URL`` when set. Under
+        ``DB_PGBOUNCER`` it must be: a transaction-mode pooler hands the
+        connection to other clients between statements, so notifications would
+        never arrive, and startup fails instead.
+        """
+
+        if self._listener is not None or engine.dialect.name != "postgresql":
+            return
+        settings = load_settings()
+        if settings.database_listen_url:
+            engine = create_engine(settings.database_listen_url, poolclass=NullPool)
+        elif settings.db_pgbouncer:
+            raise RuntimeError(
+                "Clip events need a direct PostgreSQL connection for LISTEN, which PgBouncer in "
+                "transaction mode cannot provide; set DATABASE_LISTEN_URL to connect around it."
+            )
+        self._listener = _PostgresListener(engine, self)
+        self._listener.start()
+
+    def stop(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._listener = None
+
+
+class _PostgresListener(threading.Thread):
+    """Holds the worker's single ``LISTEN`` connection and forwards notifications."""
+
+    poll_interval = 1.0
+    reconnect_delay = 2.0
+
+    def __init__(self, engine: Engine, broker: ClipEventBroker) -> None:
+        super().__init__(name="clip-events-listener", daemon=True)
+        self._engine = engine
+        self._broker = broker
+        self._stopped = threading.Event()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join(timeout=self.poll_interval * 2)
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.warning("Clip event listener lost its connection; reconnecting", exc_info=True)
+                self._stopped.wait(self.reconnect_delay)
+
+    def _listen(self) -> None:
+        proxied = self._engine.raw_connection()
+        # Detached so the long-lived connection does not count against the pool.
+        proxied.detach()
+        connection = proxied.dbapi_connection
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self._broker.channel}"')
+            # Anything committed while we were disconnected was missed.
+            self._broker.publish(RESYNC_EVENT)
+
+            while not self._stopped.is_set():
+                readable, _, _ = select.select([connection], [], [], self.poll_interval)
+                if not readable:
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notification = connection.notifies.pop(0)
+                    self._broker.publish(json.loads(notification.payload))
+        finally:
+            connection.close()
+
+
+clip_event_broker = ClipEventBroker()
+
+
+__all__ = [
+    "CLIP_EVENTS_CHANNEL",
+    "RESYNC_EVENT",
+    "ClipEventBroker",
+    "ClipEventSubscription",
+    "clip_event_broker",
+    "emit_clip_events",
+]
@@ -0,0 +1,243 @@
+"""Group commit for ``POST /clip``: concurrent clips share one transaction.
+
+Enabled with ``CLIP_GROUP_COMMIT=true``. Requests hand their payload to a
+single writer thread and wait on a future. The writer takes whatever has
+queued up, waits at most ``CLIP_GROUP_COMMIT_MAX_WAIT_MS`` for more (up to
+``CLIP_GROUP_COMMIT_MAX_BATCH`` clips), and persists the lot with
+:func:`create_clipboard_entries`, so the database flushes its log once per
+batch instead of once per clip. While a batch commits the next one fills up,
+so under load batches grow without any added wait.
+
+The queue holds at most one batch, so a request waits for no more than the
+batch being committed plus its own; once a full batch is queued, callers
+write directly instead of queueing behind it.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings, load_settings
+from app.schemas.clipboard_entry import ClipboardEntryCreate, ClipboardEntryCreated
+from app.services.clipboard import (
+    InvalidClipboardEntryError,
+    create_clipboard_entries,
+    create_clipboard_entry,
+)
+
+
+logger = logging.getLogger(__name__)
+
+_Pending = Tuple[ClipboardEntryCreate, Future]
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """Coalesces concurrently submitted clips into shared transactions."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = False,
+        max_batch: int = 256,
+        max_wait: float = 0.002,
+    ) -> None:
+        self.enabled = enabled
+        self.max_batch = max(max_batch, 1)
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=self.max_batch)
+        self._thread: Optional[threading.Thread] = None
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self._lifecycle_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._clips = 0
+        self._max_batch_seen = 0
+        self._last_batch_ms: Optional[float] = None
+        self._max_batch_ms: Optional[float] = None
+        self._fallbacks = 0
+        self._failed_batches = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "GroupCommitWriter":
+        return cls(
+            enabled=settings.clip_group_commit,
+            max_batch=settings.clip_group_commit_max_batch,
+            max_wait=settings.clip_group_commit_max_wait_ms / 1000,
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, session_factory: Callable[[], Session]) -> None:
+        if self._thread is not None or not self.enabled:
+            return
+        self._session_factory = session_factory
+        self._thread = threading.Thread(target=self._run, name="clip-group-commit", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Flush everything already queued, then stop the writer thread."""
+
+        with self._lifecycle_lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join()
+
+        leftovers: List[_Pending] = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftovers.append(item)
+        self._commit_pending(leftovers)
+
+    def submit(self, payload: ClipboardEntryCreate) -> Optional[Future]:
+        """Queue ``payload`` for the next batch.
+
+        Returns ``None`` when the writer is not running or its queue is full;
+        the caller should then create the clip itself.
+        """
+
+        future: Future = Future()
+        with self._lifecycle_lock:
+            if self._thread is None:
+                return None
+            try:
+                self._queue.put_nowait((payload, future))
+            except queue.Full:
+                full = True
+            else:
+                full = False
+        if full:
+            with self._stats_lock:
+                self._fallbacks += 1
+            return None
+        return future
+
+    async def create(self, payload: ClipboardEntryCreate) -> Optional[ClipboardEntryCreated]:
+        """Create ``payload`` in the next batch; ``None`` means the caller must write it itself."""
+
+        future = self.submit(payload)
+        if future is None:
+            return None
+        return await asyncio.wrap_future(future)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch: List[_Pending] = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                # Drain what is already queued; wait only while the deadline allows.
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit_pending(batch)
+
+    def _commit_pending(self, batch: List[_Pending]) -> None:
+        # Requests that gave up while queued are dropped; the rest can no longer be cancelled.
+        batch = [(payload, future) for payload, future in batch if future.set_running_or_notify_cancel()]
+        if batch:
+            self._commit(batch)
+
+    def _commit(self, batch: List[_Pending]) -> None:
+        started = time.perf_counter()
+        try:
+            with self._session_factory() as db:
+                try:
+                    result = create_clipboard_entries(db, [payload for payload, _ in batch])
+                except Exception:
+                    db.rollback()
+                    with self._stats_lock:
+                        self._failed_batches += 1
+                    logger.warning(
+                        "Group commit of %d clips failed; retrying them one by one", len(batch), exc_info=True
+                    )
+                    self._commit_individually(db, batch)
+                    return
+        except Exception as exc:
+            logger.exception("Group commit writer could not open a session")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for created in result.created:
+            payload, future = batch[created.position]
+            future.set_result(
+                ClipboardEntryCreated(
+                    id=created.id,
+                    type=payload.type,
+                    title=created.title,
+                    created_at=created.created_at,
+                    copy_count=created.copy_count,
+                    content_length=created.content_length,
+                    content_hash=created.content_hash,
+                )
+            )
+        for rejected in result.rejected:
+            batch[rejected.position][1].set_exception(InvalidClipboardEntryError(rejected.detail))
+        self._record_batch(len(batch), time.perf_counter() - started)
+
+    def _commit_individually(self, db: Session, batch: List[_Pending]) -> None:
+        for payload, future in batch:
+            try:
+                entry = create_clipboard_entry(db, payload)
+                future.set_result(ClipboardEntryCreated.model_validate(entry))
+            except Exception as exc:
+                db.rollback()
+                future.set_exception(exc)
+
+    def _record_batch(self, size: int, elapsed: float) -> None:
+        elapsed_ms = elapsed * 1000
+        with self._stats_lock:
+            self._batches += 1
+            self._clips += size
+            self._max_batch_seen = max(self._max_batch_seen, size)
+            self._last_batch_ms = elapsed_ms
+            self._max_batch_ms = max(self._max_batch_ms or 0.0, elapsed_ms)
+
+    def stats(self) -> Dict[str, object]:
+        with self._stats_lock:
+            return {
+                "enabled": self.enabled,
+                "running": self.running,
+                "pending": self._queue.qsize(),
+                "batches": self._batches,
+                "clips": self._clips,
+                "mean_batch_size": self._clips / self._batches if self._batches else None,
+                "max_batch_size": self._max_batch_seen,
+                "last_batch_ms": self._last_batch_ms,
+                "max_batch_ms": self._max_batch_ms,
+                "failed_batches": self._failed_batches,
+                "fallbacks": self._fallbacks,
+            }
+
+
+group_commit_writer = GroupCommitWriter.from_settings(load_settings())
+
+
+__all__ = ["GroupCommitWriter", "group_commit_writer"]
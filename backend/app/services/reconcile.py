@@ -0,0 +1,449 @@
+"""Range-hash set reconciliation of clip histories.
+
+A client that has been offline for a long time, or whose local store may be
+damaged, compares its set of ``(id, content_hash)`` pairs with the server's
+instead of downloading everything again. Both sides summarise an id range
+``[start, end)`` by the number of clips in it and the XOR of a 64-bit leaf
+hash per clip (see :func:`clip_leaf`). For every range whose summary differs,
+:func:`reconcile_ranges` returns either the range's items, once it holds at
+most ``RECONCILE_MAX_ITEMS`` clips, or ``RECONCILE_FANOUT`` subranges of
+roughly equal population with the server's summaries, which the client
+compares in turn. Only differing ranges are split further, so the data
+exchanged grows with the size of the difference and the logarithm of the
+history, not with the history.
+
+Summaries of aligned id buckets are cached per process in
+:class:`RangeDigestCache`, which a background task keeps current from the
+change log of the primary while clients reconcile; the first request starts
+it and it stops after ``RECONCILE_IDLE_SECONDS`` without one. Requests never
+rebuild it: they read the buckets changed since the cached snapshot straight
+from the table, and get :class:`ReconcileUnavailableError` while no usable
+snapshot exists. On PostgreSQL the leaves are hashed and folded in SQL, so
+neither the refresh nor a request moves rows into Python.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import BigInteger, ColumnElement, distinct, func, literal_column, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings, load_settings
+from app.models.clip_change import ClipChange
+from app.models.clip_sync_state import ClipSyncState
+from app.models.clipboard_entry import ClipboardEntry
+
+
+logger = logging.getLogger(__name__)
+
+# Ids per cached bucket; ranges are split on bucket boundaries where possible.
+DIGEST_BUCKET_SIZE = 1024
+RECONCILE_FANOUT = 16
+# A differing range at most this populated is answered with its items.
+RECONCILE_MAX_ITEMS = 128
+# More changed buckets than this since the last refresh rebuilds the cache in one scan.
+MAX_BUCKET_RELOADS = 256
+# Changed buckets reloaded per query.
+BUCKET_RELOAD_PAGE_SIZE = 64
+
+# Exclusive upper bound for range ends; clip ids are 32-bit integers.
+MAX_CLIP_ID = 2**31
+
+
+def clip_leaf(entry_id: int, content_hash: str) -> int:
+    """The first 8 bytes, big-endian, of SHA-256 over ``"<id>:<content_hash>"``."""
+
+    return int.from_bytes(hashlib.sha256(f"{entry_id}:{content_hash}".encode()).digest()[:8], "big")
+
+
+def format_digest(value: int) -> str:
+    return f"{value:016x}"
+
+
+class RangeSummary(NamedTuple):
+    """A range ``[start, end)`` of clip ids, its digest (hex XOR of leaves) and clip count."""
+
+    start: int
+    end: int
+    digest: str
+    count: int
+
+
+class RangeItem(NamedTuple):
+    id: int
+    content_hash: str
+
+
+class RangeResult(NamedTuple):
+    """The server's side of a range; ``items`` is set once the range is small enough to list."""
+
+    start: int
+    end: int
+    digest: str
+    count: int
+    items: Optional[List[RangeItem]] = None
+
+
+def _fold(rows: Iterable[Tuple[int, str]]) -> Tuple[int, int]:
+    digest = 0
+    count = 0
+    for entry_id, content_hash in rows:
+        digest ^= clip_leaf(entry_id, content_hash)
+        count += 1
+    return digest, count
+
+
+def _id_range(start: int, end: int):
+    return select(ClipboardEntry.id, ClipboardEntry.content_hash).where(_in_range(start, end))
+
+
+def _in_range(start: int, end: int) -> ColumnElement[bool]:
+    return (ClipboardEntry.id >= start) & (ClipboardEntry.id < end)
+
+
+# :func:`clip_leaf` in PostgreSQL, as a signed bigint with the same 64 bits.
+_SQL_LEAF = literal_column(
+    "('x' || left(encode(sha256(convert_to(clips.id::text || ':' || clips.content_hash, 'UTF8')), 'hex'), 16))"
+    "::bit(64)::bigint",
+    BigInteger,
+)
+
+
+def _digests_in_sql(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _range_digest(db: Session, start: int, end: int) -> Tuple[int, int]:
+    """``(digest, count)`` of the clips with ``start <= id < end``."""
+
+    if _digests_in_sql(db):
+        digest, count = db.execute(
+            select(func.coalesce(func.bit_xor(_SQL_LEAF), 0), func.count()).where(_in_range(start, end))
+        ).one()
+        return digest % 2**64, count
+    return _fold(db.execute(_id_range(start, end)).tuples())
+
+
+def _bucket_digests(db: Session, bucket_size: int, *conditions: ColumnElement[bool]) -> Dict[int, Tuple[int, int]]:
+    """``(digest, count)`` per non-empty bucket of the clips matching ``conditions``."""
+
+    if _digests_in_sql(db):
+        bucket = ClipboardEntry.id // bucket_size
+        rows = db.execute(
+            select(bucket, func.bit_xor(_SQL_LEAF), func.count()).where(*conditions).group_by(bucket)
+        ).tuples()
+        return {index: (digest % 2**64, count) for index, digest, count in rows}
+
+    buckets: Dict[int, Tuple[int, int]] = {}
+    rows = db.execute(
+        select(ClipboardEntry.id, ClipboardEntry.content_hash).where(*conditions).execution_options(yield_per=10_000)
+    )
+    for entry_id, content_hash in rows:
+        index = entry_id // bucket_size
+        digest, count = buckets.get(index, (0, 0))
+        buckets[index] = (digest ^ clip_leaf(entry_id, content_hash), count + 1)
+    return buckets
+
+
+class ReconcileUnavailableError(RuntimeError):
+    """The digest cache has no snapshot of this database yet, or one older than the change log reaches."""
+
+
+class _DigestSnapshot:
+    """``(digest, count)`` of every non-empty bucket of ``bucket_size`` ids in one database.
+
+    Tagged with the engine URL it was read from and the last change-log
+    ``seq`` it reflects. Never modified once published, so requests read it
+    without a lock.
+    """
+
+    def __init__(self, url: str, seq: int, bucket_size: int, buckets: Dict[int, Tuple[int, int]]) -> None:
+        self.url = url
+        self.seq = seq
+        self.bucket_size = bucket_size
+        self.buckets = buckets
+        self.keys = sorted(buckets)
+
+    def summary(self, db: Session, start: int, end: int, dirty: Set[int]) -> Tuple[int, int]:
+        # Buckets wholly inside the range come from the snapshot, unless changed since; the rest from the table.
+        first, last = -(-start // self.bucket_size), end // self.bucket_size
+        if first >= last:
+            return _range_digest(db, start, end)
+
+        digest, count = _range_digest(db, start, first * self.bucket_size)
+        edge_digest, edge_count = _range_digest(db, last * self.bucket_size, end)
+        digest ^= edge_digest
+        count += edge_count
+        for index in self.keys[bisect.bisect_left(self.keys, first) : bisect.bisect_left(self.keys, last)]:
+            if index in dirty:
+                continue
+            bucket_digest, bucket_count = self.buckets[index]
+            digest ^= bucket_digest
+            count += bucket_count
+        for index in sorted(index for index in dirty if first <= index < last):
+            bucket_start = index * self.bucket_size
+            bucket_digest, bucket_count = _range_digest(db, bucket_start, bucket_start + self.bucket_size)
+            digest ^= bucket_digest
+            count += bucket_count
+        return digest, count
+
+    def split(self, start: int, end: int) -> List[int]:
+        """Bounds of up to ``RECONCILE_FANOUT`` subranges of ``[start, end)``.
+
+        A range over several populated buckets is cut on bucket boundaries
+        into parts of similar population; otherwise the populated bucket (or
+        the whole range, if none is) is cut into equal widths. Populations
+        come from the snapshot, so may be slightly stale; any bounds are valid.
+        """
+
+        keys = self.keys[
+            bisect.bisect_left(self.keys, start // self.bucket_size) : bisect.bisect_left(
+                self.keys, -(-end // self.bucket_size)
+            )
+        ]
+        if len(keys) < 2:
+            low, high = start, end
+            if keys:
+                low = max(start, keys[0] * self.bucket_size)
+                high = min(end, (keys[0] + 1) * self.bucket_size)
+            inner = {low + (high - low) * part // RECONCILE_FANOUT for part in range(1, RECONCILE_FANOUT)}
+            if keys:
+                inner |= {low, high}
+            return [start, *sorted(bound for bound in inner if start < bound < end), end]
+
+        total = sum(self.buckets[index][1] for index in keys)
+        bounds = [start]
+        seen = 0
+        for index in keys[:-1]:
+            seen += self.buckets[index][1]
+            if seen * RECONCILE_FANOUT >= total * len(bounds):
+                bounds.append((index + 1) * self.bucket_size)
+        bounds.append(end)
+        return bounds
+
+
+class RangeDigestCache:
+    """Bucket digests of the primary database, refreshed every ``interval`` seconds in the background.
+
+    A refresh reloads the buckets of clips changed since the current
+    snapshot, or rebuilds everything when the change log has been pruned past
+    it, and then publishes a new snapshot. Requests only take a reference to
+    the snapshot under the lock. The refresh loop runs only while requests
+    keep coming: the first one starts it and it ends after ``idle_timeout``
+    seconds without one, keeping its last snapshot for the next.
+    """
+
+    def __init__(
+        self, bucket_size: int = DIGEST_BUCKET_SIZE, *, interval: float = 2.0, idle_timeout: float = 300.0
+    ) -> None:
+        self.bucket_size = bucket_size
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        # One refresh at a time; requests never wait on it.
+        self._refresh_lock = threading.Lock()
+        self._snapshot: Optional[_DigestSnapshot] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self._last_request = 0.0
+        self._last_error: Optional[str] = None
+        self.rebuilds = 0
+        self.bucket_reloads = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RangeDigestCache":
+        return cls(interval=settings.reconcile_refresh_seconds, idle_timeout=settings.reconcile_idle_seconds)
+
+    def start(self, session_factory: Callable[[], Session]) -> None:
+        """Let requests start the refresh loop on the running event loop; nothing runs until one does."""
+
+        self._session_factory = session_factory
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        self._loop = None
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _wake(self) -> None:
+        # Called from request threads; the task itself is created on the loop.
+        self._last_request = time.monotonic()
+        loop = self._loop
+        if loop is not None and self._task is None:
+            loop.call_soon_threadsafe(self._spawn)
+
+    def _spawn(self) -> None:
+        if self._task is None and self._loop is not None:
+            self._task = self._loop.create_task(self._run(), name="range-digest-refresh")
+
+    async def _run(self) -> None:
+        try:
+            while time.monotonic() - self._last_request < self.idle_timeout:
+                await self._refresh_once()
+                await asyncio.sleep(self.interval)
+        finally:
+            self._task = None
+
+    async def _refresh_once(self) -> None:
+        db = self._session_factory()
+        try:
+            await asyncio.to_thread(self.refresh, db)
+            self._last_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self._last_error = repr(exc)
+            logger.exception("Range digest refresh failed")
+        finally:
+            db.close()
+
+    def refresh(self, db: Session) -> None:
+        """Bring the snapshot up to date with ``db``, replacing one taken from another database."""
+
+        url = str(db.get_bind().url)
+        with self._refresh_lock:
+            with self._lock:
+                snapshot = self._snapshot
+            head, floor = _change_log_bounds(db)
+            if snapshot is None or snapshot.url != url or floor > snapshot.seq:
+                self._publish(self._rebuild(db, url, head))
+                return
+
+            bucket = ClipChange.clip_id // self.bucket_size
+            changed = db.execute(
+                select(bucket, func.max(ClipChange.seq)).where(ClipChange.seq > snapshot.seq).group_by(bucket)
+            ).all()
+            if not changed:
+                return
+            seq = max(seq for _, seq in changed)
+            if len(changed) > MAX_BUCKET_RELOADS:
+                self._publish(self._rebuild(db, url, seq))
+                return
+            buckets = dict(snapshot.buckets)
+            self._load_buckets(db, buckets, sorted(index for index, _ in changed))
+            self._publish(_DigestSnapshot(url, seq, self.bucket_size, buckets))
+
+    def _publish(self, snapshot: _DigestSnapshot) -> None:
+        with self._lock:
+            self._snapshot = snapshot
+
+    def _rebuild(self, db: Session, url: str, seq: int) -> _DigestSnapshot:
+        # Rows committed after ``seq`` may be included; their changes reload the same buckets later.
+        buckets = _bucket_digests(db, self.bucket_size)
+        self.rebuilds += 1
+        return _DigestSnapshot(url, seq, self.bucket_size, buckets)
+
+    def _load_buckets(self, db: Session, buckets: Dict[int, Tuple[int, int]], indexes: List[int]) -> None:
+        for offset in range(0, len(indexes), BUCKET_RELOAD_PAGE_SIZE):
+            page = indexes[offset : offset + BUCKET_RELOAD_PAGE_SIZE]
+            # Id ranges rather than ``id / size IN (...)`` so the primary key index serves the lookup.
+            loaded = _bucket_digests(
+                db,
+                self.bucket_size,
+                or_(*(_in_range(index * self.bucket_size, (index + 1) * self.bucket_size) for index in page)),
+            )
+            for index in page:
+                if index in loaded:
+                    buckets[index] = loaded[index]
+                else:
+                    buckets.pop(index, None)
+            self.bucket_reloads += len(page)
+
+    def reconcile(self, db: Session, ranges: Sequence[RangeSummary]) -> List[RangeResult]:
+        self._wake()
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None or snapshot.url != str(db.get_bind().url):
+            raise ReconcileUnavailableError("Range digests are still being built; retry shortly")
+
+        bucket = ClipChange.clip_id // self.bucket_size
+        dirty = set(db.scalars(select(distinct(bucket)).where(ClipChange.seq > snapshot.seq)))
+        # Read after the changes: a floor still below the snapshot means none of them were pruned.
+        if _change_log_bounds(db)[1] > snapshot.seq:
+            raise ReconcileUnavailableError("Range digests are being rebuilt; retry shortly")
+
+        results: List[RangeResult] = []
+        for requested in ranges:
+            digest, count = snapshot.summary(db, requested.start, requested.end, dirty)
+            if (format_digest(digest), count) == (requested.digest, requested.count):
+                continue
+            if count <= RECONCILE_MAX_ITEMS:
+                items = [
+                    RangeItem(row.id, row.content_hash)
+                    for row in db.execute(_id_range(requested.start, requested.end).order_by(ClipboardEntry.id))
+                ]
+                results.append(RangeResult(requested.start, requested.end, format_digest(digest), count, items))
+                continue
+            bounds = snapshot.split(requested.start, requested.end)
+            for start, end in zip(bounds, bounds[1:]):
+                digest, count = snapshot.summary(db, start, end, dirty)
+                results.append(RangeResult(start, end, format_digest(digest), count))
+        return results
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            snapshot = self._snapshot
+        return {
+            "running": self._task is not None,
+            "idle_timeout": self.idle_timeout,
+            "buckets": 0 if snapshot is None else len(snapshot.buckets),
+            "seq": None if snapshot is None else snapshot.seq,
+            "rebuilds": self.rebuilds,
+            "bucket_reloads": self.bucket_reloads,
+            "last_error": self._last_error,
+        }
+
+
+def _change_log_bounds(db: Session) -> Tuple[int, int]:
+    """The newest change-log ``seq`` and the floor below which it has been pruned."""
+
+    state = db.execute(
+        select(ClipSyncState.change_seq, ClipSyncState.changes_floor).where(
+            ClipSyncState.id == ClipSyncState.SINGLETON_ID
+        )
+    ).one_or_none()
+    head, floor = state if state is not None else (None, None)
+    return head or 0, floor or 0
+
+
+range_digest_cache = RangeDigestCache.from_settings(load_settings())
+
+
+def reconcile_ranges(db: Session, ranges: Sequence[RangeSummary]) -> List[RangeResult]:
+    """Compare the client's range summaries with the server's and expand the ones that differ."""
+
+    return range_digest_cache.reconcile(db, ranges)
+
+
+__all__ = [
+    "DIGEST_BUCKET_SIZE",
+    "MAX_CLIP_ID",
+    "RECONCILE_FANOUT",
+    "RECONCILE_MAX_ITEMS",
+    "RangeDigestCache",
+    "RangeItem",
+    "RangeResult",
+    "RangeSummary",
+    "ReconcileUnavailableError",
+    "clip_leaf",
+    "format_digest",
+    "range_digest_cache",
+    "reconcile_ranges",
+]
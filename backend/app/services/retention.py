@@ -0,0 +1,401 @@
+"""Retention policy for clips and the background task that enforces it.
+
+The pruner deletes expired clips in small batches with a pause in between, so
+it never holds row locks long enough to stall ``POST /clip``, and then removes
+stored bodies that no clip references any more and, past their maximum age,
+the tombstones the change log keeps for deleted clips. On a partitioned
+``clips`` table it also creates upcoming monthly partitions and drops whole
+partitions that fall past the maximum age instead of deleting their rows.
+
+Every worker process runs a pruner, but on PostgreSQL a pass first takes a
+session-level advisory lock with ``pg_try_advisory_lock`` and is skipped when
+another worker holds it, so only one prunes at a time.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import ColumnElement, Connection, Engine, column, select, table, text, true, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings, load_settings
+from app.db.partitions import (
+    detach_partition,
+    detached_partitions,
+    drop_partition,
+    ensure_partitions,
+    expired_partitions,
+    is_partitioned,
+)
+from app.models.clipboard_entry import ClipboardEntry
+from app.services.blobs import delete_orphaned_blobs
+from app.services.changes import prune_tombstones, record_deleted_clips
+from app.services.clipboard import bump_generation, delete_oldest_clipboard_entries, recent_clips_cache
+from app.services.events import RESYNC_EVENT, emit_clip_events
+
+
+logger = logging.getLogger(__name__)
+
+# Two-int advisory lock key: a separate key space from the bigint dedup locks.
+RETENTION_LOCK_KEY = (int.from_bytes(b"clip", "big"), 1)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class RetentionPolicy(NamedTuple):
+    """Limits beyond which clips are pruned; ``None`` or empty disables a rule."""
+
+    max_age: Optional[timedelta] = None
+    max_rows: Optional[int] = None
+    type_max_rows: Dict[str, int] = {}
+    tombstone_max_age: Optional[timedelta] = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RetentionPolicy":
+        return cls(
+            max_age=timedelta(days=settings.retention_max_age_days) if settings.retention_max_age_days > 0 else None,
+            max_rows=settings.retention_max_rows if settings.retention_max_rows > 0 else None,
+            type_max_rows={
+                entry_type: limit for entry_type, limit in settings.retention_type_max_rows.items() if limit > 0
+            },
+            tombstone_max_age=(
+                timedelta(days=settings.tombstone_max_age_days) if settings.tombstone_max_age_days > 0 else None
+            ),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return (
+            self.max_age is not None
+            or self.max_rows is not None
+            or bool(self.type_max_rows)
+            or self.tombstone_max_age is not None
+        )
+
+
+class RetentionRule(NamedTuple):
+    name: str
+    condition: ColumnElement[bool]
+
+
+def _beyond_newest(db: Session, keep: int, *, entry_type: Optional[str] = None) -> Optional[ColumnElement[bool]]:
+    """Match entries older than the ``keep`` newest, or ``None`` if there are not that many.
+
+    The boundary is fixed when the rule is built: clips added while a pass runs
+    only move it newer, so the pass may under-delete but never over-delete.
+    """
+
+    scope = ClipboardEntry.type == entry_type if entry_type is not None else true()
+    boundary = db.execute(
+        select(ClipboardEntry.created_at, ClipboardEntry.id)
+        .where(scope)
+        .order_by(ClipboardEntry.created_at.desc(), ClipboardEntry.id.desc())
+        .offset(keep - 1)
+        .limit(1)
+    ).first()
+    db.rollback()
+    if boundary is None:
+        return None
+    return scope & (tuple_(ClipboardEntry.created_at, ClipboardEntry.id) < tuple(boundary))
+
+
+def max_age_cutoff(policy: RetentionPolicy, *, now: Optional[datetime] = None) -> Optional[datetime]:
+    if policy.max_age is None:
+        return None
+    # created_at is stored as naive UTC.
+    return (now or _utcnow()) - policy.max_age
+
+
+def drop_expired_partitions(db: Session, *, before: datetime) -> List[str]:
+    """Drop ``clips`` partitions holding only clips created before ``before``.
+
+    Each partition is first detached concurrently, so ``clips`` stays
+    readable and writable, then its table is dropped in a transaction that
+    also writes a change-log tombstone for every clip it held. Tables left
+    detached by an interrupted earlier run are dropped too. Clients are told
+    to resync since no per-clip events are emitted.
+    """
+
+    dropped: List[str] = []
+    if not is_partitioned(db.connection()):
+        db.rollback()
+        return dropped
+    expired = expired_partitions(db.connection(), before=before)
+    # DETACH ... CONCURRENTLY waits out every transaction using clips, this one included.
+    db.rollback()
+    for partition in expired:
+        detach_partition(db.get_bind(), partition)
+    for partition in detached_partitions(db.connection()):
+        if partition.end > before:
+            continue
+        record_deleted_clips(db, select(table(partition.name, column("id")).c.id))
+        drop_partition(db.connection(), partition)
+        emit_clip_events(db, [RESYNC_EVENT])
+        db.commit()
+        bump_generation(db)
+        recent_clips_cache.invalidate()
+        dropped.append(partition.name)
+    db.rollback()
+    return dropped
+
+
+def build_retention_rules(db: Session, policy: RetentionPolicy, *, now: Optional[datetime] = None) -> List[RetentionRule]:
+    """Resolve ``policy`` into the delete conditions for one pruning pass."""
+
+    rules: List[RetentionRule] = []
+    cutoff = max_age_cutoff(policy, now=now)
+    if cutoff is not None:
+        rules.append(RetentionRule("max_age", ClipboardEntry.created_at < cutoff))
+    if policy.max_rows is not None:
+        condition = _beyond_newest(db, policy.max_rows)
+        if condition is not None:
+            rules.append(RetentionRule("max_rows", condition))
+    for entry_type, limit in sorted(policy.type_max_rows.items()):
+        condition = _beyond_newest(db, limit, entry_type=entry_type)
+        if condition is not None:
+            rules.append(RetentionRule(f"type_max_rows:{entry_type}", condition))
+    return rules
+
+
+def _try_lock_pass(bind: Engine) -> Tuple[bool, Optional[Connection]]:
+    """Try to become the only worker pruning; return whether to go ahead and the connection holding the lock."""
+
+    if bind.dialect.name != "postgresql":
+        return True, None
+    # Autocommit, so holding the lock through a long pass never leaves a transaction open.
+    connection = bind.connect().execution_options(isolation_level="AUTOCOMMIT")
+    try:
+        acquired = connection.execute(
+            text("SELECT pg_try_advisory_lock(:space, :key)"),
+            {"space": RETENTION_LOCK_KEY[0], "key": RETENTION_LOCK_KEY[1]},
+        ).scalar_one()
+    except Exception:
+        connection.close()
+        raise
+    if not acquired:
+        connection.close()
+        return False, None
+    return True, connection
+
+
+def _unlock_pass(connection: Connection) -> None:
+    try:
+        connection.execute(
+            text("SELECT pg_advisory_unlock(:space, :key)"),
+            {"space": RETENTION_LOCK_KEY[0], "key": RETENTION_LOCK_KEY[1]},
+        )
+    except Exception:
+        # Never pool a connection that may still hold the lock.
+        connection.invalidate()
+        raise
+    finally:
+        connection.close()
+
+
+class RetentionPruner:
+    """Periodically deletes clips that fall outside the retention policy, and orphaned blobs."""
+
+    def __init__(
+        self,
+        policy: RetentionPolicy,
+        *,
+        interval: float = 300.0,
+        batch_size: int = 500,
+        batch_pause: float = 0.05,
+        partition_months_ahead: Optional[int] = None,
+        collect_blobs: bool = True,
+    ) -> None:
+        self.policy = policy
+        self.collect_blobs = collect_blobs
+        self.partition_months_ahead = partition_months_ahead
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self._task: Optional[asyncio.Task[None]] = None
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self._running_pass = False
+        self._passes = 0
+        self._batches = 0
+        self._total_deleted = 0
+        self._deleted_by_rule: Dict[str, int] = {}
+        self._last_pass_started_at: Optional[datetime] = None
+        self._last_pass_deleted = 0
+        self._last_pass_ms: Optional[float] = None
+        self._last_batch_ms: Optional[float] = None
+        self._max_batch_ms: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._partitions_created = 0
+        self._partitions_dropped = 0
+        self._blobs_deleted = 0
+        self._tombstones_pruned = 0
+        self._skipped_passes = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RetentionPruner":
+        return cls(
+            RetentionPolicy.from_settings(settings),
+            interval=float(settings.retention_interval_seconds),
+            batch_size=settings.retention_batch_size,
+            batch_pause=settings.retention_batch_pause_ms / 1000,
+            partition_months_ahead=settings.clips_partition_months_ahead if settings.clips_partitioned else None,
+            # Bodies above the inline limit go to the blob store, which needs collecting whenever it can be used.
+            collect_blobs=settings.clip_max_content_bytes > settings.clip_inline_max_bytes,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.policy.enabled or self.partition_months_ahead is not None or self.collect_blobs
+
+    def start(self, session_factory: Callable[[], Session]) -> None:
+        """Schedule the pruning loop on the running event loop if there is work to do."""
+
+        if self._task is not None or not self.enabled:
+            return
+        self._session_factory = session_factory
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="clip-retention-pruner")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.prune(self._session_factory)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._last_error = repr(exc)
+                logger.exception("Clip retention pass failed")
+            await asyncio.sleep(self.interval)
+
+    async def prune(self, session_factory: Callable[[], Session]) -> int:
+        """Run one pruning pass and return the number of deleted clips.
+
+        Skipped, returning 0, while another worker's pass holds the lock.
+        """
+
+        db = session_factory()
+        try:
+            acquired, lock = await asyncio.to_thread(_try_lock_pass, db.get_bind())
+        except BaseException:
+            db.close()
+            raise
+        if not acquired:
+            db.close()
+            self._skipped_passes += 1
+            return 0
+        try:
+            return await self._prune(db)
+        finally:
+            if lock is not None:
+                await asyncio.to_thread(_unlock_pass, lock)
+
+    async def _prune(self, db: Session) -> int:
+        started = time.perf_counter()
+        self._running_pass = True
+        self._last_pass_started_at = _utcnow()
+        self._last_pass_deleted = 0
+        now = _utcnow()
+        try:
+            if self.partition_months_ahead is not None:
+                await asyncio.to_thread(self._maintain_partitions, db, now)
+            rules = await asyncio.to_thread(build_retention_rules, db, self.policy, now=now)
+            for rule in rules:
+                while True:
+                    batch_started = time.perf_counter()
+                    deleted = await asyncio.to_thread(
+                        delete_oldest_clipboard_entries, db, rule.condition, limit=self.batch_size
+                    )
+                    self._record_batch(rule.name, len(deleted), time.perf_counter() - batch_started)
+                    if len(deleted) < self.batch_size:
+                        break
+                    await asyncio.sleep(self.batch_pause)
+            while self.collect_blobs:
+                orphaned = await asyncio.to_thread(delete_orphaned_blobs, db, limit=self.batch_size)
+                self._blobs_deleted += len(orphaned)
+                if len(orphaned) < self.batch_size:
+                    break
+                await asyncio.sleep(self.batch_pause)
+            if self.policy.tombstone_max_age is not None:
+                cutoff = now - self.policy.tombstone_max_age
+                while True:
+                    pruned = await asyncio.to_thread(prune_tombstones, db, before=cutoff, limit=self.batch_size)
+                    self._tombstones_pruned += pruned
+                    if pruned < self.batch_size:
+                        break
+                    await asyncio.sleep(self.batch_pause)
+        finally:
+            db.close()
+            self._running_pass = False
+            self._passes += 1
+            self._last_pass_ms = (time.perf_counter() - started) * 1000
+        self._last_error = None
+        return self._last_pass_deleted
+
+    def _maintain_partitions(self, db: Session, now: datetime) -> None:
+        created = ensure_partitions(db.get_bind(), months_ahead=self.partition_months_ahead, now=now)
+        self._partitions_created += len(created)
+        cutoff = max_age_cutoff(self.policy, now=now)
+        if cutoff is not None:
+            dropped = drop_expired_partitions(db, before=cutoff)
+            self._partitions_dropped += len(dropped)
+            if dropped:
+                logger.info("Dropped expired clip partitions: %s", ", ".join(dropped))
+
+    def _record_batch(self, rule: str, deleted: int, elapsed: float) -> None:
+        elapsed_ms = elapsed * 1000
+        self._batches += 1
+        self._last_batch_ms = elapsed_ms
+        self._max_batch_ms = max(self._max_batch_ms or 0.0, elapsed_ms)
+        self._last_pass_deleted += deleted
+        self._total_deleted += deleted
+        self._deleted_by_rule[rule] = self._deleted_by_rule.get(rule, 0) + deleted
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "running": self._running_pass,
+            "passes": self._passes,
+            "batches": self._batches,
+            "total_deleted": self._total_deleted,
+            "deleted_by_rule": dict(self._deleted_by_rule),
+            "last_pass_started_at": self._last_pass_started_at.isoformat() if self._last_pass_started_at else None,
+            "last_pass_deleted": self._last_pass_deleted,
+            "last_pass_ms": self._last_pass_ms,
+            "last_batch_ms": self._last_batch_ms,
+            "max_batch_ms": self._max_batch_ms,
+            "last_error": self._last_error,
+            "partitions_created": self._partitions_created,
+            "partitions_dropped": self._partitions_dropped,
+            "blobs_deleted": self._blobs_deleted,
+            "tombstones_pruned": self._tombstones_pruned,
+            "skipped_passes": self._skipped_passes,
+        }
+
+
+retention_pruner = RetentionPruner.from_settings(load_settings())
+
+
+__all__ = [
+    "RETENTION_LOCK_KEY",
+    "RetentionPolicy",
+    "RetentionPruner",
+    "RetentionRule",
+    "build_retention_rules",
+    "drop_expired_partitions",
+    "max_age_cutoff",
+    "retention_pruner",
+]
@@ -0,0 +1 @@
+"""Micro-benchmarks for backend hot paths; run as modules from ``backend/``."""
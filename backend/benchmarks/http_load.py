@@ -0,0 +1,293 @@
+"""HTTP load test: throughput and latency percentiles per endpoint under a mixed workload.
+
+Starts the app under uvicorn on a free local port (against a throwaway SQLite
+file unless ``--database-url`` points at PostgreSQL, or not at all with
+``--url``; with ``DATABASE_ASYNC=true`` given ``--async``), seeds it with
+clips, then for each ``--concurrency`` level keeps that many clients issuing a
+weighted mix of reads and writes for ``--duration`` seconds. Results are printed and can be saved as JSON; given a
+``--baseline`` file from an earlier run, endpoints whose p95 latency or
+throughput got worse by more than ``--max-regression`` percent are reported
+and the exit status is 1::
+
+    python -m benchmarks.http_load --concurrency 1 8 32 --output baseline.json
+    python -m benchmarks.http_load --concurrency 1 8 32 --baseline baseline.json
+
+Compare runs made on the same machine against the same kind of database;
+anything else measures the environment, not the release.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+
+WORDS = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet")
+
+# (method, path, JSON body); the name groups requests in the report.
+Request = Tuple[str, str, Optional[object]]
+
+
+@dataclass
+class Workload:
+    """The request mix: writes make up ``write_ratio``, reads share the rest evenly."""
+
+    write_ratio: float
+    ids: List[int]
+    rng: random.Random = field(default_factory=lambda: random.Random(0))
+    _sequence: int = 0
+
+    def _text(self) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(self.rng.randint(3, 40)))
+
+    def _create(self) -> Request:
+        self._sequence += 1
+        return "POST", "/clip", {"type": "text", "content": f"load {self._sequence} {self._text()}"}
+
+    def _reads(self) -> Dict[str, Callable[[], Request]]:
+        return {
+            "GET /clips": lambda: ("GET", "/clips?limit=50", None),
+            "GET /clips?view=preview": lambda: ("GET", "/clips?limit=50&view=preview", None),
+            "GET /clips/search": lambda: ("GET", f"/clips/search?q={self.rng.choice(WORDS)}&limit=20", None),
+            "GET /clip/{id}": lambda: ("GET", f"/clip/{self.rng.choice(self.ids)}", None),
+        }
+
+    def next(self) -> Tuple[str, Request]:
+        if self.rng.random() < self.write_ratio:
+            return "POST /clip", self._create()
+        name, build = self.rng.choice(list(self._reads().items()))
+        return name, build()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: Dict[str, List[float]], errors: Dict[str, int], elapsed: float) -> Dict[str, object]:
+    endpoints: Dict[str, Dict[str, float]] = {}
+    for name in sorted(set(latencies) | set(errors)):
+        samples = sorted(latencies.get(name, []))
+        endpoints[name] = {
+            "requests": len(samples) + errors.get(name, 0),
+            "errors": errors.get(name, 0),
+            "rps": round(len(samples) / elapsed, 2),
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+        }
+    total = sum(len(samples) for samples in latencies.values())
+    return {"throughput_rps": round(total / elapsed, 2), "endpoints": endpoints}
+
+
+async def run_level(
+    client: httpx.AsyncClient, workload: Workload, *, concurrency: int, duration: float, warmup: float
+) -> Dict[str, object]:
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    async def worker() -> None:
+        while True:
+            name, (method, path, body) = workload.next()
+            sent = time.perf_counter()
+            if sent >= stop_at:
+                return
+            try:
+                response = await client.request(method, path, json=body)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            finished = time.perf_counter()
+            if sent < measure_from:
+                continue
+            if failed:
+                errors[name] = errors.get(name, 0) + 1
+            else:
+                latencies.setdefault(name, []).append(finished - sent)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {"concurrency": concurrency, **summarize(latencies, errors, duration)}
+
+
+async def seed(client: httpx.AsyncClient, count: int) -> List[int]:
+    rng = random.Random(1)
+    ids: List[int] = []
+    for offset in range(0, count, 1000):
+        items = [
+            {"type": "text", "content": f"seed {idx} " + " ".join(rng.choice(WORDS) for _ in range(20))}
+            for idx in range(offset, min(offset + 1000, count))
+        ]
+        response = await client.post("/clips/batch", json=items)
+        response.raise_for_status()
+        ids.extend(created["id"] for created in response.json()["created"])
+    return ids
+
+
+def compare(results: Dict[str, object], baseline: Dict[str, object], max_regression: float) -> List[str]:
+    """Describe every endpoint whose p95 or throughput regressed beyond ``max_regression`` (a fraction)."""
+
+    regressions: List[str] = []
+    base_levels = {level["concurrency"]: level for level in baseline["levels"]}
+    for level in results["levels"]:
+        base = base_levels.get(level["concurrency"])
+        if base is None:
+            continue
+        for name, current in level["endpoints"].items():
+            previous = base["endpoints"].get(name)
+            if previous is None or not previous["rps"]:
+                continue
+            where = f"c={level['concurrency']} {name}"
+            if current["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+                regressions.append(f"{where}: p95 {previous['p95_ms']:.2f} -> {current['p95_ms']:.2f} ms")
+            if current["rps"] < previous["rps"] * (1 - max_regression):
+                regressions.append(f"{where}: throughput {previous['rps']:.1f} -> {current['rps']:.1f} req/s")
+    return regressions
+
+
+def print_level(level: Dict[str, object]) -> None:
+    print(f"\nconcurrency {level['concurrency']}: {level['throughput_rps']:.1f} req/s")
+    print(f"  {'endpoint':<26}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for name, stats in level["endpoints"].items():
+        print(
+            f"  {name:<26}{stats['rps']:>9.1f}{stats['p50_ms']:>9.2f}"
+            f"{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['errors']:>8}"
+        )
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextmanager
+def serve(database_url: Optional[str], *, database_async: bool = False) -> Iterator[str]:
+    """Run the app under uvicorn for the duration of the block and yield its base URL."""
+
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(os.environ, DATABASE_URL=database_url or f"sqlite:///{scratch}/http_load.db")
+        env["DATABASE_ASYNC"] = "true" if database_async else "false"
+        env.setdefault("ENVIRONMENT", "production")
+        port = _free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+            cwd=BACKEND_ROOT,
+            env=env,
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            deadline = time.monotonic() + 30
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+                try:
+                    if httpx.get(f"{base_url}/health").status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError("The app did not become healthy within 30 seconds")
+                time.sleep(0.2)
+            yield base_url
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+
+async def benchmark(base_url: str, args: argparse.Namespace) -> Dict[str, object]:
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        workload = Workload(write_ratio=args.write_ratio, ids=await seed(client, args.seed_clips))
+        levels = []
+        for concurrency in args.concurrency:
+            level = await run_level(
+                client, workload, concurrency=concurrency, duration=args.duration, warmup=args.warmup
+            )
+            print_level(level)
+            levels.append(level)
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "database": "external" if args.url else ("postgresql" if args.database_url else "sqlite"),
+            "database_async": None if args.url else args.database_async,
+            "python": platform.python_version(),
+            "duration_s": args.duration,
+            "write_ratio": args.write_ratio,
+            "seed_clips": args.seed_clips,
+        },
+        "levels": levels,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Benchmark an already running server instead of starting one")
+    parser.add_argument("--database-url", help="Database for the started server (default: a temporary SQLite file)")
+    parser.add_argument(
+        "--async", dest="database_async", action="store_true", help="Start the server with DATABASE_ASYNC=true"
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each level")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--seed-clips", type=int, default=2000)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Earlier --output to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="Tolerated slowdown, in percent")
+    args = parser.parse_args()
+
+    if args.url:
+        results = asyncio.run(benchmark(args.url, args))
+    else:
+        with serve(args.database_url, database_async=args.database_async) as base_url:
+            results = asyncio.run(benchmark(base_url, args))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.output}")
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.max_regression / 100)
+        if regressions:
+            print(f"\nRegressions beyond {args.max_regression:g}% against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.max_regression:g}% against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""CPU time per ``GET /clips?limit=100`` page: ORM + pydantic vs. plain rows + direct JSON.
+
+Runs against an in-memory SQLite database, so numbers isolate Python-side
+cost (row building, validation, encoding) from database latency::
+
+    python -m benchmarks.list_serialization --requests 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from typing import Callable, List
+
+# The app reads connection settings at import; the benchmark never connects to them.
+for _name in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(_name, "bench")
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core.serialization import JSON_BACKEND, dumps  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.schemas.clipboard_entry import ClipboardEntryCreate, ClipboardEntryRead  # noqa: E402
+from app.services.clipboard import (  # noqa: E402
+    create_clipboard_entries,
+    encode_cursor,
+    list_clip_records,
+    list_clipboard_entries,
+)
+
+
+PAGE_SIZE = 100
+
+# A cursor past every row, so each request queries the table instead of the recent-clips cache.
+FIRST_PAGE = encode_cursor(datetime(9999, 1, 1), 0)
+
+_response_adapter = TypeAdapter(List[ClipboardEntryRead])
+
+
+def orm_page(db: Session) -> bytes:
+    """The previous path: ORM objects, model_validate, then response_model validation and encoding."""
+
+    entries = [
+        ClipboardEntryRead.model_validate(entry)
+        for entry in list_clipboard_entries(db, limit=PAGE_SIZE + 1, cursor=FIRST_PAGE)
+    ][:PAGE_SIZE]
+    validated = _response_adapter.validate_python(entries, from_attributes=True)
+    body = json.dumps(_response_adapter.dump_python(validated, mode="json"), ensure_ascii=False, separators=(",", ":"))
+    db.rollback()
+    return body.encode("utf-8")
+
+
+def record_page(db: Session) -> bytes:
+    """The fast path: column rows into records, encoded once."""
+
+    body = dumps(list_clip_records(db, limit=PAGE_SIZE + 1, cursor=FIRST_PAGE)[:PAGE_SIZE])
+    db.rollback()
+    return body
+
+
+def populate(db: Session, *, rows: int, content_bytes: int) -> None:
+    filler = "lorem ipsum dolor sit amet " * (content_bytes // 27 + 1)
+    payloads = [
+        ClipboardEntryCreate(type="text", content=f"{idx} {filler}"[:content_bytes], title=f"clip {idx}")
+        for idx in range(rows)
+    ]
+    create_clipboard_entries(db, payloads)
+
+
+def cpu_ms_per_request(render: Callable[[Session], bytes], db: Session, requests: int) -> float:
+    render(db)
+    started = time.process_time()
+    for _ in range(requests):
+        render(db)
+    return (time.process_time() - started) * 1000 / requests
+
+
+def run(*, content_bytes: int, requests: int) -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        populate(db, rows=PAGE_SIZE * 2, content_bytes=content_bytes)
+        assert json.loads(orm_page(db)) == json.loads(record_page(db))
+        orm_ms = cpu_ms_per_request(orm_page, db, requests)
+        record_ms = cpu_ms_per_request(record_page, db, requests)
+        print(
+            f"limit={PAGE_SIZE} content={content_bytes:>7} B  "
+            f"orm+pydantic {orm_ms:7.2f} ms  records+{JSON_BACKEND} {record_ms:7.2f} ms  "
+            f"speedup {orm_ms / record_ms:4.1f}x"
+        )
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--content-bytes", type=int, nargs="+", default=[200, 4_000, 64_000])
+    args = parser.parse_args()
+    for content_bytes in args.content_bytes:
+        run(content_bytes=content_bytes, requests=args.requests)
+
+
+if __name__ == "__main__":
+    main()
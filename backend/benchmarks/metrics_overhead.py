@@ -0,0 +1,152 @@
+"""Per-request cost of the Prometheus instrumentation.
+
+Drives the ASGI app directly (no server, no sockets) against in-memory SQLite,
+once with the metrics middleware and query hooks and once without, so the
+difference is the instrumentation itself rather than network noise::
+
+    python -m benchmarks.metrics_overhead --requests 2000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+for _name in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(_name, "bench")
+
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.api.deps import get_db  # noqa: E402
+from app.api.middleware import MetricsMiddleware  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.instrumentation import instrument_engine  # noqa: E402
+from app.main import create_app  # noqa: E402
+from app.services.clipboard import recent_clips_cache  # noqa: E402
+
+
+Request = Tuple[str, str, bytes]
+
+REQUESTS: List[Request] = [
+    ("POST", "/clip", json.dumps({"type": "text", "content": "benchmark clip"}).encode()),
+    ("GET", "/clips?limit=20&view=preview", b""),
+    ("GET", "/clip/1", b""),
+]
+
+
+def build_app(*, instrumented: bool) -> FastAPI:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    if instrumented:
+        instrument_engine(engine, "benchmark")
+    session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = create_app()
+    if not instrumented:
+        # The middleware stack is built on the first request, so dropping it here is enough.
+        app.user_middleware = [m for m in app.user_middleware if m.cls is not MetricsMiddleware]
+    app.dependency_overrides[get_db] = override_get_db
+    return app
+
+
+async def call(app: FastAPI, method: str, target: str, body: bytes) -> int:
+    path, _, query = target.partition("?")
+    scope: Dict[str, object] = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    sent = False
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def compare(requests: int, rounds: int) -> None:
+    recent_clips_cache.enabled = False
+    # A second uninstrumented app measures the noise floor: how far two identical apps differ.
+    apps: Dict[str, FastAPI] = {
+        "plain": build_app(instrumented=False),
+        "instrumented": build_app(instrumented=True),
+        "control": build_app(instrumented=False),
+    }
+    for app in apps.values():
+        for method, target, body in REQUESTS:
+            await call(app, method, target, body)
+
+    best: Dict[str, float] = {}
+    overheads: List[float] = []
+    noise: List[float] = []
+    for _ in range(rounds):
+        # Alternate the variants request by request, in swapped order every other request, so drift
+        # (GC, CPU frequency) and running first or second hit both alike.
+        elapsed = dict.fromkeys(apps, 0.0)
+        for idx in range(requests):
+            method, target, body = REQUESTS[idx % len(REQUESTS)]
+            order = list(apps.items()) if idx % 2 else list(reversed(apps.items()))
+            for name, app in order:
+                started = time.perf_counter()
+                status = await call(app, method, target, body)
+                elapsed[name] += time.perf_counter() - started
+                assert status < 400, (name, method, target, status)
+        for name, total in elapsed.items():
+            best[name] = min(best.get(name, total), total)
+        uninstrumented = (elapsed["plain"] + elapsed["control"]) / 2
+        overheads.append(elapsed["instrumented"] / uninstrumented - 1)
+        noise.append(abs(elapsed["control"] / elapsed["plain"] - 1))
+
+    plain, instrumented = best["plain"] / requests, best["instrumented"] / requests
+    print(
+        f"plain {plain * 1e6:8.1f} us/request  instrumented {instrumented * 1e6:8.1f} us/request  "
+        f"overhead {statistics.median(overheads) * 100:+5.2f}% (median of {rounds} rounds, "
+        f"range {min(overheads) * 100:+.2f}% .. {max(overheads) * 100:+.2f}%)  "
+        f"noise floor {statistics.median(noise) * 100:.2f}%"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1500)
+    parser.add_argument("--rounds", type=int, default=9)
+    args = parser.parse_args()
+    asyncio.run(compare(args.requests, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Build the model indexes that tables created by an older version lack.
+
+The backend creates indexes only along with new tables; on existing ones it
+checks at startup and logs those that are missing. Run this after upgrading,
+whenever that warning appears:
+
+    python create_indexes.py
+
+On PostgreSQL every index is built with ``CREATE INDEX CONCURRENTLY``, so the
+tables stay writable meanwhile. Rerunning it skips what is already in place
+and rebuilds indexes left invalid by an interrupted run.
+"""
+import sys
+import time
+
+from sqlalchemy import create_engine
+
+from app.db.session import DATABASE_URL, check_indexes, create_indexes
+
+
+def main():
+    engine = create_engine(DATABASE_URL)
+    started = time.monotonic()
+    for name in create_indexes(engine):
+        print(f"{name}: ready")
+    missing = check_indexes(engine)
+    print(f"Indexes done in {time.monotonic() - started:.1f}s")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
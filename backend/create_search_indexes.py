@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Create the PostgreSQL search column and indexes behind GET /clips/search.
+
+The backend no longer builds them at startup; it only checks whether they
+exist and falls back to LIKE scans until they do. Run this once per database,
+new or upgraded, then restart the backend so it starts using them:
+
+    python create_search_indexes.py
+
+Adding the generated ``search_vector`` column rewrites ``clips`` once under
+an exclusive lock, so run it while writes are quiet. The GIN indexes are
+built with ``CREATE INDEX CONCURRENTLY`` and keep the table writable; rerunning
+the script skips what is already in place and rebuilds indexes left invalid
+by an interrupted run.
+"""
+import sys
+import time
+
+from sqlalchemy import create_engine
+
+from app.core.config import build_database_url
+from app.db.search import FULL_TEXT_INDEX, TRIGRAM_INDEX, create_search_indexes
+
+
+def main():
+    engine = create_engine(build_database_url())
+    if engine.dialect.name != "postgresql":
+        print("create_search_indexes.py only supports PostgreSQL databases.")
+        return 1
+
+    started = time.monotonic()
+    created = create_search_indexes(engine)
+    for name in (FULL_TEXT_INDEX, TRIGRAM_INDEX):
+        print(f"{name}: {'ready' if name in created else 'FAILED, see the log above'}")
+    print(f"Search indexes done in {time.monotonic() - started:.1f}s")
+    return 0 if len(created) == 2 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Backfill content hashes and merge duplicate clips in an existing database.
+
+Databases created before clip deduplication lack the ``content_hash`` and
+``copy_count`` columns and may hold many copies of the same content. Run this
+once, before starting a backend version that deduplicates clips:
+
+    python dedupe_clips.py [--batch-size 10000]
+
+Every step works in short batched transactions, so it can run against a large
+table while it stays readable; run it before the new backend starts writing.
+Rows the old backend writes meanwhile are hashed and merged again just before
+the unique index and ``NOT NULL`` are added, both without blocking writes.
+Merged-away clips are tombstoned in the change log behind GET /clips/changes.
+"""
+import argparse
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.db.session import DATABASE_URL, ensure_columns
+from app.models import ClipChange, ClipSyncState, PendingClipChange
+from app.services.clipboard import bump_generation
+
+DEFAULT_BATCH_SIZE = 10_000
+
+ADD_COLUMNS = [
+    "ALTER TABLE clips ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "ALTER TABLE clips ADD COLUMN IF NOT EXISTS copy_count INTEGER NOT NULL DEFAULT 1",
+]
+
+# Last id of the next window of ``batch_size`` ids, found on the primary key.
+NEXT_WINDOW_END = text(
+    """
+    SELECT max(id) FROM (
+        SELECT id FROM clips WHERE id > :last_id ORDER BY id LIMIT :batch_size
+    ) AS window_ids
+    """
+)
+
+# Matches app.models.clipboard_entry.compute_content_hash (SHA-256 of UTF-8 text).
+BACKFILL_BATCH = text(
+    """
+    UPDATE clips
+    SET content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex')
+    WHERE id > :last_id AND id <= :window_end AND content_hash IS NULL
+    """
+)
+
+# Lets each merge batch find its groups' rows; replaced by the unique index in FINALIZE.
+LOOKUP_INDEX = "ix_clips_dedupe_lookup"
+# Dropped first: an interrupted concurrent build leaves an invalid index behind.
+CREATE_LOOKUP_INDEX = [
+    f"DROP INDEX CONCURRENTLY IF EXISTS {LOOKUP_INDEX}",
+    f"CREATE INDEX CONCURRENTLY {LOOKUP_INDEX} ON clips (type, content_hash)",
+]
+
+COLLECT_DUPLICATE_GROUPS = [
+    "DROP TABLE IF EXISTS clip_duplicate_groups",
+    """
+    CREATE TEMP TABLE clip_duplicate_groups AS
+    SELECT row_number() OVER () AS group_id, type, content_hash
+    FROM clips
+    GROUP BY type, content_hash
+    HAVING count(*) > 1
+    """,
+    "CREATE INDEX ON clip_duplicate_groups (group_id)",
+]
+
+# Keeps the newest row of each group, folding the others' copy counts into it, and
+# queues both kinds of change for the log; the generation bump in finalize() numbers them.
+MERGE_BATCH = text(
+    """
+    WITH ranked AS (
+        SELECT
+            c.id,
+            row_number() OVER (
+                PARTITION BY c.type, c.content_hash ORDER BY c.created_at DESC, c.id DESC
+            ) AS position,
+            sum(c.copy_count) OVER (PARTITION BY c.type, c.content_hash) AS total
+        FROM clips c
+        JOIN clip_duplicate_groups g USING (type, content_hash)
+        WHERE g.group_id > :after AND g.group_id <= :after + :batch_size
+    ),
+    kept AS (
+        UPDATE clips SET copy_count = ranked.total
+        FROM ranked
+        WHERE clips.id = ranked.id AND ranked.position = 1
+        RETURNING clips.id, false AS deleted
+    ),
+    removed AS (
+        DELETE FROM clips USING ranked
+        WHERE clips.id = ranked.id AND ranked.position > 1
+        RETURNING clips.id, true AS deleted
+    ),
+    queued AS (
+        INSERT INTO clip_pending_changes (clip_id, deleted, changed_at)
+        SELECT id, deleted, now() FROM (SELECT * FROM kept UNION ALL SELECT * FROM removed) AS changed
+        ON CONFLICT (clip_id) DO UPDATE SET deleted = excluded.deleted, changed_at = excluded.changed_at
+    )
+    SELECT count(*) FROM removed
+    """
+)
+
+UNIQUE_INDEX = "ux_clips_type_content_hash"
+NOT_NULL_CHECK = "ck_clips_content_hash_not_null"
+# Run outside a transaction. Only ADD/DROP CONSTRAINT lock clips exclusively, and
+# neither scans it: VALIDATE allows writes, and SET NOT NULL relies on the
+# validated check (PostgreSQL 12+) instead of scanning under its lock.
+FINALIZE = [
+    f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {UNIQUE_INDEX} ON clips (type, content_hash)",
+    f"ALTER TABLE clips DROP CONSTRAINT IF EXISTS {NOT_NULL_CHECK}",
+    f"ALTER TABLE clips ADD CONSTRAINT {NOT_NULL_CHECK} CHECK (content_hash IS NOT NULL) NOT VALID",
+    f"ALTER TABLE clips VALIDATE CONSTRAINT {NOT_NULL_CHECK}",
+    "ALTER TABLE clips ALTER COLUMN content_hash SET NOT NULL",
+    f"ALTER TABLE clips DROP CONSTRAINT {NOT_NULL_CHECK}",
+    f"DROP INDEX CONCURRENTLY IF EXISTS {LOOKUP_INDEX}",
+]
+
+INVALID_INDEX = text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)")
+
+
+def add_columns(engine):
+    with engine.begin() as conn:
+        for statement in ADD_COLUMNS:
+            conn.execute(text(statement))
+    # The change log tables, so merges can record what they remove.
+    for model in (ClipSyncState, ClipChange, PendingClipChange):
+        model.__table__.create(bind=engine, checkfirst=True)
+    ensure_columns(engine)
+
+
+def backfill_hashes(engine, batch_size):
+    # Walks the table in id order so no batch rescans rows hashed by earlier ones.
+    total = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            window_end = conn.execute(NEXT_WINDOW_END, {"last_id": last_id, "batch_size": batch_size}).scalar()
+            if window_end is None:
+                return total
+            updated = conn.execute(BACKFILL_BATCH, {"last_id": last_id, "window_end": window_end}).rowcount
+        last_id = window_end
+        total += updated
+        if updated:
+            print(f"Hashed {total} clips")
+
+
+def create_lookup_index(engine):
+    # CONCURRENTLY cannot run in a transaction and keeps the table writable while it builds.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for statement in CREATE_LOOKUP_INDEX:
+            conn.execute(text(statement))
+
+
+def merge_duplicates(engine, batch_size):
+    with engine.connect() as conn:
+        # Temp tables are per connection, so every batch reuses this one.
+        for statement in COLLECT_DUPLICATE_GROUPS:
+            conn.execute(text(statement))
+        conn.commit()
+        groups = conn.execute(text("SELECT count(*) FROM clip_duplicate_groups")).scalar_one()
+        print(f"Found {groups} groups of duplicate clips")
+
+        removed = 0
+        for after in range(0, groups, batch_size):
+            removed += conn.execute(MERGE_BATCH, {"after": after, "batch_size": batch_size}).scalar_one()
+            conn.commit()
+            print(f"Merged {min(after + batch_size, groups)}/{groups} groups, removed {removed} rows")
+        return removed
+
+
+def finalize(engine, batch_size):
+    # Clips the old backend wrote since the first pass have no hash yet and may repeat others.
+    backfill_hashes(engine, batch_size)
+    merge_duplicates(engine, batch_size)
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # An interrupted concurrent build leaves an invalid index that IF NOT EXISTS would keep.
+        if conn.execute(INVALID_INDEX, {"name": UNIQUE_INDEX}).scalar():
+            conn.execute(text(f"DROP INDEX CONCURRENTLY {UNIQUE_INDEX}"))
+        for statement in FINALIZE:
+            conn.execute(text(statement))
+
+    # Numbers the merge's change-log entries; readers compare the generation to spot stale listings.
+    with Session(engine) as db:
+        bump_generation(db)
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_notify('clip_events', '{\"event\": \"resync\"}')"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    engine = create_engine(DATABASE_URL)
+    if engine.dialect.name != "postgresql":
+        print("dedupe_clips.py only supports PostgreSQL databases.")
+        return 1
+
+    started = time.monotonic()
+    add_columns(engine)
+    backfill_hashes(engine, args.batch_size)
+    create_lookup_index(engine)
+    merge_duplicates(engine, args.batch_size)
+    finalize(engine, args.batch_size)
+    print(f"Deduplication complete in {time.monotonic() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,10 @@
 -- Database initialization script for clipboard sync
--- This script creates the necessary tables and indexes
+--
+-- The schema itself is created by the backend at startup (app/db/session.py
+-- create_schema), which lays `clips` out either as a single table or, with
+-- CLIPS_PARTITIONED=true, as a table range-partitioned by month on created_at
+-- (app/db/partitions.py). This script only prepares what needs superuser rights.
 
-CREATE TABLE IF NOT EXISTS clips (
-    id SERIAL PRIMARY KEY,
-    content TEXT NOT NULL,
-    type VARCHAR(10) NOT NULL CHECK (type IN ('text', 'url')),
-    title VARCHAR(500),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
--- Create index for efficient querying by creation time
-CREATE INDEX IF NOT EXISTS idx_clips_created_at ON clips(created_at DESC);
-
--- Insert some sample data for development
-INSERT INTO clips (content, type, title) VALUES 
-    ('https://example.com', 'url', 'Example Website'),
-    ('This is sample text content', 'text', NULL)
-ON CONFLICT DO NOTHING;
\ No newline at end of file
+-- Trigram indexes behind substring search (GET /clips/search); the indexes
+-- themselves are built by create_search_indexes.py.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Enter the clips of an existing database into the change log behind
+GET /clips/changes.
+
+Databases created before the change log hold clips it has never numbered, so
+clients syncing from ``since=0`` would not see them. Writes only log the clips
+they touch, so run this once per upgraded database:
+
+    python start_change_log.py [--batch-size 10000]
+
+Clips are numbered in batches, each in a short transaction that takes the same
+lock as a write, so the backend can keep running meanwhile. Rerunning it only
+adds clips that are still missing.
+"""
+import argparse
+import sys
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db.session import DATABASE_URL
+from app.services.changes import backfill_change_log
+
+DEFAULT_BATCH_SIZE = 10_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL)
+    started = time.monotonic()
+    with Session(engine) as db:
+        added = backfill_change_log(db, batch_size=args.batch_size)
+    print(f"Entered {added} clips into the change log in {time.monotonic() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
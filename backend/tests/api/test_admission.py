@@ -0,0 +1,137 @@
+"""Tests for admission control and load shedding."""
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.api.admission import REQUESTS_SHED, AdmissionController
+from app.api.middleware import AdmissionControlMiddleware
+from app.core import config
+
+
+def make_app(controller: AdmissionController, gate: Optional[asyncio.Event] = None):
+    async def app(scope, receive, send):
+        if gate is not None and scope["path"] == "/slow":
+            await gate.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return AdmissionControlMiddleware(app, controller=controller)
+
+
+async def request(app, path: str = "/clips", method: str = "GET", client: str = "10.0.0.1", headers=()):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": list(headers), "client": (client, 1234)}
+    await app(scope, receive, send)
+    start = messages[0]
+    return start["status"], {name.decode(): value.decode() for name, value in start["headers"]}
+
+
+def test_client_over_its_rate_gets_429_with_retry_after():
+    controller = AdmissionController(client_rate=0.5, client_burst=2)
+    app = make_app(controller)
+    shed_before = REQUESTS_SHED.value(("read", "rate_limited"))
+
+    async def scenario():
+        statuses = [(await request(app))[0] for _ in range(2)]
+        rejected = await request(app)
+        other_client = await request(app, client="10.0.0.2")
+        health = await request(app, path="/health")
+        return statuses, rejected, other_client[0], health[0]
+
+    statuses, (status, headers), other_status, health_status = asyncio.run(scenario())
+
+    assert statuses == [200, 200]
+    assert status == 429
+    assert headers["retry-after"] == "2"
+    assert other_status == 200
+    assert health_status == 200
+    assert REQUESTS_SHED.value(("read", "rate_limited")) == shed_before + 1
+    assert controller.stats()["shed"] == {"read:rate_limited": 1}
+
+
+def test_clients_behind_a_trusted_proxy_get_their_own_buckets(monkeypatch):
+    monkeypatch.setenv("CLIENT_ADDRESS_HEADER", "X-Forwarded-For")
+    config.load_settings.cache_clear()
+    app = make_app(AdmissionController(client_rate=0.5, client_burst=1))
+
+    async def via_proxy(address: str) -> int:
+        return (await request(app, client="127.0.0.1", headers=[(b"x-forwarded-for", address.encode())]))[0]
+
+    async def scenario():
+        return [await via_proxy(address) for address in ("203.0.113.1", "203.0.113.2", "203.0.113.1")]
+
+    try:
+        assert asyncio.run(scenario()) == [200, 200, 429]
+    finally:
+        config.load_settings.cache_clear()
+
+
+def test_requests_over_the_in_flight_limit_queue_then_are_shed():
+    controller = AdmissionController(write_max_in_flight=1, max_queue=1, queue_target=0.05)
+
+    async def scenario():
+        gate = asyncio.Event()
+        app = make_app(controller, gate)
+        holder = asyncio.create_task(request(app, "/slow", "POST"))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(request(app, "/clip", "POST"))
+        await asyncio.sleep(0)
+        full = await request(app, "/clip", "POST")
+        read = await request(app)
+        timed_out = await queued
+        gate.set()
+        return (await holder)[0], full, read[0], timed_out
+
+    holder_status, (full_status, full_headers), read_status, (timeout_status, _) = asyncio.run(scenario())
+
+    assert holder_status == 200
+    assert full_status == 503
+    assert full_headers["retry-after"] == "1"
+    assert read_status == 200
+    assert timeout_status == 503
+    assert controller.stats()["shed"] == {"write:queue_full": 1, "write:queue_timeout": 1}
+    assert controller.stats()["classes"]["write"] == {"limit": 1, "in_flight": 0, "queued": 0}
+
+
+def test_a_released_slot_goes_to_the_oldest_waiter():
+    controller = AdmissionController(read_max_in_flight=1, queue_target=5)
+
+    async def scenario():
+        gate = asyncio.Event()
+        app = make_app(controller, gate)
+        holder = asyncio.create_task(request(app, "/slow"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(request(app))
+        await asyncio.sleep(0)
+        queued = controller.stats()["classes"]["read"]["queued"]
+        gate.set()
+        return queued, (await holder)[0], (await waiter)[0]
+
+    assert asyncio.run(scenario()) == (1, 200, 200)
+    assert controller.stats()["classes"]["read"] == {"limit": 1, "in_flight": 0, "queued": 0}
+    assert controller.stats()["shed"] == {}
+
+
+def test_create_app_sheds_with_an_enabled_controller(monkeypatch):
+    controller = AdmissionController(client_rate=0.001, client_burst=1)
+    monkeypatch.setattr(main, "admission_controller", controller)
+
+    client = TestClient(main.create_app())
+    assert client.get("/unknown").status_code == 404
+    rejected = client.get("/unknown")
+    assert client.get("/health").status_code == 200
+
+    assert rejected.status_code == 429
+    assert rejected.json() == {"detail": "Too many requests"}
+    assert int(rejected.headers["Retry-After"]) >= 1
@@ -1,4 +1,6 @@
 """API integration tests for clipboard routes."""
+from datetime import datetime, timedelta
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -7,9 +9,12 @@ from sqlalchemy.pool import StaticPool
 
 from app.main import create_app
 from app.api.deps import get_db
+from app.api.routes.clipboard import NEXT_CURSOR_HEADER
 from app.db.base import Base
 from app.db.session import db_manager
-from app.models import ClipboardEntry
+from app.models import ClipboardEntry, compute_content_hash
+from app.services.changes import prune_tombstones
+from app.services.reconcile import range_digest_cache
 
 
 app = create_app()
@@ -69,6 +74,26 @@ def test_delete_existing_clip_removes_record(test_client, db_session):
     assert db_session.query(ClipboardEntry).filter(ClipboardEntry.id == entry.id).first() is None
 
 
+def test_create_clip_through_group_commit(test_client, monkeypatch):
+    from app.api.routes import clipboard as clipboard_routes
+    from app.services.group_commit import GroupCommitWriter
+
+    writer = GroupCommitWriter(enabled=True, max_wait=0)
+    writer.start(TestingSessionLocal)
+    monkeypatch.setattr(clipboard_routes, "group_commit_writer", writer)
+    try:
+        created = test_client.post("/clip", json={"type": "text", "content": "grouped"})
+        invalid = test_client.post("/clip", json={"type": "url", "content": "nope"})
+    finally:
+        writer.stop()
+
+    assert created.status_code == 201
+    assert created.json()["content_hash"] == compute_content_hash("grouped")
+    assert invalid.status_code == 422
+    assert writer.stats()["clips"] == 2
+    assert [clip["content"] for clip in test_client.get("/clips").json()] == ["grouped"]
+
+
 def test_delete_missing_clip_returns_404(test_client):
     response = test_client.delete("/clip/9999")
 
@@ -76,6 +101,30 @@ def test_delete_missing_clip_returns_404(test_client):
     assert response.json()["detail"] == "Clip with id 9999 not found"
 
 
+def test_bulk_delete_by_before_and_type(test_client, db_session):
+    db_session.add_all(
+        [
+            ClipboardEntry(content="old text", type="text", created_at=datetime(2024, 1, 1)),
+            ClipboardEntry(content="https://old.example.com", type="url", created_at=datetime(2024, 1, 1)),
+            ClipboardEntry(content="new text", type="text", created_at=datetime(2024, 6, 1)),
+        ]
+    )
+    db_session.commit()
+
+    response = test_client.request(
+        "DELETE", "/clips", json={"before": "2024-03-01T00:00:00Z", "type": "text"}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"deleted": 1}
+    db_session.expire_all()
+    assert sorted(entry.content for entry in db_session.query(ClipboardEntry)) == [
+        "https://old.example.com",
+        "new text",
+    ]
+    assert test_client.request("DELETE", "/clips", json={}).status_code == 422
+
+
 def test_deleted_clip_not_listed(test_client, db_session):
     entry = ClipboardEntry(content="Another clip", type="text", title="to remove")
     db_session.add(entry)
@@ -99,7 +148,9 @@ def test_create_clip_accepts_valid_text_payload(test_client, db_session):
     assert response.status_code == 201
     body = response.json()
     assert body["type"] == "text"
-    assert body["content"] == payload["content"]
+    assert "content" not in body
+    assert body["content_hash"] == compute_content_hash(payload["content"])
+    assert body["content_length"] == len(payload["content"])
     assert body["title"] == "Snippet"
 
     db_session.expire_all()
@@ -107,6 +158,17 @@ def test_create_clip_accepts_valid_text_payload(test_client, db_session):
     assert persisted is not None
 
 
+def test_create_clip_returns_existing_entry_for_repeated_content(test_client):
+    payload = {"type": "text", "content": "copied twice"}
+
+    first = test_client.post("/clip", json=payload).json()
+    second = test_client.post("/clip", json=payload).json()
+
+    assert second["id"] == first["id"]
+    assert second["copy_count"] == 2
+    assert [item["id"] for item in test_client.get("/clips").json()] == [first["id"]]
+
+
 @pytest.mark.parametrize(
     "payload,detail",
     [
@@ -150,8 +212,299 @@ def test_list_clips_returns_descending_order_and_respects_limit(test_client, db_
     assert returned_ids == sorted(returned_ids, reverse=True)
 
 
+def test_list_clips_pages_with_next_cursor_header(test_client):
+    for idx in range(3):
+        test_client.post("/clip", json={"type": "text", "content": f"clip-{idx}"})
+
+    first = test_client.get("/clips", params={"limit": 2})
+    assert first.status_code == 200
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = test_client.get("/clips", params={"limit": 2, "cursor": cursor})
+    assert second.status_code == 200
+    assert "X-Next-Cursor" not in second.headers
+
+    contents = [item["content"] for item in first.json() + second.json()]
+    assert sorted(contents) == ["clip-0", "clip-1", "clip-2"]
+    assert len(set(contents)) == 3
+
+
+def test_list_clips_rejects_invalid_cursor(test_client):
+    response = test_client.get("/clips", params={"cursor": "garbage"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
+
+
+def test_list_clips_returns_304_while_nothing_changes(test_client):
+    test_client.post("/clip", json={"type": "text", "content": "cached"})
+
+    first = test_client.get("/clips")
+    etag = first.headers["ETag"]
+
+    unchanged = test_client.get("/clips", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert unchanged.headers["ETag"] == etag
+
+    test_client.post("/clip", json={"type": "text", "content": "new"})
+    changed = test_client.get("/clips", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [item["content"] for item in changed.json()] == ["new", "cached"]
+
+
+def test_not_modified_check_does_not_read_clip_rows(test_client):
+    from sqlalchemy import event
+
+    etag = test_client.get("/clips").headers["ETag"]
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = test_client.get("/clips", headers={"If-None-Match": f"W/{etag}, \"other\""})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 304
+    assert not any("FROM clips" in statement for statement in statements)
+
+
+def test_search_clips_returns_matches_with_next_cursor(test_client):
+    for content in ["alpha one", "beta", "alpha two"]:
+        test_client.post("/clip", json={"type": "text", "content": content})
+
+    response = test_client.get("/clips/search", params={"q": "alpha", "limit": 1})
+
+    assert response.status_code == 200
+    assert [item["content"] for item in response.json()] == ["alpha two"]
+    next_page = test_client.get(
+        "/clips/search", params={"q": "alpha", "limit": 1, "cursor": response.headers["X-Next-Cursor"]}
+    )
+    assert [item["content"] for item in next_page.json()] == ["alpha one"]
+
+
+def test_search_clips_requires_query(test_client):
+    assert test_client.get("/clips/search").status_code == 422
+    assert test_client.get("/clips/search", params={"q": ""}).status_code == 422
+
+
+def test_changes_feed_reports_writes_and_deletes_since_a_point(test_client):
+    kept = test_client.post("/clip", json={"type": "text", "content": "kept"}).json()
+    gone = test_client.post("/clip", json={"type": "text", "content": "gone"}).json()
+    first = test_client.get("/clips/changes", params={"limit": 1})
+
+    assert first.status_code == 200
+    body = first.json()
+    assert body["has_more"] is True
+    assert [(change["id"], change["clip"]["content"]) for change in body["changes"]] == [(kept["id"], "kept")]
+
+    test_client.delete(f"/clip/{gone['id']}")
+    rest = test_client.get("/clips/changes", params={"since": body["next_since"]}).json()
+
+    assert [(change["id"], change["deleted"], change["clip"]) for change in rest["changes"]] == [
+        (gone["id"], True, None)
+    ]
+    assert rest["has_more"] is False
+    caught_up = test_client.get("/clips/changes", params={"since": rest["next_since"]}).json()
+    assert caught_up == {"changes": [], "next_since": rest["next_since"], "has_more": False}
+
+
+def test_changes_feed_expires_sync_points_before_pruned_tombstones(test_client, db_session):
+    gone = test_client.post("/clip", json={"type": "text", "content": "gone"}).json()
+    test_client.delete(f"/clip/{gone['id']}")
+    prune_tombstones(db_session, before=datetime.now() + timedelta(minutes=1), limit=10)
+
+    assert test_client.get("/clips/changes", params={"since": 1}).status_code == 410
+    assert test_client.get("/clips/changes", params={"since": 0}).json()["changes"] == []
+
+
+def test_reconcile_returns_items_of_differing_ranges(test_client, db_session):
+    everything = {"ranges": [{"start": 0, "end": 2**31, "digest": "0" * 16, "count": 0}]}
+    warming = test_client.post("/clips/reconcile", json=everything)
+    range_digest_cache.refresh(db_session)
+    created = [test_client.post("/clip", json={"type": "text", "content": f"clip {idx}"}).json() for idx in range(3)]
+
+    assert warming.status_code == 503
+    assert int(warming.headers["Retry-After"]) >= 1
+    response = test_client.post("/clips/reconcile", json=everything)
+
+    assert response.status_code == 200
+    [result] = response.json()["ranges"]
+    assert result["count"] == 3
+    assert [item["id"] for item in result["items"]] == [clip["id"] for clip in created]
+    matching = {key: result[key] for key in ("start", "end", "digest", "count")}
+    assert test_client.post("/clips/reconcile", json={"ranges": [matching]}).json() == {"ranges": []}
+
+
+def test_reconcile_rejects_invalid_ranges(test_client):
+    for bad in [{"start": 5, "end": 5, "digest": "0" * 16, "count": 0}, {"start": 0, "end": 9, "digest": "xyz", "count": 0}]:
+        assert test_client.post("/clips/reconcile", json={"ranges": [bad]}).status_code == 422
+
+
 @pytest.mark.parametrize("limit", [0, 101])
 def test_list_clips_enforces_limit_bounds(test_client, limit):
     response = test_client.get("/clips", params={"limit": limit})
 
     assert response.status_code == 422
+
+
+def test_batch_create_reports_rejected_items_per_item(test_client, db_session):
+    payload = [
+        {"type": "text", "content": "first"},
+        {"type": "url", "content": "notaurl"},
+        {"type": "url", "content": "https://example.com", "title": "site"},
+    ]
+
+    response = test_client.post("/clips/batch", json=payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["index"] for item in body["created"]] == [0, 2]
+    assert body["errors"] == [{"index": 1, "detail": "content must be a valid URL when type=url"}]
+
+    db_session.expire_all()
+    assert db_session.query(ClipboardEntry).count() == 2
+
+
+def test_batch_create_rejects_malformed_items_at_the_edge(test_client, db_session):
+    response = test_client.post("/clips/batch", json=[{"type": "text", "content": "first"}, {"type": "text"}])
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", 1, "content"]
+    assert db_session.query(ClipboardEntry).count() == 0
+
+
+def test_batch_create_caps_request_bytes(db_session, monkeypatch):
+    from app.core.config import load_settings
+
+    monkeypatch.setattr(load_settings(), "clip_batch_max_bytes", 100)
+    capped = create_app()
+    capped.dependency_overrides[get_db] = lambda: db_session
+    client = TestClient(capped)
+    body = b'[{"type": "text", "content": "' + b"x" * 200 + b'"}]'
+
+    declared = client.post("/clips/batch", content=body, headers={"Content-Type": "application/json"})
+    streamed = client.post(
+        "/clips/batch",
+        content=(body[offset : offset + 50] for offset in range(0, len(body), 50)),
+        headers={"Content-Type": "application/json"},
+    )
+    small = client.post("/clips/batch", json=[{"type": "text", "content": "ok"}])
+
+    assert declared.status_code == 413
+    assert streamed.status_code == 413
+    assert streamed.json() == {"detail": "Request body exceeds the limit of 100 bytes"}
+    assert small.status_code == 200
+
+
+def test_batch_create_rejects_oversized_batches(test_client, monkeypatch):
+    from app.core.config import load_settings
+
+    monkeypatch.setattr(load_settings(), "clip_batch_max_items", 2)
+
+    response = test_client.post("/clips/batch", json=[{"type": "text", "content": "x"}] * 3)
+
+    assert response.status_code == 413
+
+
+def test_clip_content_round_trips_through_streaming_endpoints(test_client):
+    clip_id = test_client.post("/clip", json={"type": "text", "content": "draft"}).json()["id"]
+    body = "".join(f"line {idx}\n" for idx in range(100_000)).encode()
+
+    upload = test_client.put(
+        f"/clip/{clip_id}/content",
+        content=(body[offset : offset + 65_536] for offset in range(0, len(body), 65_536)),
+    )
+
+    assert upload.status_code == 200
+    assert upload.json()["content_length"] == len(body)
+    response = test_client.get(f"/clip/{clip_id}/content")
+    assert response.status_code == 200
+    assert response.headers["content-length"] == str(len(body))
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.content == body
+    etag = response.headers["etag"]
+    assert test_client.get(f"/clip/{clip_id}/content", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_clip_content_serves_byte_ranges(test_client):
+    clip_id = test_client.post("/clip", json={"type": "text", "content": "0123456789"}).json()["id"]
+
+    partial = test_client.get(f"/clip/{clip_id}/content", headers={"Range": "bytes=2-4"})
+    suffix = test_client.get(f"/clip/{clip_id}/content", headers={"Range": "bytes=-3"})
+    unsatisfiable = test_client.get(f"/clip/{clip_id}/content", headers={"Range": "bytes=10-"})
+
+    assert partial.status_code == 206
+    assert partial.content == b"234"
+    assert partial.headers["content-range"] == "bytes 2-4/10"
+    assert suffix.content == b"789"
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == "bytes */10"
+
+
+def test_clip_content_upload_errors(test_client):
+    clip_id = test_client.post("/clip", json={"type": "url", "content": "https://example.com"}).json()["id"]
+
+    assert test_client.put("/clip/999/content", content=b"text").status_code == 404
+    assert test_client.put(f"/clip/{clip_id}/content", content=b"not a url").status_code == 422
+    assert test_client.put(f"/clip/{clip_id}/content", content=b"").status_code == 422
+    assert test_client.get(f"/clip/{clip_id}/content").content == b"https://example.com"
+
+
+def test_preview_view_truncates_bodies_in_listing(test_client):
+    long_body = "é" * 5_000
+    test_client.post("/clip", json={"type": "text", "content": "short"})
+    long_id = test_client.post("/clip", json={"type": "text", "content": long_body}).json()["id"]
+
+    response = test_client.get("/clips", params={"view": "preview", "limit": 1})
+
+    assert response.status_code == 200
+    assert response.headers[NEXT_CURSOR_HEADER]
+    (item,) = response.json()
+    assert item["id"] == long_id
+    assert item["preview"] == long_body[:200]
+    assert item["content_length"] == len(long_body.encode())
+    assert len(item["content_hash"]) == 64
+    assert "content" not in item
+    following = test_client.get(
+        "/clips", params={"view": "preview", "cursor": response.headers[NEXT_CURSOR_HEADER]}
+    ).json()
+    assert [clip["preview"] for clip in following] == ["short"]
+
+
+def test_get_clip_returns_full_body_with_cache_headers(test_client):
+    body = "line\n" * 10_000
+    clip_id = test_client.post("/clip", json={"type": "text", "content": body}).json()["id"]
+
+    response = test_client.get(f"/clip/{clip_id}")
+
+    assert response.status_code == 200
+    assert response.json()["content"] == body
+    assert response.headers["cache-control"] == "private, max-age=3600"
+    etag = response.headers["etag"]
+    assert test_client.get(f"/clip/{clip_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    test_client.post("/clip", json={"type": "text", "content": body})
+    recopied = test_client.get(f"/clip/{clip_id}", headers={"If-None-Match": etag})
+    assert recopied.status_code == 200
+    assert recopied.json()["copy_count"] == 2
+    assert test_client.get("/clip/999").status_code == 404
+
+
+def test_metrics_endpoint_reports_route_latency_and_sizes(test_client):
+    test_client.post("/clip", json={"type": "text", "content": "measured"})
+    test_client.get("/no-such-route")
+
+    response = test_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="POST",route="/clip",status="201"}' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}' in body
+    assert 'http_request_size_bytes_count{method="POST",route="/clip"}' in body
+    assert "http_requests_in_flight 1" in body
@@ -0,0 +1,124 @@
+"""API tests for the asyncio clipboard routes (``DATABASE_ASYNC=true``)."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.deps import get_async_db
+from app.core import config
+from app.db.base import Base
+from app.db.session import build_async_database_url, db_manager
+from app.main import create_app
+from app.models import ClipboardEntry
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'clips.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield url
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture
+def db_session(database_url):
+    engine = create_engine(database_url)
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def test_client(monkeypatch, database_url):
+    monkeypatch.setenv("DATABASE_ASYNC", "true")
+    config.load_settings.cache_clear()
+    app = create_app()
+    config.load_settings.cache_clear()
+
+    async_engine = create_async_engine(build_async_database_url(database_url))
+    AsyncTestingSession = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSession() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    monkeypatch.setattr(db_manager, "create_tables", lambda: None)
+    with TestClient(app) as client:
+        yield client
+    # Startup reads the settings while DATABASE_ASYNC is still set; keep them from leaking out.
+    config.load_settings.cache_clear()
+
+
+def test_async_routes_are_registered_ahead_of_sync_routes(test_client):
+    first_match = {}
+    for route in test_client.app.routes:
+        for method in getattr(route, "methods", ()):
+            first_match.setdefault((route.path, method), route.endpoint.__name__)
+
+    assert first_match[("/clip", "POST")] == "create_clip_async"
+    assert first_match[("/clips", "GET")] == "list_clips_async"
+    assert first_match[("/clip/{entry_id}", "GET")] == "get_clip_async"
+    assert first_match[("/clip/{entry_id}", "DELETE")] == "delete_clip_async"
+
+
+def test_create_and_list_clips(test_client, db_session):
+    response = test_client.post("/clip", json={"type": "url", "content": "https://example.com"})
+
+    assert response.status_code == 201
+    created = response.json()
+    assert created["id"] is not None
+    assert db_session.query(ClipboardEntry).filter_by(id=created["id"]).first() is not None
+
+    list_response = test_client.get("/clips", params={"limit": 5})
+    assert list_response.status_code == 200
+    assert [item["id"] for item in list_response.json()] == [created["id"]]
+
+
+def test_list_clips_honours_if_none_match(test_client):
+    test_client.post("/clip", json={"type": "text", "content": "cached"})
+    etag = test_client.get("/clips").headers["ETag"]
+
+    assert test_client.get("/clips", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_preview_listing_and_single_clip_fetch(test_client):
+    body = "x" * 20_000
+    clip_id = test_client.post("/clip", json={"type": "text", "content": body}).json()["id"]
+
+    preview = test_client.get("/clips", params={"view": "preview"}).json()[0]
+    full = test_client.get(f"/clip/{clip_id}")
+
+    assert preview["preview"] == body[:200]
+    assert preview["content_length"] == len(body)
+    assert full.json()["content"] == body
+
+
+def test_create_rejects_invalid_url(test_client):
+    response = test_client.post("/clip", json={"type": "url", "content": "notaurl"})
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "content must be a valid URL when type=url"
+
+
+def test_delete_clip(test_client, db_session):
+    entry = ClipboardEntry(content="async clip", type="text")
+    db_session.add(entry)
+    db_session.commit()
+
+    assert test_client.delete(f"/clip/{entry.id}").status_code == 204
+    assert test_client.delete(f"/clip/{entry.id}").status_code == 404
+
+
+def test_build_async_database_url_selects_async_driver():
+    assert build_async_database_url("postgresql://u:p@db:5432/clips") == (
+        "postgresql+asyncpg://u:p@db:5432/clips"
+    )
+    assert build_async_database_url("sqlite:///tmp/clips.db") == "sqlite+aiosqlite:///tmp/clips.db"
@@ -0,0 +1,96 @@
+"""Tests for opt-in request profiling."""
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.deps import get_db
+from app.api.middleware import ProfilingMiddleware
+from app.db.base import Base
+from app.db.instrumentation import profile_statements
+from app.db.session import db_manager
+from app.main import create_app
+
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+profile_statements(engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+PROFILE_TOKEN = "let-me-profile"
+
+
+@pytest.fixture
+def profiled_client(tmp_path, monkeypatch):
+    Base.metadata.create_all(bind=engine)
+    app = create_app()
+    app.add_middleware(ProfilingMiddleware, directory=str(tmp_path), token=PROFILE_TOKEN, max_profiles=2)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    monkeypatch.setattr(db_manager, "create_tables", lambda: None)
+    with TestClient(app) as client:
+        yield client
+    Base.metadata.drop_all(bind=engine)
+
+
+def _timings(header: str) -> dict:
+    entries = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        entries[name] = dict(param.split("=", 1) for param in params)
+    return entries
+
+
+def test_requests_without_profile_header_are_not_profiled(profiled_client, tmp_path):
+    response = profiled_client.get("/clips")
+
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiled_request_reports_sql_and_writes_profile(profiled_client, tmp_path):
+    response = profiled_client.post("/clip", json={"type": "text", "content": "profiled"}, headers={"X-Profile": PROFILE_TOKEN})
+
+    assert response.status_code == 201
+    timings = _timings(response.headers["server-timing"])
+    assert float(timings["total"]["dur"]) > 0
+    assert {"sql", "pydantic", "sqlalchemy", "fastapi", "app", "other"} <= set(timings)
+    statements = int(timings["sql"]["desc"].strip('"').split()[0])
+    assert statements >= 1
+
+    profile_id = timings["profile"]["desc"].strip('"')
+    summary = json.loads((tmp_path / f"{profile_id}.sql.json").read_text())
+    assert summary["route"] == "/clip"
+    assert summary["sql_count"] == statements
+    assert any(statement["sql"].startswith("INSERT") for statement in summary["statements"])
+    assert (tmp_path / f"{profile_id}.prof").exists()
+
+
+def test_profile_header_needs_the_token(profiled_client, tmp_path):
+    response = profiled_client.get("/clips", headers={"X-Profile": "1"})
+
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_only_the_newest_profiles_are_kept(profiled_client, tmp_path):
+    ids = []
+    for _ in range(3):
+        response = profiled_client.get("/clips", headers={"X-Profile": PROFILE_TOKEN})
+        ids.append(_timings(response.headers["server-timing"])["profile"]["desc"].strip('"'))
+
+    assert sorted(path.name for path in tmp_path.glob("*.sql.json")) == [f"{ids[1]}.sql.json", f"{ids[2]}.sql.json"]
+    assert not (tmp_path / f"{ids[0]}.prof").exists()
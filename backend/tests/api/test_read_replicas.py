@@ -0,0 +1,174 @@
+"""API tests for routing list and search reads to read replicas."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.api.deps as deps
+import app.main as main
+from app.api.deps import get_async_db, get_db
+from app.api.middleware import READ_PRIMARY_COOKIE, client_key
+from app.core import config
+from app.db.base import Base
+from app.db.replicas import ReplicaRouter
+from app.db.session import build_async_database_url, db_manager
+from app.models import ClipboardEntry
+
+
+def sqlite_engine():
+    return create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+@pytest.fixture
+def primary_engine():
+    engine = sqlite_engine()
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def replica_engine():
+    engine = sqlite_engine()
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add(ClipboardEntry(type="text", content="from the replica"))
+        session.commit()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def router(monkeypatch, replica_engine):
+    router = ReplicaRouter([("replica", replica_engine)], sticky_seconds=5)
+    monkeypatch.setattr(deps, "replica_router", router)
+    monkeypatch.setattr(main, "replica_router", router)
+    return router
+
+
+@pytest.fixture
+def client(monkeypatch, router, primary_engine):
+    app = main.create_app()
+    PrimarySession = sessionmaker(autocommit=False, autoflush=False, bind=primary_engine)
+
+    def override_get_db():
+        db = PrimarySession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    monkeypatch.setattr(db_manager, "create_tables", lambda: None)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def contents(response):
+    assert response.status_code == 200
+    return [clip["content"] for clip in response.json()]
+
+
+def test_list_reads_the_replica(client):
+    assert contents(client.get("/clips")) == ["from the replica"]
+
+
+def test_reads_after_a_write_go_to_the_primary(client, router):
+    created = client.post("/clip", json={"type": "text", "content": "just written"})
+
+    assert created.status_code == 201
+    assert READ_PRIMARY_COOKIE in created.cookies
+    assert router.is_sticky("testclient")
+    assert contents(client.get("/clips")) == ["just written"]
+
+
+def test_primary_cookie_alone_pins_reads(client, router):
+    client.cookies.set(READ_PRIMARY_COOKIE, "1")
+
+    assert contents(client.get("/clips")) == []
+
+
+def test_a_write_behind_a_trusted_proxy_pins_only_that_clients_reads(client, router, monkeypatch):
+    monkeypatch.setenv("CLIENT_ADDRESS_HEADER", "X-Forwarded-For")
+    monkeypatch.setenv("TRUSTED_PROXIES", "testclient")
+    config.load_settings.cache_clear()
+    try:
+        created = client.post(
+            "/clip", json={"type": "text", "content": "just written"}, headers={"X-Forwarded-For": "203.0.113.1"}
+        )
+        client.cookies.clear()
+
+        assert created.status_code == 201
+        assert router.is_sticky("203.0.113.1")
+        other = client.get("/clips", headers={"X-Forwarded-For": "198.51.100.7, 203.0.113.2"})
+        assert contents(other) == ["from the replica"]
+    finally:
+        config.load_settings.cache_clear()
+
+
+def test_forwarded_address_is_ignored_from_untrusted_peers(monkeypatch):
+    monkeypatch.setenv("CLIENT_ADDRESS_HEADER", "X-Forwarded-For")
+    config.load_settings.cache_clear()
+    try:
+        scope = {"client": ("198.51.100.7", 4711), "headers": [(b"x-forwarded-for", b"203.0.113.1")]}
+        assert client_key(scope) == "198.51.100.7"
+        scope["client"] = ("127.0.0.1", 4711)
+        assert client_key(scope) == "203.0.113.1"
+    finally:
+        config.load_settings.cache_clear()
+
+
+def test_unreachable_replica_is_ejected_and_primary_serves(client, router, replica_engine, monkeypatch):
+    def refuse(*args, **kwargs):
+        raise OperationalError("connect", {}, Exception("connection refused"))
+
+    monkeypatch.setattr(replica_engine, "connect", refuse)
+
+    assert contents(client.get("/clips")) == []
+    assert router.stats()["replicas"] == [{"name": "replica", "healthy": False}]
+
+
+def test_async_routes_read_the_replica_until_the_client_writes(monkeypatch, tmp_path):
+    urls = {}
+    for name in ("primary", "replica"):
+        urls[name] = f"sqlite:///{tmp_path / name}.db"
+        engine = create_engine(urls[name])
+        Base.metadata.create_all(bind=engine)
+        engine.dispose()
+    with sessionmaker(bind=create_engine(urls["replica"]))() as session:
+        session.add(ClipboardEntry(type="text", content="from the replica"))
+        session.commit()
+    router = ReplicaRouter([("replica", create_engine(urls["replica"]))], sticky_seconds=5)
+    monkeypatch.setattr(deps, "replica_router", router)
+    monkeypatch.setattr(main, "replica_router", router)
+    monkeypatch.setattr(
+        deps,
+        "async_replica_engines",
+        {"replica": create_async_engine(build_async_database_url(urls["replica"]))},
+    )
+    monkeypatch.setenv("DATABASE_ASYNC", "true")
+    config.load_settings.cache_clear()
+    app = main.create_app()
+    config.load_settings.cache_clear()
+    PrimarySession = async_sessionmaker(
+        bind=create_async_engine(build_async_database_url(urls["primary"])), expire_on_commit=False
+    )
+
+    async def override_get_async_db():
+        async with PrimarySession() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    monkeypatch.setattr(db_manager, "create_tables", lambda: None)
+    try:
+        with TestClient(app) as client:
+            assert contents(client.get("/clips")) == ["from the replica"]
+            assert contents(client.get("/clips/search", params={"q": "replica"})) == ["from the replica"]
+
+            assert client.post("/clip", json={"type": "text", "content": "just written"}).status_code == 201
+            assert contents(client.get("/clips")) == ["just written"]
+    finally:
+        config.load_settings.cache_clear()
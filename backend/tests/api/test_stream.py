@@ -0,0 +1,71 @@
+"""API tests for the clip change streaming endpoints."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.deps import get_db
+from app.api.routes.stream import format_sse
+from app.db.base import Base
+from app.db.session import db_manager
+from app.main import create_app
+from app.services.events import clip_event_broker
+
+
+app = create_app()
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def test_client(monkeypatch):
+    Base.metadata.create_all(bind=engine)
+
+    def override_get_db():
+        session = TestingSessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    monkeypatch.setattr(db_manager, "create_tables", lambda: None)
+    monkeypatch.setattr(clip_event_broker, "start", lambda engine: None)
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.pop(get_db, None)
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_websocket_receives_created_and_deleted_events(test_client):
+    with test_client.websocket_connect("/clips/stream") as websocket:
+        created = test_client.post("/clip", json={"type": "text", "content": "pushed"}).json()
+        test_client.delete(f"/clip/{created['id']}")
+
+        first = websocket.receive_json()
+        second = websocket.receive_json()
+
+    assert first["event"] == "created"
+    assert first["id"] == created["id"]
+    assert second == {"event": "deleted", "id": created["id"]}
+
+
+def test_websocket_disconnect_unsubscribes(test_client):
+    before = clip_event_broker.subscriber_count
+    with test_client.websocket_connect("/clips/stream"):
+        pass
+
+    test_client.get("/health")
+    assert clip_event_broker.subscriber_count == before
+
+
+def test_format_sse_frames_payload():
+    frame = format_sse({"event": "deleted", "id": 3})
+
+    assert frame == 'event: deleted\ndata: {"event": "deleted", "id": 3}\n\n'
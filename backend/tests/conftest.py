@@ -4,7 +4,23 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 
 BACKEND_ROOT = Path(__file__).resolve().parent.parent
 if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
+
+
+@pytest.fixture(autouse=True)
+def reset_recent_clips_cache():
+    """Each test runs against a fresh database, so start with cold caches."""
+
+    from app.services.clipboard import recent_clips_cache
+    from app.services.reconcile import range_digest_cache
+
+    recent_clips_cache.invalidate()
+    range_digest_cache.invalidate()
+    yield
+    recent_clips_cache.invalidate()
+    range_digest_cache.invalidate()
@@ -60,3 +60,27 @@ def test_load_settings_caches_results(monkeypatch):
     assert settings_first is settings_second
     assert not settings_first.is_development
     assert settings_first.log_level == "warning"
+
+
+def test_get_env_int_map_parses_pairs_and_rejects_garbage(monkeypatch):
+    monkeypatch.setenv("LIMITS", " text=100, url=5 ")
+    assert config.get_env_int_map("LIMITS") == {"text": 100, "url": 5}
+
+    monkeypatch.setenv("LIMITS", "text:100")
+    with pytest.raises(RuntimeError):
+        config.get_env_int_map("LIMITS")
+
+
+def test_profiling_is_off_by_default_and_sample_rate_must_be_numeric(monkeypatch):
+    monkeypatch.setenv("POSTGRES_USER", "cliuser")
+    monkeypatch.setenv("POSTGRES_PASSWORD", "secret")
+    monkeypatch.delenv("PROFILING_ENABLED", raising=False)
+    monkeypatch.setenv("PROFILING_SAMPLE_RATE", "0.05")
+
+    settings = config.load_settings()
+    assert not settings.profiling_enabled
+    assert settings.profiling_sample_rate == 0.05
+
+    monkeypatch.setenv("PROFILING_SAMPLE_RATE", "often")
+    with pytest.raises(RuntimeError):
+        config.get_env_float("PROFILING_SAMPLE_RATE", default=0.0)
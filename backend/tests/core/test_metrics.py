@@ -0,0 +1,86 @@
+"""Tests for the Prometheus metric types and text exposition."""
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from app.core.metrics import MetricsRegistry
+
+
+def test_counter_renders_total_per_label_set():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests", "Requests served.", ("method",))
+    requests.inc(("GET",))
+    requests.inc(("GET",), 2)
+    requests.inc(("POST",))
+
+    assert registry.render().splitlines() == [
+        "# HELP requests Requests served.",
+        "# TYPE requests counter",
+        'requests_total{method="GET"} 3',
+        'requests_total{method="POST"} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative_with_sum_and_count():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{le="1"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_sum 3.65" in lines
+    assert "latency_seconds_count 4" in lines
+    assert latency.count() == 4
+
+
+
+def test_updates_from_many_threads_are_all_counted():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests", "Requests served.")
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1,))
+
+    def work():
+        for _ in range(1000):
+            requests.inc()
+            latency.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert requests.value() == 8000
+    assert latency.count() == 8000
+    assert latency.total() == 4000
+    assert 'latency_seconds_bucket{le="+Inf"} 8000' in registry.render().splitlines()
+
+
+def test_gauge_callback_is_read_at_scrape_time():
+    registry = MetricsRegistry()
+    size = {"value": 1}
+    registry.gauge("queue_depth", "Depth.", ("queue",), callback=lambda: [(("main",), size["value"])])
+    size["value"] = 7
+
+    assert 'queue_depth{queue="main"} 7' in registry.render().splitlines()
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.gauge("paths", "Paths.", ("path",)).set(1, ('a"b\\c',))
+
+    assert 'paths{path="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_duplicate_metric_names_are_rejected():
+    registry = MetricsRegistry()
+    registry.counter("requests", "Requests served.")
+
+    with pytest.raises(ValueError):
+        registry.gauge("requests", "Again.")
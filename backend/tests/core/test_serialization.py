@@ -0,0 +1,42 @@
+"""Tests for the JSON encoder used by list endpoints."""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+import pytest
+
+from app.core import serialization
+from app.schemas.clipboard_entry import ClipboardEntryRead
+from app.services.clipboard import ClipRecord
+
+
+RECORDS = [
+    ClipRecord(type="text", content='quote " and é', title=None, id=2, created_at=datetime(2024, 1, 1, 8, 30), copy_count=1),
+    ClipRecord(
+        type="url",
+        content="https://example.com",
+        title="Example",
+        id=1,
+        created_at=datetime(2024, 1, 1, 8, 29, 59, 123456),
+        copy_count=3,
+    ),
+]
+
+
+@pytest.fixture(params=["installed", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+    return serialization.dumps
+
+
+def test_records_encode_like_the_response_model(encoder):
+    expected = [ClipboardEntryRead.model_validate(record).model_dump(mode="json") for record in RECORDS]
+
+    encoded = encoder(RECORDS)
+
+    assert json.loads(encoded) == expected
+    assert list(json.loads(encoded)[0]) == list(ClipboardEntryRead.model_fields)
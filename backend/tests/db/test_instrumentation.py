@@ -0,0 +1,40 @@
+"""Tests for the query and connection pool metrics."""
+from __future__ import annotations
+
+from sqlalchemy import create_engine, text
+
+from app.db.instrumentation import (
+    POOL_WAIT_SECONDS,
+    QUERY_SECONDS,
+    TimedQueuePool,
+    instrument_engine,
+    statement_operation,
+)
+from app.core.metrics import registry
+
+
+def test_statement_operation_groups_unknown_keywords():
+    assert statement_operation("  select 1") == "SELECT"
+    assert statement_operation("INSERT INTO clips VALUES (1)") == "INSERT"
+    assert statement_operation("PRAGMA foreign_keys") == "OTHER"
+    assert statement_operation("") == "OTHER"
+
+
+def test_instrumented_engine_records_queries_and_pool_state(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}", poolclass=TimedQueuePool, pool_size=2)
+    instrument_engine(engine, "test")
+    before = QUERY_SECONDS.count(("test", "SELECT"))
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        rendered = registry.render()
+
+    assert QUERY_SECONDS.count(("test", "SELECT")) == before + 1
+    assert POOL_WAIT_SECONDS.count(("test",)) >= 1
+    assert 'db_pool_checked_out_connections{engine="test"} 1' in rendered
+    assert 'db_pool_size{engine="test"} 2' in rendered
+
+    engine.dispose()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert engine.pool._metrics_label == "test"
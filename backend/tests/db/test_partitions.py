@@ -0,0 +1,109 @@
+"""Tests for monthly partitioning of the clips table."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import MetaData, create_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from app.core.config import build_test_database_url
+from app.db import partitions
+from app.db.base import Base
+from app.db.partitions import (
+    create_partitioned_clips,
+    detached_partitions,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+    partition_for,
+    partitioned_clips_table,
+)
+from app.schemas.clipboard_entry import ClipboardEntryCreate
+from app.services.clipboard import create_clipboard_entries, create_clipboard_entry, list_clipboard_page
+from app.services.retention import drop_expired_partitions
+
+
+def test_partition_for_covers_calendar_month():
+    partition = partition_for(datetime(2024, 12, 31, 23, 59))
+
+    assert partition.name == "clips_202412"
+    assert partition.start == datetime(2024, 12, 1)
+    assert partition.end == datetime(2025, 1, 1)
+
+
+def test_partitioned_table_keys_on_created_at_without_unique_indexes():
+    table = partitioned_clips_table(MetaData())
+
+    ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+
+    assert "PRIMARY KEY (id, created_at)" in ddl
+    assert "PARTITION BY RANGE (created_at)" in ddl
+    assert "id SERIAL" in ddl
+    assert not any(index.unique for index in table.indexes)
+    assert "ix_clips_type_content_hash" in {index.name for index in table.indexes}
+
+
+@pytest.fixture
+def partitioned_session():
+    engine = create_engine(build_test_database_url())
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except OperationalError:
+        pytest.skip("Test database is not available; skipping DB integration tests")
+
+    Base.metadata.drop_all(bind=engine)
+    create_partitioned_clips(engine)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        # Later tests recreate clips as a plain table under the same URL.
+        partitions._partitioned_by_url.clear()
+        engine.dispose()
+
+
+def test_partitioned_clips_deduplicate_list_and_expire(partitioned_session):
+    engine = partitioned_session.get_bind()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    ensure_partitions(engine, months_ahead=1, now=now - timedelta(days=62))
+    ensure_partitions(engine, months_ahead=1, now=now)
+    with engine.connect() as connection:
+        assert is_partitioned(connection)
+        assert len(list_partitions(connection)) >= 3
+
+    first = create_clipboard_entry(partitioned_session, ClipboardEntryCreate(type="text", content="same"))
+    again = create_clipboard_entries(
+        partitioned_session,
+        [ClipboardEntryCreate(type="text", content="same"), ClipboardEntryCreate(type="text", content="other")],
+    )
+
+    assert again.created[0].id == first.id
+    page = list_clipboard_page(partitioned_session, limit=10)
+    assert [entry.content for entry in page.entries] == ["other", "same"]
+
+    dropped = drop_expired_partitions(partitioned_session, before=partition_for(now).start)
+    assert partition_for(now - timedelta(days=62)).name in dropped
+    assert len(list_clipboard_page(partitioned_session, limit=10).entries) == 2
+    with engine.connect() as connection:
+        assert partition_for(now - timedelta(days=62)).name not in {partition.name for partition in list_partitions(connection)}
+        assert detached_partitions(connection) == []
+
+
+def test_partitions_left_detached_are_dropped(partitioned_session):
+    engine = partitioned_session.get_bind()
+    old = partition_for(datetime(2020, 1, 15))
+    ensure_partitions(engine, months_ahead=0, now=old.start)
+    with engine.begin() as connection:
+        # As if an earlier run stopped between the detach and the drop.
+        connection.execute(text(f'ALTER TABLE clips DETACH PARTITION "{old.name}"'))
+        assert detached_partitions(connection) == [old]
+
+    assert drop_expired_partitions(partitioned_session, before=old.end) == [old.name]
+    with engine.connect() as connection:
+        assert detached_partitions(connection) == []
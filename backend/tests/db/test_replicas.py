@@ -0,0 +1,89 @@
+"""Tests for read-replica routing."""
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+import app.db.replicas as replicas
+from app.db.replicas import ReplicaRouter
+
+
+def make_router(count=2, **kwargs):
+    return ReplicaRouter(
+        [(f"replica-{idx}", create_engine("sqlite://")) for idx in range(count)], **kwargs
+    )
+
+
+def test_candidates_rotate_over_replicas():
+    router = make_router(3)
+
+    firsts = [router.candidates()[0][0] for _ in range(3)]
+
+    assert firsts == ["replica-0", "replica-1", "replica-2"]
+    assert len(router.candidates()) == 3
+
+
+def test_router_without_replicas_is_disabled():
+    router = ReplicaRouter([])
+
+    assert router.enabled is False
+    assert router.candidates() == []
+
+
+def test_ejected_replica_is_skipped_until_it_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(replicas.time, "monotonic", lambda: now[0])
+    router = make_router(2, eject_seconds=30)
+
+    router.eject("replica-0")
+    router.eject("replica-0")
+
+    assert [name for name, _ in router.candidates()] == ["replica-1"]
+    assert router.stats()["ejections"] == 1
+    now[0] += 31
+    assert {name for name, _ in router.candidates()} == {"replica-0", "replica-1"}
+
+
+def test_disconnect_errors_eject_the_replica():
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "handle_error")
+    def _as_disconnect(context):
+        context.is_disconnect = True
+
+    router = ReplicaRouter([("replica-0", engine)])
+
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("SELECT * FROM missing_table"))
+        except OperationalError:
+            pass
+
+    assert router.candidates() == []
+    assert router.stats()["replicas"] == [{"name": "replica-0", "healthy": False}]
+
+
+def test_writes_make_a_client_sticky_for_a_while(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(replicas.time, "monotonic", lambda: now[0])
+    router = make_router(1, sticky_seconds=5)
+
+    router.mark_write("10.0.0.1")
+
+    assert router.is_sticky("10.0.0.1")
+    assert not router.is_sticky("10.0.0.2")
+    assert router.stats()["sticky_clients"] == 1
+    now[0] += 6
+    assert not router.is_sticky("10.0.0.1")
+
+
+def test_expired_sticky_clients_are_dropped_at_capacity(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(replicas.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(replicas, "MAX_STICKY_CLIENTS", 2)
+    router = make_router(1, sticky_seconds=5)
+
+    router.mark_write("a")
+    router.mark_write("b")
+    now[0] += 6
+    router.mark_write("c")
+
+    assert set(router._sticky_until) == {"c"}
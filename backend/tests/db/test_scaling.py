@@ -0,0 +1,171 @@
+"""Data-scale tests: the hot clip queries stay on indexes as ``clips`` grows.
+
+Skipped when the PostgreSQL test database is unavailable. The table is
+filled with :mod:`benchmarks.clip_history` up to each size in
+``CLIPS_SCALE_ROWS`` (default ``20000,200000``; set e.g.
+``CLIPS_SCALE_ROWS=1000000,10000000,50000000`` for a real capacity run).
+At each size the statements the service issues for every hot operation are
+captured, their plans must not sequentially scan ``clips``, and median
+latencies are printed (run with ``-s`` to see them).
+"""
+from __future__ import annotations
+
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import pytest
+from sqlalchemy import create_engine, event, func, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import build_test_database_url
+from app.db.base import Base
+from app.db.search import create_search_indexes
+from app.models import ClipboardEntry
+from app.schemas.clipboard_entry import ClipboardEntryCreate
+from app.services.clipboard import (
+    create_clipboard_entry,
+    delete_clipboard_entry,
+    delete_oldest_clipboard_entries,
+    encode_cursor,
+    get_clipboard_entry,
+    list_clip_previews,
+    list_clip_records,
+    search_clipboard_entries,
+)
+from benchmarks.clip_history import fill, vocabulary
+
+
+SIZES = [int(size) for size in os.getenv("CLIPS_SCALE_ROWS", "20000,200000").split(",")]
+
+TIMED_RUNS = 5
+
+
+@pytest.fixture(scope="module")
+def scale_engine() -> Iterator[Engine]:
+    engine = create_engine(build_test_database_url())
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except OperationalError:
+        pytest.skip("Test database is not available; skipping DB integration tests")
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    create_search_indexes(engine)
+    try:
+        yield engine
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+@contextmanager
+def captured_statements(engine: Engine) -> Iterator[List[Tuple[str, object]]]:
+    statements: List[Tuple[str, object]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def clips_scans(engine: Engine, statement: str, parameters: object) -> List[str]:
+    """Return the scan node types the planner picks for ``clips`` (or its partitions)."""
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0][0]["Plan"]
+    finally:
+        raw.rollback()
+        raw.close()
+
+    scans = []
+    pending = [plan]
+    while pending:
+        node = pending.pop()
+        relation = node.get("Relation Name", "")
+        if relation == "clips" or relation.startswith("clips_"):
+            scans.append(node["Node Type"])
+        pending.extend(node.get("Plans", []))
+    return scans
+
+
+def hot_operations(db: Session) -> Dict[str, Tuple[Callable[[], object], bool]]:
+    """Each hot operation, and whether it can be repeated for timing."""
+
+    oldest, newest, middle_id = db.execute(
+        select(func.min(ClipboardEntry.created_at), func.max(ClipboardEntry.created_at), func.max(ClipboardEntry.id) / 2)
+    ).one()
+    middle = db.execute(
+        select(ClipboardEntry.created_at, ClipboardEntry.id).where(ClipboardEntry.id >= middle_id).limit(1)
+    ).one()
+    victim = db.execute(select(func.max(ClipboardEntry.id))).scalar_one()
+    db.rollback()
+    rare_word = vocabulary()[-1]
+    cursor = encode_cursor(middle.created_at, middle.id)
+    cutoff = oldest + (newest - oldest) / 1000
+
+    return {
+        "list first page": (lambda: list_clip_records(db, limit=51), True),
+        "list mid-history page": (lambda: list_clip_records(db, limit=51, cursor=cursor), True),
+        "preview page": (lambda: list_clip_previews(db, limit=51, preview_chars=200), True),
+        "get by id": (lambda: get_clipboard_entry(db, entry_id=middle.id), True),
+        "search rare word": (lambda: search_clipboard_entries(db, query=rare_word, limit=20), True),
+        "create clip": (
+            lambda: create_clipboard_entry(db, ClipboardEntryCreate(type="text", content=f"scale {time.time_ns()}")),
+            True,
+        ),
+        "delete by id": (lambda: delete_clipboard_entry(db, entry_id=victim), False),
+        "delete oldest batch": (
+            lambda: delete_oldest_clipboard_entries(db, ClipboardEntry.created_at < cutoff, limit=100),
+            False,
+        ),
+    }
+
+
+@pytest.mark.parametrize("rows", sorted(SIZES))
+def test_hot_queries_use_indexes_at_scale(scale_engine, rows):
+    with scale_engine.connect() as conn:
+        current = conn.execute(select(func.count()).select_from(ClipboardEntry)).scalar_one()
+    if rows > current:
+        fill(scale_engine, rows=rows - current)
+
+    seq_scans = []
+    report = []
+    db = sessionmaker(bind=scale_engine, autocommit=False, autoflush=False)()
+    try:
+        for name, (operation, repeatable) in hot_operations(db).items():
+            with captured_statements(scale_engine) as statements:
+                started = time.perf_counter()
+                operation()
+                timings = [time.perf_counter() - started]
+            db.rollback()
+            for _ in range(TIMED_RUNS - 1 if repeatable else 0):
+                started = time.perf_counter()
+                operation()
+                timings.append(time.perf_counter() - started)
+                db.rollback()
+
+            for statement, parameters in statements:
+                if "clips" not in statement:
+                    continue
+                scans = clips_scans(scale_engine, statement, parameters)
+                if "Seq Scan" in scans:
+                    seq_scans.append(f"{name}: {statement.split()[0]} -> {scans}")
+            report.append(f"  {name:<24}{statistics.median(timings) * 1000:>10.2f} ms")
+    finally:
+        db.close()
+
+    print(f"\nclips at {rows} rows (median of up to {TIMED_RUNS} runs):\n" + "\n".join(report))
+    assert seq_scans == []
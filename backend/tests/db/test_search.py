@@ -0,0 +1,67 @@
+"""PostgreSQL search index tests; skipped when the test database is unavailable."""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import build_test_database_url
+from app.db.base import Base
+from app.db.search import check_search_indexes, create_search_indexes, get_search_support
+from app.schemas.clipboard_entry import ClipboardEntryCreate
+from app.services.clipboard import create_clipboard_entry, search_clipboard_entries
+
+
+@pytest.fixture
+def test_session():
+    engine = create_engine(build_test_database_url())
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except OperationalError:
+        pytest.skip("Test database is not available; skipping DB integration tests")
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    create_search_indexes(engine)
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def test_search_uses_full_text_and_trigram_matches(test_session):
+    support = get_search_support(test_session.connection())
+    if not support.full_text or not support.trigram:
+        pytest.skip("pg_trgm is not available in the test database")
+
+    for content in ["quarterly report draft", "reporting lines", "lunch menu"]:
+        create_clipboard_entry(test_session, ClipboardEntryCreate(type="text", content=content))
+
+    words = search_clipboard_entries(test_session, query="quarterly report", limit=10)
+    substring = search_clipboard_entries(test_session, query="eport", limit=10)
+
+    assert [entry.content for entry in words.entries][0] == "quarterly report draft"
+    assert {entry.content for entry in substring.entries} == {"quarterly report draft", "reporting lines"}
+
+
+def test_search_indexes_are_left_alone_when_present(test_session):
+    engine = test_session.get_bind()
+    support = check_search_indexes(engine)
+    if not support.full_text or not support.trigram:
+        pytest.skip("pg_trgm is not available in the test database")
+
+    with engine.connect() as connection:
+        before = connection.execute(text("SELECT indexrelid FROM pg_index WHERE indrelid = 'clips'::regclass")).all()
+    assert sorted(create_search_indexes(engine)) == ["ix_clips_content_trgm", "ix_clips_search_vector"]
+    with engine.connect() as connection:
+        after = connection.execute(text("SELECT indexrelid FROM pg_index WHERE indrelid = 'clips'::regclass")).all()
+    assert after == before
+
+
+def test_other_databases_get_no_search_indexes():
+    engine = create_engine("sqlite://")
+
+    assert create_search_indexes(engine) == []
+    assert check_search_indexes(engine) == (False, False)
@@ -24,3 +24,145 @@ def test_health_check_returns_false_on_failure():
     manager.engine = FailingEngine()
 
     assert manager.health_check() is False
+
+
+def test_create_schema_adds_nullable_columns_to_existing_tables():
+    from sqlalchemy import inspect, text
+
+    from app.db.session import create_schema
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE clips (id INTEGER PRIMARY KEY, content TEXT NOT NULL, type VARCHAR(10) NOT NULL, "
+                "title VARCHAR(500), created_at DATETIME NOT NULL, content_hash VARCHAR(64) NOT NULL, "
+                "copy_count INTEGER NOT NULL DEFAULT 1)"
+            )
+        )
+
+    create_schema(engine)
+
+    columns = {column["name"] for column in inspect(engine).get_columns("clips")}
+    assert {"content_length", "blob_sha256"} <= columns
+
+
+def test_startup_reports_missing_indexes_for_the_migration_script_to_build(caplog):
+    from sqlalchemy import inspect, text
+
+    from app.db.session import check_indexes, create_indexes, create_schema
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE clips (id INTEGER PRIMARY KEY, content TEXT NOT NULL, type VARCHAR(10) NOT NULL, "
+                "title VARCHAR(500), created_at DATETIME NOT NULL, content_hash VARCHAR(64) NOT NULL, "
+                "copy_count INTEGER NOT NULL DEFAULT 1)"
+            )
+        )
+
+    create_schema(engine)
+
+    missing = check_indexes(engine)
+    assert missing and "Indexes missing from existing tables" in caplog.text
+    assert not {index["name"] for index in inspect(engine).get_indexes("clips")} & set(missing)
+    assert sorted(create_indexes(engine)) == sorted(missing)
+    assert check_indexes(engine) == []
+
+
+def _settings(monkeypatch, **env):
+    from app.core.config import Settings
+
+    monkeypatch.setenv("POSTGRES_USER", "cliuser")
+    monkeypatch.setenv("POSTGRES_PASSWORD", "secret")
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return Settings()
+
+
+def test_engine_options_size_the_pool_and_set_session_timeouts(monkeypatch):
+    from app.db.session import engine_options
+
+    settings = _settings(
+        monkeypatch,
+        DB_POOL_SIZE="20",
+        DB_MAX_OVERFLOW="0",
+        DB_POOL_TIMEOUT_SECONDS="3",
+        DB_STATEMENT_TIMEOUT_MS="5000",
+        DB_IDLE_IN_TRANSACTION_TIMEOUT_MS="60000",
+    )
+
+    options = engine_options("postgresql://u:p@db/clips", settings)
+    async_options = engine_options("postgresql://u:p@db/clips", settings, async_driver=True)
+
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 0
+    assert options["pool_timeout"] == 3
+    assert options["pool_pre_ping"] is False
+    assert options["connect_args"] == {
+        "options": "-c statement_timeout=5000 -c idle_in_transaction_session_timeout=60000"
+    }
+    assert async_options["connect_args"] == {
+        "server_settings": {"statement_timeout": "5000", "idle_in_transaction_session_timeout": "60000"}
+    }
+
+
+def test_engine_options_for_pgbouncer_use_no_pool_or_prepared_statements(monkeypatch):
+    from sqlalchemy.pool import NullPool
+
+    from app.db.session import engine_options
+
+    settings = _settings(monkeypatch, DB_PGBOUNCER="true", DB_POOL_PRE_PING="always")
+
+    options = engine_options("postgresql://u:p@pgbouncer/clips", settings, async_driver=True)
+
+    assert options["poolclass"] is NullPool
+    assert options["pool_pre_ping"] is False
+    assert "pool_size" not in options
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_name_func"]() != options["connect_args"]["prepared_statement_name_func"]()
+
+
+def test_idle_pre_ping_discards_connections_that_fail_after_idling(tmp_path):
+    from sqlalchemy import text
+
+    from app.db.session import install_idle_pre_ping
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    install_idle_pre_ping(engine, idle_seconds=0)
+    pings = []
+    original_ping = engine.dialect.do_ping
+
+    def failing_ping(dbapi_connection):
+        pings.append(dbapi_connection)
+        if len(pings) == 1:
+            raise engine.dialect.loaded_dbapi.OperationalError("server closed the connection")
+        return original_ping(dbapi_connection)
+
+    engine.dialect.do_ping = failing_ping
+    with engine.connect() as connection:
+        first = connection.connection.dbapi_connection
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar() == 1
+        replacement = connection.connection.dbapi_connection
+
+    assert pings[0] is first
+    assert replacement is not first
+
+
+def test_pool_stats_report_queue_pool_occupancy(tmp_path):
+    from app.db.session import DatabaseManager
+
+    manager = DatabaseManager()
+    manager.engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=3, max_overflow=1)
+    manager.async_engine = None
+
+    with manager.engine.connect():
+        stats = manager.pool_stats()
+
+    assert stats["sync"]["class"] == "QueuePool"
+    assert stats["sync"]["size"] == 3
+    assert stats["sync"]["max_overflow"] == 1
+    assert stats["sync"]["checked_out"] == 1
@@ -0,0 +1,259 @@
+"""Tests for out-of-line, compressed storage of large clip bodies."""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, delete, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import config
+from app.core.compression import CODEC_ZLIB, DEFAULT_CODEC, compress, decompress
+from app.db.base import Base
+from app.models import ClipBlob, ClipBlobChunk, ClipboardEntry, compute_content_hash
+from app.schemas.clipboard_entry import ClipboardEntryCreate
+from app.services.blobs import (
+    BLOB_CHUNK_SIZE,
+    INLINE_HEAD_CHARS,
+    BlobWriter,
+    delete_orphaned_blobs,
+    iter_blob_range,
+    store_blob,
+)
+from app.services.clipboard import (
+    ClipboardContentConflictError,
+    ClipboardContentTooLargeError,
+    InvalidClipboardEntryError,
+    begin_content_upload,
+    create_clipboard_entries,
+    create_clipboard_entry,
+    delete_clipboard_entry,
+    get_clipboard_content,
+    iter_clipboard_content,
+    list_clipboard_page,
+)
+
+
+LARGE_BODY = "\n".join(f"log line {idx}: everything is fine" for idx in range(40_000))
+
+
+@pytest.fixture()
+def session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db_session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield db_session
+    finally:
+        db_session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+def test_codecs_round_trip():
+    data = b"clip " * 1000
+
+    assert decompress(compress(data), DEFAULT_CODEC) == data
+    assert decompress(compress(data, CODEC_ZLIB), CODEC_ZLIB) == data
+
+
+def test_large_clip_body_is_stored_compressed_out_of_line(session):
+    entry = create_clipboard_entry(session, ClipboardEntryCreate(type="text", content=LARGE_BODY))
+
+    row = session.query(ClipboardEntry).filter_by(id=entry.id).one()
+    blob = session.get(ClipBlob, row.blob_sha256)
+    assert row.blob_sha256 == row.content_hash
+    assert row.content == LARGE_BODY[:INLINE_HEAD_CHARS]
+    assert row.content_length == len(LARGE_BODY.encode())
+    assert blob.size == len(LARGE_BODY.encode())
+    assert blob.stored_size < blob.size // 4
+    assert len(blob.chunks) == -(-blob.size // BLOB_CHUNK_SIZE)
+    assert entry.body == LARGE_BODY
+
+
+def test_listing_returns_full_bodies(session):
+    create_clipboard_entry(session, ClipboardEntryCreate(type="text", content=LARGE_BODY))
+    create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="small"))
+
+    contents = [entry.content for entry in list_clipboard_page(session, limit=10, cursor=None).entries]
+
+    assert contents == ["small", LARGE_BODY]
+
+
+def test_identical_bodies_share_one_blob(session):
+    create_clipboard_entries(
+        session,
+        [
+            ClipboardEntryCreate(type="text", content=LARGE_BODY),
+            ClipboardEntryCreate(type="url", content="https://example.com/?q=" + LARGE_BODY[:20_000]),
+            ClipboardEntryCreate(type="text", content=LARGE_BODY),
+        ],
+    )
+    create_clipboard_entry(session, ClipboardEntryCreate(type="text", content=LARGE_BODY))
+
+    assert session.query(ClipBlob).count() == 2
+    assert session.query(ClipboardEntry).filter_by(type="text").one().copy_count == 3
+
+
+def test_orphaned_blobs_are_deleted_with_their_chunks(session):
+    entry = create_clipboard_entry(session, ClipboardEntryCreate(type="text", content=LARGE_BODY))
+    assert delete_orphaned_blobs(session, limit=10) == []
+
+    delete_clipboard_entry(session, entry_id=entry.id)
+
+    assert len(delete_orphaned_blobs(session, limit=10)) == 1
+    assert session.query(ClipBlob).count() == 0
+    assert session.query(ClipBlobChunk).count() == 0
+
+
+def test_blob_collected_while_being_reused_is_stored_again(session):
+    sha256 = "a" * 64
+    store_blob(session, sha256, [b"body"], size=4)
+    session.commit()
+    collected = []
+
+    def collect_after_conflict(conn, cursor, statement, parameters, context, executemany):
+        # Orphan collection commits between the writer's insert and its lock.
+        if statement.startswith("INSERT INTO clip_blobs") and cursor.rowcount <= 0 and not collected:
+            collected.append(sha256)
+            conn.execute(delete(ClipBlobChunk).where(ClipBlobChunk.blob_sha256 == sha256))
+            conn.execute(delete(ClipBlob).where(ClipBlob.sha256 == sha256))
+
+    engine = session.get_bind()
+    event.listen(engine, "after_cursor_execute", collect_after_conflict)
+    try:
+        assert store_blob(session, sha256, [b"body"], size=4) is True
+    finally:
+        event.remove(engine, "after_cursor_execute", collect_after_conflict)
+    session.commit()
+
+    assert collected == [sha256]
+    assert b"".join(iter_blob_range(session, sha256, 0, 3)) == b"body"
+
+
+def test_content_above_configured_limit_is_rejected(session, monkeypatch):
+    monkeypatch.setenv("CLIP_MAX_CONTENT_BYTES", "100")
+    config.load_settings.cache_clear()
+    try:
+        with pytest.raises(InvalidClipboardEntryError, match="100 bytes"):
+            create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="é" * 60))
+    finally:
+        config.load_settings.cache_clear()
+
+
+def _upload(session, entry_id, data, piece=10_000):
+    upload = begin_content_upload(session, entry_id=entry_id)
+    try:
+        for offset in range(0, len(data), piece):
+            upload.write(session, data[offset : offset + piece])
+        return upload.finish(session)
+    except Exception:
+        upload.abort(session)
+        raise
+
+
+def test_blob_writer_stores_streamed_body_under_its_digest(session):
+    data = LARGE_BODY.encode()
+    writer = BlobWriter()
+    for offset in range(0, len(data), 4096):
+        writer.write(session, data[offset : offset + 4096])
+    sha256 = writer.finish(session)
+    duplicate = BlobWriter()
+    duplicate.write(session, data)
+    assert duplicate.finish(session) == sha256
+    session.commit()
+
+    assert session.query(ClipBlob).one().sha256 == sha256
+    assert session.query(ClipBlobChunk).count() == -(-len(data) // BLOB_CHUNK_SIZE)
+    start, end = BLOB_CHUNK_SIZE - 5, BLOB_CHUNK_SIZE + 5
+    assert b"".join(iter_blob_range(session, sha256, start, end)) == data[start : end + 1]
+    assert b"".join(iter_blob_range(session, sha256, 0, len(data) - 1)) == data
+
+
+def test_streamed_upload_replaces_clip_body(session):
+    entry = create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="draft"))
+
+    updated = _upload(session, entry.id, LARGE_BODY.encode())
+
+    assert updated.blob_sha256 == updated.content_hash
+    assert updated.content == LARGE_BODY[:INLINE_HEAD_CHARS]
+    assert updated.body == LARGE_BODY
+    content = get_clipboard_content(session, entry_id=entry.id)
+    assert content.length == len(LARGE_BODY.encode())
+    assert b"".join(iter_clipboard_content(session.get_bind(), content, start=10, end=40)) == LARGE_BODY.encode()[10:41]
+
+
+def test_streamed_upload_commits_chunks_as_they_arrive(session):
+    data = LARGE_BODY.encode()
+    kept = create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="kept"))
+    dropped = create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="dropped"))
+
+    upload = begin_content_upload(session, entry_id=kept.id)
+    upload.write(session, data[: BLOB_CHUNK_SIZE + 1])
+    assert not session.in_transaction()
+    assert delete_orphaned_blobs(session, limit=10) == []
+    upload.write(session, data[BLOB_CHUNK_SIZE + 1 :])
+    assert upload.finish(session).body == LARGE_BODY
+
+    aborted = begin_content_upload(session, entry_id=dropped.id)
+    aborted.write(session, data[: BLOB_CHUNK_SIZE + 1])
+    aborted.abort(session)
+    assert [blob.sha256 for blob in session.query(ClipBlob)] == [compute_content_hash(LARGE_BODY)]
+    assert session.get(ClipboardEntry, dropped.id).content == "dropped"
+
+
+def test_small_upload_stays_inline(session):
+    entry = create_clipboard_entry(session, ClipboardEntryCreate(type="text", content=LARGE_BODY))
+
+    updated = _upload(session, entry.id, "héllo".encode(), piece=2)
+
+    assert updated.blob_sha256 is None
+    assert updated.content == "héllo"
+    assert get_clipboard_content(session, entry_id=entry.id).inline == "héllo".encode()
+
+
+def test_upload_rejects_invalid_utf8_oversized_and_duplicate_bodies(session, monkeypatch):
+    first = create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="one"))
+    second = create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="two"))
+
+    with pytest.raises(InvalidClipboardEntryError, match="UTF-8"):
+        _upload(session, first.id, b"\xff\xfe")
+    with pytest.raises(ClipboardContentConflictError):
+        _upload(session, second.id, b"one")
+
+    monkeypatch.setenv("CLIP_MAX_CONTENT_BYTES", "100")
+    config.load_settings.cache_clear()
+    try:
+        with pytest.raises(ClipboardContentTooLargeError):
+            _upload(session, first.id, b"x" * 101, piece=40)
+    finally:
+        config.load_settings.cache_clear()
+
+    assert [row.content for row in session.query(ClipboardEntry).order_by(ClipboardEntry.id)] == ["one", "two"]
+    assert session.query(ClipBlob).count() == 0
+
+
+def test_upload_racing_a_writer_of_the_same_body_conflicts(session):
+    entry = create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="before"))
+    raced = []
+
+    def write_same_body(conn, cursor, statement, parameters, context, executemany):
+        # Another request stores the same body between the duplicate check and the update.
+        if statement.startswith("SELECT clips.id") and "content_hash" in statement and not raced:
+            raced.append(True)
+            conn.execute(
+                insert(ClipboardEntry).values(type="text", content="after", content_hash=compute_content_hash("after"))
+            )
+
+    engine = session.get_bind()
+    event.listen(engine, "after_cursor_execute", write_same_body)
+    try:
+        with pytest.raises(ClipboardContentConflictError):
+            _upload(session, entry.id, b"after")
+    finally:
+        event.remove(engine, "after_cursor_execute", write_same_body)
+
+    assert raced == [True]
+    assert session.get(ClipboardEntry, entry.id).content == "before"
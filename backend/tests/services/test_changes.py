@@ -0,0 +1,144 @@
+"""Tests for the clips change log and delta sync listing."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models import ClipboardEntry, ClipChange, ClipSyncState, PendingClipChange
+from app.schemas.clipboard_entry import ClipboardEntryCreate
+from app.services.changes import backfill_change_log, prune_tombstones, read_changes_floor, record_clip_changes
+from app.services.clipboard import (
+    ChangesExpiredError,
+    bump_generation,
+    create_clipboard_entries,
+    create_clipboard_entry,
+    delete_clipboard_entry,
+    list_clip_changes,
+)
+
+
+@pytest.fixture()
+def session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    db_session = SessionLocal()
+    try:
+        yield db_session
+    finally:
+        db_session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+def _create(session, content):
+    return create_clipboard_entry(session, ClipboardEntryCreate(type="text", content=content))
+
+
+def _summary(page):
+    return [(change.id, change.deleted, change.clip.content if change.clip else None) for change in page.changes]
+
+
+def test_changes_list_each_clip_once_in_commit_order(session):
+    first = _create(session, "first")
+    second = _create(session, "second")
+    _create(session, "first")
+    delete_clipboard_entry(session, entry_id=second.id)
+
+    page = list_clip_changes(session, since=0, limit=10)
+
+    assert _summary(page) == [(first.id, False, "first"), (second.id, True, None)]
+    assert page.changes[0].clip.copy_count == 2
+    assert page.changes[0].seq < page.changes[1].seq
+    assert page.has_more is False
+    assert page.next_since == page.changes[-1].seq
+
+
+def test_changes_since_return_only_later_changes(session):
+    _create(session, "old")
+    since = list_clip_changes(session, since=0, limit=10).next_since
+    newer = _create(session, "new")
+
+    page = list_clip_changes(session, since=since, limit=10)
+
+    assert _summary(page) == [(newer.id, False, "new")]
+    assert list_clip_changes(session, since=page.next_since, limit=10) == (
+        [],
+        page.next_since,
+        False,
+    )
+
+
+def test_changes_are_paged(session):
+    result = create_clipboard_entries(
+        session, [ClipboardEntryCreate(type="text", content=f"clip {idx}") for idx in range(5)]
+    )
+
+    first = list_clip_changes(session, since=0, limit=3)
+    rest = list_clip_changes(session, since=first.next_since, limit=3)
+
+    assert first.has_more is True
+    assert rest.has_more is False
+    ids = [change.id for change in first.changes + rest.changes]
+    assert ids == sorted(entry.id for entry in result.created)
+
+
+def test_backfill_enters_existing_clips_into_the_log(session):
+    session.add_all([ClipboardEntry(type="text", content=f"legacy {idx}") for idx in range(3)])
+    session.add(ClipSyncState(id=ClipSyncState.SINGLETON_ID, generation=7))
+    session.commit()
+    created = _create(session, "new")
+
+    assert [change.id for change in list_clip_changes(session, since=0, limit=10).changes] == [created.id]
+
+    assert backfill_change_log(session, batch_size=2) == 3
+    assert backfill_change_log(session, batch_size=2) == 0
+
+    page = list_clip_changes(session, since=0, limit=10)
+    assert [change.clip.content for change in page.changes] == ["new", "legacy 0", "legacy 1", "legacy 2"]
+    assert [change.seq for change in page.changes] == [1, 2, 3, 4]
+
+
+def test_changes_committed_without_a_bump_are_numbered_by_the_next_one(session):
+    first = _create(session, "first")
+    # A writer that committed its clip but died before bumping the generation.
+    orphan = ClipboardEntry(type="text", content="orphan")
+    session.add(orphan)
+    session.flush()
+    record_clip_changes(session, [orphan.id])
+    session.commit()
+
+    assert list_clip_changes(session, since=0, limit=10).changes[-1].id == first.id
+
+    bump_generation(session)
+
+    page = list_clip_changes(session, since=0, limit=10)
+    assert [change.id for change in page.changes] == [first.id, orphan.id]
+    assert session.scalars(select(PendingClipChange)).all() == []
+
+
+def test_pruned_tombstones_expire_older_sync_points(session):
+    kept = _create(session, "kept")
+    gone = _create(session, "gone")
+    since = list_clip_changes(session, since=0, limit=10).next_since
+    delete_clipboard_entry(session, entry_id=gone.id)
+    latest = list_clip_changes(session, since=since, limit=10).next_since
+
+    pruned = prune_tombstones(session, before=datetime.now() + timedelta(minutes=1), limit=10)
+
+    assert pruned == 1
+    assert read_changes_floor(session) == latest
+    assert session.execute(select(ClipChange.clip_id)).scalars().all() == [kept.id]
+    with pytest.raises(ChangesExpiredError):
+        list_clip_changes(session, since=since, limit=10)
+    assert list_clip_changes(session, since=latest, limit=10).changes == []
+    assert _summary(list_clip_changes(session, since=0, limit=10)) == [(kept.id, False, "kept")]
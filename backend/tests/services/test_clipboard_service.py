@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -11,9 +11,16 @@ from app.models import ClipboardEntry
 from app.services.clipboard import (
     ClipboardEntryNotFoundError,
     InvalidClipboardEntryError,
+    InvalidCursorError,
+    create_clipboard_entries,
     create_clipboard_entry,
+    decode_cursor,
+    delete_clipboard_entries,
     delete_clipboard_entry,
+    encode_cursor,
     list_clipboard_entries,
+    list_clipboard_page,
+    search_clipboard_entries,
 )
 from app.schemas.clipboard_entry import ClipboardEntryCreate
 
@@ -87,6 +94,226 @@ def test_delete_clipboard_entry_removes_record(session):
     assert session.query(ClipboardEntry).count() == 0
 
 
+def test_delete_clipboard_entry_is_a_single_statement(session):
+    entry = create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="one-shot"))
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "clips" in statement:
+            statements.append(statement.split()[0])
+
+    event.listen(session.get_bind(), "before_cursor_execute", record)
+    try:
+        delete_clipboard_entry(session, entry_id=entry.id)
+    finally:
+        event.remove(session.get_bind(), "before_cursor_execute", record)
+
+    assert statements == ["DELETE"]
+
+
+def test_delete_clipboard_entries_matches_all_filters_in_batches(session):
+    create_clipboard_entries(
+        session,
+        [ClipboardEntryCreate(type="text", content=f"text {idx}") for idx in range(7)]
+        + [ClipboardEntryCreate(type="url", content="https://example.com")],
+    )
+    newest_text = session.query(ClipboardEntry).filter_by(content="text 6").one()
+    ids = [newest_text.id, session.query(ClipboardEntry).filter_by(type="url").one().id]
+
+    assert delete_clipboard_entries(session, ids=ids, entry_type="text", batch_size=2) == 1
+    assert delete_clipboard_entries(session, entry_type="text", batch_size=2) == 6
+    assert [entry.type for entry in session.query(ClipboardEntry)] == ["url"]
+    assert delete_clipboard_entries(session, ids=[12345], batch_size=2) == 0
+    with pytest.raises(InvalidClipboardEntryError):
+        delete_clipboard_entries(session, batch_size=2)
+
+
 def test_delete_clipboard_entry_raises_for_missing_id(session):
     with pytest.raises(ClipboardEntryNotFoundError):
         delete_clipboard_entry(session, entry_id=999)
+
+
+def test_create_clipboard_entries_inserts_valid_payloads_in_order(session):
+    payloads = [
+        ClipboardEntryCreate(type="text", content="one", title=None),
+        ClipboardEntryCreate(type="url", content="notaurl", title=None),
+        ClipboardEntryCreate(type="url", content="https://example.com", title="site"),
+    ]
+
+    result = create_clipboard_entries(session, payloads)
+
+    assert [entry.position for entry in result.created] == [0, 2]
+    assert [rejected.position for rejected in result.rejected] == [1]
+    persisted = {entry.id: entry.content for entry in session.query(ClipboardEntry).all()}
+    assert persisted == {
+        result.created[0].id: "one",
+        result.created[1].id: "https://example.com",
+    }
+
+
+def test_create_clipboard_entries_handles_multiple_insert_pages(session):
+    payloads = [
+        ClipboardEntryCreate(type="text", content=f"clip-{idx}", title=None) for idx in range(2_500)
+    ]
+
+    result = create_clipboard_entries(session, payloads)
+
+    assert len(result.created) == 2_500
+    assert result.rejected == []
+    assert session.query(ClipboardEntry).count() == 2_500
+    by_id = {entry.id: entry.content for entry in session.query(ClipboardEntry).all()}
+    assert all(by_id[entry.id] == f"clip-{entry.position}" for entry in result.created)
+
+
+def test_create_clipboard_entry_folds_repeated_content_into_one_row(session):
+    first = create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="again", title="a"))
+    second = create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="again", title=None))
+
+    assert second.id == first.id
+    assert second.copy_count == 2
+    assert second.title == "a"
+    assert session.query(ClipboardEntry).count() == 1
+
+
+def test_create_clipboard_entry_keeps_types_apart(session):
+    create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="https://example.com"))
+    create_clipboard_entry(session, ClipboardEntryCreate(type="url", content="https://example.com"))
+
+    assert session.query(ClipboardEntry).count() == 2
+
+
+def test_recopied_clip_moves_to_top_of_listing(session):
+    older = create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="older"))
+    create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="newer"))
+    list_clipboard_page(session, limit=10)
+
+    create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="older"))
+
+    entries = list_clipboard_page(session, limit=10).entries
+    assert [entry.content for entry in entries] == ["older", "newer"]
+    assert entries[0].id == older.id
+
+
+def test_create_clipboard_entries_merges_duplicates_within_batch(session):
+    create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="seen"))
+    payloads = [
+        ClipboardEntryCreate(type="text", content="seen"),
+        ClipboardEntryCreate(type="text", content="fresh"),
+        ClipboardEntryCreate(type="text", content="seen", title="titled"),
+    ]
+
+    result = create_clipboard_entries(session, payloads)
+
+    assert [entry.position for entry in result.created] == [0, 1, 2]
+    assert result.created[0].id == result.created[2].id
+    stored = session.query(ClipboardEntry).filter_by(content="seen").one()
+    assert stored.copy_count == 3
+    assert stored.title == "titled"
+    assert session.query(ClipboardEntry).count() == 2
+
+
+def test_create_clipboard_entries_upserts_in_key_order(session, monkeypatch):
+    from app.services import clipboard
+
+    upserted = []
+    upsert_rows = clipboard._upsert_rows
+
+    def recording_upsert(db, rows):
+        upserted.extend((row["type"], row["content_hash"]) for row in rows)
+        return upsert_rows(db, rows)
+
+    monkeypatch.setattr(clipboard, "_upsert_rows", recording_upsert)
+    payloads = [
+        ClipboardEntryCreate(type=kind, content=f"https://example.com/{idx}")
+        for idx in range(6)
+        for kind in ("url", "text")
+    ]
+
+    result = create_clipboard_entries(session, payloads)
+
+    assert upserted == sorted(upserted)
+    assert [entry.position for entry in result.created] == list(range(12))
+
+
+def test_list_clipboard_page_walks_history_with_cursors(session):
+    from datetime import datetime
+
+    same_instant = datetime(2024, 1, 1, 12, 0, 0)
+    for idx in range(5):
+        session.add(ClipboardEntry(content=f"clip-{idx}", type="text", created_at=same_instant))
+    session.add(ClipboardEntry(content="newest", type="text", created_at=datetime(2024, 1, 2)))
+    session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        page = list_clipboard_page(session, limit=2, cursor=cursor)
+        seen.extend(entry.content for entry in page.entries)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+
+    assert seen == ["newest", "clip-4", "clip-3", "clip-2", "clip-1", "clip-0"]
+
+
+def test_list_clipboard_page_omits_cursor_on_last_page(session):
+    create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="only", title=None))
+
+    page = list_clipboard_page(session, limit=1)
+
+    assert [entry.content for entry in page.entries] == ["only"]
+    assert page.next_cursor is None
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    from datetime import datetime
+
+    created_at = datetime(2024, 5, 6, 7, 8, 9, 123456)
+
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor")
+
+
+def test_search_clipboard_entries_matches_substrings_case_insensitively(session):
+    create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="Meeting NOTES for Monday"))
+    create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="unrelated"))
+
+    page = search_clipboard_entries(session, query="notes", limit=10)
+
+    assert [entry.content for entry in page.entries] == ["Meeting NOTES for Monday"]
+    assert page.next_cursor is None
+
+
+def test_search_clipboard_entries_ranks_title_matches_first(session):
+    create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="budget draft", title=None))
+    create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="numbers", title="Budget"))
+
+    page = search_clipboard_entries(session, query="budget", limit=10)
+
+    assert [entry.content for entry in page.entries] == ["numbers", "budget draft"]
+
+
+def test_search_clipboard_entries_treats_wildcards_literally(session):
+    create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="100% done"))
+    create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="100 items"))
+
+    page = search_clipboard_entries(session, query="100%", limit=10)
+
+    assert [entry.content for entry in page.entries] == ["100% done"]
+
+
+def test_search_clipboard_entries_pages_with_cursor(session):
+    for idx in range(5):
+        create_clipboard_entry(session, ClipboardEntryCreate(type="text", content=f"match {idx}"))
+
+    seen = []
+    cursor = None
+    while True:
+        page = search_clipboard_entries(session, query="match", limit=2, cursor=cursor)
+        seen.extend(entry.content for entry in page.entries)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+
+    assert seen == [f"match {idx}" for idx in reversed(range(5))]
@@ -0,0 +1,101 @@
+"""Unit tests for clip change event fan-out."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.schemas.clipboard_entry import ClipboardEntryCreate
+from app.services.clipboard import create_clipboard_entry, delete_clipboard_entry
+from app.services.events import RESYNC_EVENT, ClipEventBroker, clip_event_broker, emit_clip_events
+
+
+@pytest.fixture()
+def session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db_session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield db_session
+    finally:
+        db_session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+async def _drain(subscription, count):
+    return [await asyncio.wait_for(subscription.get(), timeout=1) for _ in range(count)]
+
+
+def test_broker_delivers_to_every_subscriber():
+    async def scenario():
+        broker = ClipEventBroker()
+        first, second = broker.subscribe(), broker.subscribe()
+        broker.publish({"event": "created", "id": 1})
+        return await _drain(first, 1), await _drain(second, 1)
+
+    first_events, second_events = asyncio.run(scenario())
+
+    assert first_events == second_events == [{"event": "created", "id": 1}]
+
+
+def test_slow_subscriber_is_told_to_resync():
+    async def scenario():
+        broker = ClipEventBroker(queue_size=2)
+        subscription = broker.subscribe()
+        for entry_id in range(3):
+            broker.publish({"event": "created", "id": entry_id})
+        await asyncio.sleep(0)
+        return await _drain(subscription, 1)
+
+    assert asyncio.run(scenario()) == [RESYNC_EVENT]
+
+
+def test_events_publish_only_after_commit(session):
+    async def scenario():
+        subscription = clip_event_broker.subscribe()
+        try:
+            session.begin()
+            emit_clip_events(session, [{"event": "deleted", "id": 99}])
+            session.rollback()
+
+            entry = create_clipboard_entry(
+                session, ClipboardEntryCreate(type="text", content="hello", title=None)
+            )
+            delete_clipboard_entry(session, entry_id=entry.id)
+            return entry.id, await _drain(subscription, 2)
+        finally:
+            clip_event_broker.unsubscribe(subscription)
+
+    entry_id, events = asyncio.run(scenario())
+
+    assert [event["event"] for event in events] == ["created", "deleted"]
+    assert all(event["id"] == entry_id for event in events)
+    assert events[0]["type"] == "text"
+
+
+def test_listener_refuses_pgbouncer_without_a_direct_url(monkeypatch):
+    from app.core import config
+
+    pooled = create_engine("postgresql://clips@pgbouncer:6432/clips")
+    monkeypatch.setenv("DB_PGBOUNCER", "true")
+    config.load_settings.cache_clear()
+    broker = ClipEventBroker()
+    try:
+        with pytest.raises(RuntimeError, match="DATABASE_LISTEN_URL"):
+            broker.start(pooled)
+
+        monkeypatch.setenv("DATABASE_LISTEN_URL", "postgresql://clips@127.0.0.1:1/clips")
+        config.load_settings.cache_clear()
+        broker.start(pooled)
+        assert broker._listener._engine.url.port == 1
+    finally:
+        broker.stop()
+        config.load_settings.cache_clear()
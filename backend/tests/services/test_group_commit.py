@@ -0,0 +1,97 @@
+"""Tests for the group-commit writer behind ``POST /clip``."""
+from __future__ import annotations
+
+from concurrent.futures import wait
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models import ClipboardEntry, compute_content_hash
+from app.schemas.clipboard_entry import ClipboardEntryCreate
+from app.services import group_commit
+from app.services.clipboard import InvalidClipboardEntryError
+from app.services.group_commit import GroupCommitWriter
+
+
+@pytest.fixture()
+def session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    finally:
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture()
+def writer(session_factory):
+    # A long wait makes every clip submitted below land in the first batch.
+    writer = GroupCommitWriter(enabled=True, max_batch=100, max_wait=0.2)
+    writer.start(session_factory)
+    try:
+        yield writer
+    finally:
+        writer.stop()
+
+
+def _text(content):
+    return ClipboardEntryCreate(type="text", content=content)
+
+
+def test_concurrent_clips_share_one_transaction(writer, session_factory):
+    futures = [writer.submit(_text(f"clip {idx}")) for idx in range(20)]
+
+    entries = [future.result(timeout=5) for future in futures]
+
+    assert len({entry.id for entry in entries}) == 20
+    assert [entry.content_hash for entry in entries] == [compute_content_hash(f"clip {idx}") for idx in range(20)]
+    assert writer.stats()["batches"] == 1
+    assert writer.stats()["clips"] == 20
+    with session_factory() as db:
+        assert db.query(ClipboardEntry).count() == 20
+
+
+def test_rejected_and_repeated_clips_in_a_batch(writer):
+    futures = [
+        writer.submit(_text("same")),
+        writer.submit(ClipboardEntryCreate(type="url", content="not a url")),
+        writer.submit(_text("same")),
+    ]
+
+    wait(futures, timeout=5)
+
+    assert isinstance(futures[1].exception(), InvalidClipboardEntryError)
+    assert futures[0].result().id == futures[2].result().id
+    assert futures[2].result().copy_count == 2
+
+
+def test_failed_batch_is_retried_clip_by_clip(writer, monkeypatch):
+    def fail(db, payloads):
+        raise RuntimeError("batch failed")
+
+    monkeypatch.setattr(group_commit, "create_clipboard_entries", fail)
+
+    futures = [writer.submit(_text("a")), writer.submit(_text("b"))]
+
+    assert sorted(future.result(timeout=5).content_hash for future in futures) == sorted(
+        compute_content_hash(content) for content in ("a", "b")
+    )
+    assert writer.stats()["failed_batches"] == 1
+
+
+def test_stopped_or_full_writer_hands_clips_back(session_factory):
+    writer = GroupCommitWriter(enabled=True, max_batch=1)
+    assert writer.submit(_text("not started")) is None
+
+    writer.start(session_factory)
+    writer.stop()
+
+    assert writer.submit(_text("stopped")) is None
+    assert GroupCommitWriter(enabled=False).stats()["running"] is False
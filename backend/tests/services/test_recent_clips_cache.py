@@ -0,0 +1,201 @@
+"""Tests for the in-process recent clips cache and its write-through hooks."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models import ClipboardEntry
+from app.schemas.clipboard_entry import ClipboardEntryCreate, ClipboardEntryRead
+from app.services.blobs import INLINE_HEAD_CHARS
+from app.services.clipboard import (
+    RecentClipsCache,
+    bump_generation,
+    create_clipboard_entry,
+    delete_clipboard_entry,
+    list_clipboard_page,
+    read_generation,
+    recent_clips_cache,
+)
+
+
+@pytest.fixture()
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield engine
+    finally:
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture()
+def session(engine):
+    db_session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield db_session
+    finally:
+        db_session.close()
+
+
+@pytest.fixture()
+def clip_queries(engine):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # Listing reads only; the change log's one-off backfill also selects from clips.
+        if statement.startswith("SELECT") and "FROM clips" in statement and "ORDER BY" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _read(entry_id, seconds):
+    return ClipboardEntryRead(
+        id=entry_id,
+        type="text",
+        content=f"clip-{entry_id}",
+        title=None,
+        created_at=datetime(2024, 1, 1) + timedelta(seconds=seconds),
+    )
+
+
+def _create(session, content):
+    return create_clipboard_entry(
+        session, ClipboardEntryCreate(type="text", content=content, title=None)
+    )
+
+
+def test_repeated_first_page_is_served_without_querying_clips(session, clip_queries):
+    _create(session, "one")
+    _create(session, "two")
+    recent_clips_cache.invalidate()
+
+    first = list_clipboard_page(session, limit=10)
+    hits_before = recent_clips_cache.hits
+    second = list_clipboard_page(session, limit=10)
+
+    assert [entry.content for entry in second.entries] == ["two", "one"]
+    assert second.entries == first.entries
+    assert len(clip_queries) == 1
+    assert recent_clips_cache.hits == hits_before + 1
+
+
+def test_writes_update_the_cache_in_place(session, clip_queries):
+    doomed = _create(session, "doomed")
+    list_clipboard_page(session, limit=10)
+
+    _create(session, "fresh")
+    delete_clipboard_entry(session, entry_id=doomed.id)
+    page = list_clipboard_page(session, limit=10)
+
+    assert [entry.content for entry in page.entries] == ["fresh"]
+    assert len(clip_queries) == 1
+    assert recent_clips_cache.stats()["generation"] == read_generation(session)
+
+
+def test_changes_from_other_workers_force_a_refill(session):
+    _create(session, "local")
+    list_clipboard_page(session, limit=10)
+    misses_before = recent_clips_cache.misses
+
+    # Another worker commits a clip: the generation moves but this cache is not told.
+    session.add(ClipboardEntry(content="remote", type="text"))
+    session.commit()
+    bump_generation(session)
+
+    page = list_clipboard_page(session, limit=10)
+
+    assert [entry.content for entry in page.entries] == ["remote", "local"]
+    assert recent_clips_cache.misses == misses_before + 1
+
+
+def test_generation_read_by_the_caller_is_not_read_again(engine, session):
+    _create(session, "one")
+    generation = read_generation(session)
+    sync_reads = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM clip_sync_state" in statement:
+            sync_reads.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        page = list_clipboard_page(session, limit=10, generation=generation)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert [entry.content for entry in page.entries] == ["one"]
+    assert sync_reads == []
+
+
+def test_window_holds_heads_of_large_clips_and_lists_their_bodies(session):
+    large = "x" * 20_000 + "end"
+    _create(session, "small")
+    recent_clips_cache.invalidate()
+    list_clipboard_page(session, limit=1)
+    _create(session, large)
+
+    page = list_clipboard_page(session, limit=10)
+
+    assert [entry.content for entry in page.entries] == [large, "small"]
+    cached = recent_clips_cache.get(read_generation(session), 2)
+    assert [len(entry.content) for entry in cached] == [INLINE_HEAD_CHARS, len("small")]
+
+    recent_clips_cache.invalidate()
+    assert [entry.content for entry in list_clipboard_page(session, limit=1).entries] == [large]
+    assert len(recent_clips_cache.get(read_generation(session), 1)[0].content) == INLINE_HEAD_CHARS
+
+
+def test_partial_window_ignores_rows_older_than_its_tail():
+    cache = RecentClipsCache(capacity=2)
+    cache.fill(1, [_read(3, 30), _read(2, 20), _read(1, 10)])
+
+    cache.apply_insert(2, [_read(4, 5)])
+
+    assert [entry.id for entry in cache.get(2, 2)] == [3, 2]
+    assert cache.get(2, 3) is None
+
+
+def test_complete_window_keeps_sort_order_and_capacity():
+    cache = RecentClipsCache(capacity=3)
+    cache.fill(1, [_read(2, 20)])
+
+    cache.apply_insert(2, [_read(3, 10), _read(4, 40), _read(5, 30)])
+
+    assert [entry.id for entry in cache.get(2, 3)] == [4, 5, 2]
+    assert cache.get(2, 4) is None
+
+
+def test_out_of_order_write_invalidates():
+    cache = RecentClipsCache(capacity=3)
+    cache.fill(1, [_read(1, 10)])
+
+    cache.apply_delete(3, [1])
+
+    assert cache.get(3, 1) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_disabled_cache_always_queries(session, clip_queries, monkeypatch):
+    monkeypatch.setattr(recent_clips_cache, "enabled", False)
+    _create(session, "one")
+    hits_before = recent_clips_cache.hits
+
+    list_clipboard_page(session, limit=10)
+    list_clipboard_page(session, limit=10)
+
+    assert len(clip_queries) == 2
+    assert recent_clips_cache.hits == hits_before
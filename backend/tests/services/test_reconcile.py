@@ -0,0 +1,204 @@
+"""Tests for range-hash reconciliation of clip histories."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import build_test_database_url
+from app.db.base import Base
+from app.models import ClipboardEntry
+from app.schemas.clipboard_entry import ClipboardEntryCreate
+from app.services.clipboard import create_clipboard_entries, create_clipboard_entry, delete_clipboard_entry
+from app.services.reconcile import (
+    MAX_CLIP_ID,
+    RangeDigestCache,
+    RangeSummary,
+    ReconcileUnavailableError,
+    clip_leaf,
+    format_digest,
+    range_digest_cache,
+    reconcile_ranges,
+)
+
+
+@pytest.fixture()
+def session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    db_session = SessionLocal()
+    try:
+        yield db_session
+    finally:
+        db_session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+def _seed(session, count):
+    create_clipboard_entries(
+        session, [ClipboardEntryCreate(type="text", content=f"clip {idx}") for idx in range(count)]
+    )
+    return dict(session.execute(select(ClipboardEntry.id, ClipboardEntry.content_hash)).tuples().all())
+
+
+def summarise(local, start, end):
+    digest = 0
+    count = 0
+    for entry_id, content_hash in local.items():
+        if start <= entry_id < end:
+            digest ^= clip_leaf(entry_id, content_hash)
+            count += 1
+    return RangeSummary(start, end, format_digest(digest), count)
+
+
+def reconcile(session, local):
+    """Run the client side of the protocol; return the rounds taken and the items received."""
+
+    rounds = 0
+    received = 0
+    pending = [summarise(local, 0, MAX_CLIP_ID)]
+    while pending:
+        rounds += 1
+        results = reconcile_ranges(session, pending)
+        pending = []
+        for result in results:
+            if result.items is not None:
+                received += len(result.items)
+                for entry_id in [entry_id for entry_id in local if result.start <= entry_id < result.end]:
+                    del local[entry_id]
+                local.update((item.id, item.content_hash) for item in result.items)
+                continue
+            mine = summarise(local, result.start, result.end)
+            if (mine.digest, mine.count) != (result.digest, result.count):
+                pending.append(mine)
+    return rounds, received
+
+
+def test_identical_histories_need_one_round_and_no_items(session):
+    local = _seed(session, 50)
+    range_digest_cache.refresh(session)
+
+    assert reconcile(session, local) == (1, 0)
+
+
+def test_small_differences_in_a_large_history_transfer_few_items(session):
+    server = _seed(session, 3000)
+    range_digest_cache.refresh(session)
+    local = dict(server)
+    ids = sorted(server)
+    del local[ids[10]], local[ids[1500]]
+    local[ids[2000]] = "0" * 64
+    local[ids[-1] + 5] = "f" * 64
+    delete_clipboard_entry(session, entry_id=ids[2999])
+    del server[ids[2999]]
+
+    rounds, received = reconcile(session, local)
+
+    assert local == server
+    assert received < 5 * 128
+    assert rounds <= 4
+
+
+def test_changes_since_the_snapshot_are_read_from_the_table_until_refreshed(session):
+    local = _seed(session, 2500)
+    range_digest_cache.refresh(session)
+    reconcile(session, local)
+    rebuilds = range_digest_cache.stats()["rebuilds"]
+
+    created = create_clipboard_entry(session, ClipboardEntryCreate(type="text", content="new one"))
+    delete_clipboard_entry(session, entry_id=min(local))
+    reconcile(session, local)
+
+    assert created.id in local and len(local) == 2500
+    assert range_digest_cache.stats()["bucket_reloads"] == 0
+
+    range_digest_cache.refresh(session)
+
+    stats = range_digest_cache.stats()
+    assert stats["rebuilds"] == rebuilds
+    assert stats["bucket_reloads"] <= 2
+    assert reconcile(session, local) == (1, 0)
+
+
+def test_requests_never_build_the_cache(session, tmp_path):
+    _seed(session, 10)
+    whole = [RangeSummary(0, MAX_CLIP_ID, "0" * 16, 0)]
+    rebuilds = range_digest_cache.stats()["rebuilds"]
+
+    with pytest.raises(ReconcileUnavailableError):
+        reconcile_ranges(session, whole)
+
+    other = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'other.db'}"))()
+    Base.metadata.create_all(bind=other.get_bind())
+    range_digest_cache.refresh(other)
+    other.close()
+    with pytest.raises(ReconcileUnavailableError):
+        reconcile_ranges(session, whole)
+
+    range_digest_cache.refresh(session)
+    assert reconcile_ranges(session, whole)[0].count == 10
+    assert range_digest_cache.stats()["rebuilds"] == rebuilds + 2
+
+
+def test_refresh_loop_runs_only_while_clients_reconcile(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reconcile.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    session = factory()
+    _seed(session, 10)
+    cache = RangeDigestCache(interval=0.01, idle_timeout=0.3)
+    whole = [RangeSummary(0, MAX_CLIP_ID, "0" * 16, 0)]
+
+    async def scenario():
+        cache.start(factory)
+        await asyncio.sleep(0.05)
+        started_without_clients = cache.stats()["running"]
+        with pytest.raises(ReconcileUnavailableError):
+            cache.reconcile(session, whole)
+        while cache.stats()["seq"] is None:
+            await asyncio.sleep(0.01)
+        count = cache.reconcile(session, whole)[0].count
+        while cache.stats()["running"]:
+            await asyncio.sleep(0.01)
+        await cache.stop()
+        return started_without_clients, count
+
+    try:
+        assert asyncio.run(asyncio.wait_for(scenario(), 5)) == (False, 10)
+        assert cache.stats()["rebuilds"] == 1
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def test_postgres_digests_folded_in_sql_match_clip_leaf():
+    engine = create_engine(build_test_database_url())
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except OperationalError:
+        pytest.skip("Test database is not available; skipping DB integration tests")
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        local = _seed(session, 2500)
+        cache = RangeDigestCache()
+        cache.refresh(session)
+
+        assert cache.reconcile(session, [summarise(local, 0, MAX_CLIP_ID)]) == []
+        assert cache.reconcile(session, [summarise(local, 5, 1500)]) == []
+    finally:
+        session.close()
+        engine.dispose()
@@ -0,0 +1,203 @@
+"""Tests for the clip retention policy and batched pruner."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import config
+from app.core.config import build_test_database_url
+from app.db.base import Base
+from app.models import ClipBlob, ClipboardEntry
+from app.services.blobs import store_blob
+from app.services.changes import backfill_change_log
+from app.services.clipboard import (
+    delete_oldest_clipboard_entries,
+    list_clip_changes,
+    list_clipboard_page,
+    read_generation,
+    recent_clips_cache,
+)
+from app.services.retention import RETENTION_LOCK_KEY, RetentionPolicy, RetentionPruner, build_retention_rules
+
+
+NOW = datetime(2024, 6, 1, 12, 0, 0)
+
+
+@pytest.fixture()
+def session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    finally:
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture()
+def session(session_factory):
+    db_session = session_factory()
+    try:
+        yield db_session
+    finally:
+        db_session.close()
+
+
+def _add_clips(session, *specs):
+    for content, entry_type, age in specs:
+        session.add(ClipboardEntry(content=content, type=entry_type, created_at=NOW - age))
+    session.commit()
+
+
+def _remaining(session):
+    session.expire_all()
+    return sorted(entry.content for entry in session.query(ClipboardEntry).all())
+
+
+def test_policy_from_settings_disables_unset_rules(monkeypatch):
+    monkeypatch.setenv("CLIP_RETENTION_MAX_AGE_DAYS", "30")
+    monkeypatch.setenv("CLIP_RETENTION_TYPE_MAX_ROWS", "url=10,text=0")
+
+    policy = RetentionPolicy.from_settings(config.Settings())
+
+    assert policy.max_age == timedelta(days=30)
+    assert policy.max_rows is None
+    assert policy.type_max_rows == {"url": 10}
+    assert policy.tombstone_max_age is None
+    assert policy.enabled
+    assert not RetentionPolicy().enabled
+
+
+def test_max_age_rule_removes_only_expired_clips(session):
+    _add_clips(session, ("old", "text", timedelta(days=10)), ("fresh", "text", timedelta(days=1)))
+    policy = RetentionPolicy(max_age=timedelta(days=7))
+
+    for rule in build_retention_rules(session, policy, now=NOW):
+        delete_oldest_clipboard_entries(session, rule.condition, limit=100)
+
+    assert _remaining(session) == ["fresh"]
+
+
+def test_row_limits_keep_the_newest_clips_overall_and_per_type(session):
+    _add_clips(
+        session,
+        *[(f"text-{idx}", "text", timedelta(hours=idx)) for idx in range(4)],
+        *[(f"https://example.com/{idx}", "url", timedelta(minutes=idx)) for idx in range(3)],
+    )
+    policy = RetentionPolicy(max_rows=5, type_max_rows={"url": 1})
+
+    for rule in build_retention_rules(session, policy, now=NOW):
+        delete_oldest_clipboard_entries(session, rule.condition, limit=100)
+
+    assert _remaining(session) == ["https://example.com/0", "text-0", "text-1"]
+
+
+def test_batched_delete_bumps_generation_and_updates_cache(session):
+    _add_clips(session, *[(f"clip-{idx}", "text", timedelta(days=idx)) for idx in range(5)])
+    list_clipboard_page(session, limit=10)
+    before = read_generation(session)
+    session.rollback()
+    [rule] = build_retention_rules(session, RetentionPolicy(max_age=timedelta(hours=12)), now=NOW)
+
+    deleted = delete_oldest_clipboard_entries(session, rule.condition, limit=2)
+
+    assert len(deleted) == 2
+    assert read_generation(session) == before + 1
+    cached = recent_clips_cache.get(before + 1, 3)
+    assert [entry.content for entry in cached] == ["clip-0", "clip-1", "clip-2"]
+
+
+def test_pruner_deletes_in_batches_and_reports_progress(session_factory, session):
+    _add_clips(session, *[(f"clip-{idx}", "text", timedelta(days=idx)) for idx in range(7)])
+    pruner = RetentionPruner(RetentionPolicy(max_rows=2), batch_size=2, batch_pause=0)
+
+    deleted = asyncio.run(pruner.prune(session_factory))
+
+    assert deleted == 5
+    assert _remaining(session) == ["clip-0", "clip-1"]
+    stats = pruner.stats()
+    assert stats["passes"] == 1
+    assert stats["batches"] == 3
+    assert stats["deleted_by_rule"] == {"max_rows": 5}
+    assert stats["max_batch_ms"] is not None
+    assert stats["running"] is False
+
+
+def test_pruner_start_is_a_no_op_without_a_policy(session_factory):
+    pruner = RetentionPruner(RetentionPolicy(), collect_blobs=False)
+
+    async def start_and_stop():
+        pruner.start(session_factory)
+        started = pruner._task is not None
+        await pruner.stop()
+        return started
+
+    assert asyncio.run(start_and_stop()) is False
+
+
+def test_pruner_removes_expired_tombstones(session_factory, session):
+    _add_clips(session, *[(f"clip-{idx}", "text", timedelta(days=idx)) for idx in range(3)])
+    backfill_change_log(session, batch_size=10)
+    delete_oldest_clipboard_entries(session, ClipboardEntry.content != "clip-0", limit=10)
+    pruner = RetentionPruner(RetentionPolicy(tombstone_max_age=timedelta(seconds=-60)), batch_size=1, batch_pause=0)
+
+    asyncio.run(pruner.prune(session_factory))
+
+    assert pruner.stats()["tombstones_pruned"] == 2
+    assert [change.deleted for change in list_clip_changes(session, since=0, limit=10).changes] == [False]
+
+
+def test_pruner_collects_orphaned_blobs_with_default_settings(monkeypatch, session_factory, session):
+    for name in ("CLIP_RETENTION_MAX_AGE_DAYS", "CLIP_RETENTION_MAX_ROWS", "CLIP_TOMBSTONE_MAX_AGE_DAYS"):
+        monkeypatch.delenv(name, raising=False)
+    pruner = RetentionPruner.from_settings(config.Settings())
+    store_blob(session, "f" * 64, [b"orphaned body"], size=13)
+    session.commit()
+
+    async def run_one_pass():
+        pruner.start(session_factory)
+        while pruner.stats()["passes"] == 0:
+            await asyncio.sleep(0.01)
+        await pruner.stop()
+
+    asyncio.run(asyncio.wait_for(run_one_pass(), 5))
+
+    assert pruner.enabled
+    assert pruner.stats()["blobs_deleted"] == 1
+    session.expire_all()
+    assert session.get(ClipBlob, "f" * 64) is None
+
+
+def test_pass_is_skipped_while_another_worker_holds_the_lock():
+    engine = create_engine(build_test_database_url())
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except OperationalError:
+        pytest.skip("Test database is not available; skipping DB integration tests")
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    pruner = RetentionPruner(RetentionPolicy(max_rows=1), collect_blobs=False)
+    lock = {"space": RETENTION_LOCK_KEY[0], "key": RETENTION_LOCK_KEY[1]}
+    try:
+        with engine.connect() as other_worker:
+            assert other_worker.execute(text("SELECT pg_try_advisory_lock(:space, :key)"), lock).scalar_one()
+            asyncio.run(pruner.prune(factory))
+            other_worker.execute(text("SELECT pg_advisory_unlock(:space, :key)"), lock)
+        asyncio.run(pruner.prune(factory))
+    finally:
+        engine.dispose()
+
+    assert pruner.stats()["skipped_passes"] == 1
+    assert pruner.stats()["passes"] == 1